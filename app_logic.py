@@ -2,11 +2,32 @@
 from iqa_scorer import hybrid_scorer, IQA_AVAILABLE
 
 import os
+import sys
 import hashlib
-from collections import defaultdict
+import sqlite3
+import mmap
+import errno
+import shutil
+import threading
+import time
+import tempfile
+import itertools
+import functools
+import zipfile
+import tarfile
+import fnmatch
+import re
+import json
+import calendar
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from collections import defaultdict, deque
 import mimetypes
 import math
 import io  # <-- [수정] 바이트 처리를 위해 io 모듈 추가
+from clustering import (UnionFind, DEFAULT_LINKAGE, cluster_edges, iter_all_pairs_edges,
+                        build_similarity_groups)
 
 # --- 필요한 라이브러리 임포트 ---
 import cv2
@@ -31,242 +52,3447 @@ def format_bytes(size):
     s = round(size / p, 2)
     return f"{s} {power_labels[i]}"
 
+# --- 진행률/중지 지원 (모든 검사 함수 공통) ---
+
+class CancelToken:
+    """검사 중지 요청을 전달하는 토큰 (UI의 '중지' 버튼에서 cancel()을 호출하면 검사가 깔끔하게 멈춤)"""
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+def is_cancelled(cancel):
+    return cancel is not None and cancel.cancelled
+
+def report_progress(progress, stage, done, total):
+    """진행률 콜백 호출: progress(단계 이름, 처리한 개수, 전체 개수)"""
+    if progress is not None:
+        progress(stage, done, total)
+
 # --- 확장자 기반 이미지 인식 로직 추가 ---
 IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp', '.ico')
 # ----------------------------------------
 
-# app_logic.py 파일 내 get_file_category 함수 교체
+# app_logic.py 파일 내 get_file_category 함수 교체
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp', '.ico')
+
+def get_file_category(filepath):
+    """
+    파일 경로를 기반으로 카테고리(이미지, 영상 등) 반환.
+    확장자 기반으로 이미지 파일을 우선적으로 인식합니다.
+    """
+    filename = filepath.lower()
+    
+    # 1. 확장자 기반 체크 (JPEG, PNG 등)
+    if filename.endswith(IMAGE_EXTENSIONS): 
+        return "Images"
+    
+    # 2. MIME Type 기반 체크 (나머지 파일들)
+    import mimetypes # 함수 내에서 임포트 (안전성 확보)
+    mime_type, _ = mimetypes.guess_type(filepath)
+    
+    if mime_type:
+        main_type = mime_type.split('/')[0]
+        if main_type == "video": return "Videos"
+        if main_type == "audio": return "Audio"
+        if main_type == "text": return "Documents"
+    
+    # MIME 타입이 없거나 다른 모든 경우
+    return "Other"
+
+# --- 공유 파일 인덱스 (모든 검사/페이지에서 재사용) ---
+
+class FileEntry:
+    """FileIndex에 기록된 파일 한 개의 정보 (경로, stat 결과, 카테고리)"""
+    __slots__ = ('path', 'st', '_category')
+
+    def __init__(self, path, st):
+        self.path = path
+        self.st = st
+        self._category = None
+
+    @property
+    def size(self):
+        return self.st.st_size
+
+    @property
+    def mtime_ns(self):
+        return self.st.st_mtime_ns
+
+    @property
+    def inode(self):
+        return (self.st.st_dev, self.st.st_ino)
+
+    @property
+    def category(self):
+        """파일 카테고리 (처음 요청할 때 한 번만 계산)"""
+        if self._category is None:
+            self._category = get_file_category(self.path)
+        return self._category
+
+# 기본 제외 패턴: 버전 관리/패키지/캐시 폴더와 OS가 만드는 부속 파일
+DEFAULT_EXCLUDE_PATTERNS = ('.git', '.svn', '.hg', 'node_modules', '__pycache__', '.cache', '.venv',
+                            '$RECYCLE.BIN', 'System Volume Information', '.Trash*', 'Thumbs.db', '.DS_Store')
+
+class ScanFilter:
+    """
+    폴더를 훑을 때 적용하는 제외 규칙과 크기 범위.
+    - exclude: glob 패턴 목록. '/'가 없는 패턴은 폴더/파일 이름과, 있는 패턴은 전체 경로('/' 구분)와 비교
+               (예: '.git', 'node_modules', '*.tmp', '*/build/*')
+    - exclude_regex: 전체 경로('/' 구분)에 re.search로 적용할 정규식 (문자열 또는 컴파일된 패턴)
+    - min_size / max_size: 이 범위 밖의 파일은 stat 값만 보고 제외 (내용은 읽지 않음)
+    제외 규칙에 걸린 폴더는 하위로 내려가지 않고 통째로 건너뜁니다. (걸러내는 것이 아니라 가지치기)
+    """
+    def __init__(self, exclude=(), exclude_regex=None, min_size=None, max_size=None):
+        exclude = [pattern.strip() for pattern in exclude if pattern and pattern.strip()]
+        self.name_patterns = [pattern for pattern in exclude if '/' not in pattern]
+        self.path_patterns = [pattern for pattern in exclude if '/' in pattern]
+        if isinstance(exclude_regex, str):
+            exclude_regex = re.compile(exclude_regex) if exclude_regex else None
+        self.exclude_regex = exclude_regex
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def excludes(self, path, name=None):
+        """폴더/파일 경로가 제외 규칙에 걸리는지 (name은 이미 알고 있으면 넘겨서 basename 계산 생략)"""
+        if name is None:
+            name = os.path.basename(path.rstrip(os.sep))
+        if any(fnmatch.fnmatch(name, pattern) for pattern in self.name_patterns):
+            return True
+        if self.path_patterns or self.exclude_regex is not None:
+            posix_path = path.replace(os.sep, '/')
+            # 끝에 '/'를 붙여서도 비교: '*/build/*'가 build 안의 파일을 하나씩 거르는 대신 build 폴더 자체를 가지치기
+            if any(fnmatch.fnmatch(posix_path, pattern) or fnmatch.fnmatch(posix_path + '/', pattern)
+                   for pattern in self.path_patterns):
+                return True
+            if self.exclude_regex is not None and self.exclude_regex.search(posix_path):
+                return True
+        return False
+
+    def accepts_size(self, size):
+        return (self.min_size is None or size >= self.min_size) and (self.max_size is None or size <= self.max_size)
+
+    def accepts(self, path, st, roots):
+        """
+        감시 중 새로 보고된 파일처럼 폴더 순회를 거치지 않은 경로를 검사:
+        검사 루트 아래의 각 폴더/파일 이름과 크기가 모두 규칙을 통과해야 True
+        """
+        if not self.accepts_size(st.st_size):
+            return False
+        for root in roots:
+            relative = os.path.relpath(path, root)
+            if relative.startswith(os.pardir):
+                continue
+            current = root
+            for part in relative.split(os.sep):
+                current = os.path.join(current, part)
+                if self.excludes(current, part):
+                    return False
+            return True
+        return not self.excludes(path)
+
+def normalize_roots(sources):
+    """
+    검사 루트 목록을 절대 경로로 정리하고, 같은 곳이거나 다른 폴더 루트 안에 들어 있는 루트는 제거.
+    (심볼릭 링크로 같은 곳을 가리키는 루트도 실제 경로로 비교하므로 파일을 두 번 세지 않음)
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    candidates = []
+    seen = set()
+    for source in sources:
+        root = os.path.abspath(os.fspath(source))
+        real = os.path.normcase(os.path.realpath(root))
+        if real in seen:
+            continue
+        seen.add(real)
+        candidates.append((root, real, os.path.isdir(root)))
+    dir_reals = [real for _, real, is_dir in candidates if is_dir]
+    def is_nested(real):
+        return any(real != other and real.startswith(other if other.endswith(os.sep) else other + os.sep)
+                   for other in dir_reals)
+    return [root for root, real, _ in candidates if not is_nested(real)]
+
+def iter_folder_files(root, scan_filter=None):
+    """
+    폴더를 os.scandir로 훑어 (경로, stat)을 하나씩 yield (목록을 메모리에 쌓지 않음).
+    os.walk와 같은 순서(상위 폴더의 파일 → 하위 폴더 순서대로)로 순회하며, 폴더 심볼릭 링크는 따라가지 않습니다.
+    scan_filter(ScanFilter)가 있으면 제외된 폴더는 내려가지 않고, 제외/크기 범위 밖의 파일은 건너뜁니다.
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                dir_entries = list(it)
+        except OSError as e:
+            print(f"❌ 폴더 읽기 오류: {current} → {e}")
+            continue
+        subdirs = []
+        for dir_entry in dir_entries:
+            try:
+                if scan_filter is not None and scan_filter.excludes(dir_entry.path, dir_entry.name):
+                    continue
+                if dir_entry.is_dir(follow_symlinks=False):
+                    subdirs.append(dir_entry.path)
+                elif dir_entry.is_file():
+                    # Windows의 DirEntry.stat()은 inode/device를 채우지 않으므로 os.stat으로 한 번 더 조회
+                    st = os.stat(dir_entry.path) if os.name == 'nt' else dir_entry.stat()
+                    if scan_filter is not None and not scan_filter.accepts_size(st.st_size):
+                        continue
+                    yield dir_entry.path, st
+            except OSError as e:
+                print(f"❌ 오류 발생: {dir_entry.path} → {e}")
+        stack.extend(reversed(subdirs))
+
+def _iter_source_files(sources, scan_filter=None):
+    """여러 폴더/파일 경로에서 (경로, stat)을 하나씩 yield (직접 지정한 파일에는 크기 범위만 적용)"""
+    for source in sources:
+        try:
+            if os.path.isdir(source):
+                yield from iter_folder_files(source, scan_filter)
+            elif os.path.isfile(source):
+                st = os.stat(source)
+                if scan_filter is None or scan_filter.accepts_size(st.st_size):
+                    yield source, st
+        except OSError as e:
+            print(f"❌ 오류 발생: {source} → {e}")
+
+class FileIndex:
+    """
+    드롭한 폴더/파일들을 os.scandir로 한 번만 훑어 경로, 크기, 수정 시각, inode, 카테고리를 기록하는 인덱스.
+    중복 검사, 유사 이미지/비디오/문서 검사, 품질 분석과 UI 통계가 같은 인덱스를 재사용하므로
+    같은 폴더를 여러 번 walk/stat 하지 않습니다.
+    여러 루트를 받을 수 있으며(겹치는 루트는 normalize_roots로 정리), scan_filter(ScanFilter)로
+    제외 폴더를 가지치기하고 크기 범위 밖의 파일을 인덱스에 넣지 않습니다.
+    """
+    def __init__(self, sources, scan_filter=None):
+        self.roots = normalize_roots(sources)
+        self.scan_filter = scan_filter
+        # 경로 → FileEntry (dict는 추가 순서를 유지하므로 목록 없이 이것만 보관 → 삭제도 O(1))
+        self._by_path = {}
+        for path, st in _iter_source_files(self.roots, scan_filter):
+            self._add(path, st)
+
+    def _add(self, path, st):
+        if path in self._by_path:
+            return
+        self._by_path[path] = FileEntry(path, st)
+
+    @property
+    def entries(self):
+        """FileEntry 목록 (추가 순서, 호출할 때마다 새 목록)"""
+        return list(self._by_path.values())
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def __iter__(self):
+        return iter(self._by_path.values())
+
+    def get(self, path):
+        """경로에 해당하는 FileEntry를 반환 (인덱스에 없으면 None)"""
+        return self._by_path.get(path)
+
+    def remove(self, path):
+        """삭제된 파일을 인덱스에서 제거"""
+        self._by_path.pop(path, None)
+
+    def snapshot(self):
+        """같은 항목을 가진 새 인덱스 (다른 스레드가 읽는 동안 원본에서 파일을 지워도 영향 없음)"""
+        clone = FileIndex.__new__(FileIndex)
+        clone.roots = list(self.roots)
+        clone.scan_filter = self.scan_filter
+        clone._by_path = dict(self._by_path)
+        return clone
+
+    def paths(self, extensions=None, category=None):
+        """확장자(소문자 튜플) 또는 카테고리로 걸러낸 경로 목록을 반환"""
+        return [entry.path for entry in self
+                if (extensions is None or entry.path.lower().endswith(extensions))
+                and (category is None or entry.category == category)]
+
+    @property
+    def total_size(self):
+        """전체 용량 (하드링크로 공유된 inode는 한 번만 계산)"""
+        seen = set()
+        total = 0
+        for entry in self:
+            if entry.st.st_nlink > 1 and entry.st.st_ino:
+                if entry.inode in seen: continue
+                seen.add(entry.inode)
+            total += entry.size
+        return total
+
+def as_file_index(source, scan_filter=None):
+    """폴더 경로(또는 경로 목록)를 FileIndex로 변환 (이미 FileIndex면 그대로 반환)"""
+    if isinstance(source, FileIndex):
+        return source
+    return FileIndex(source, scan_filter)
+
+# --- 중복 파일 검사 (DuplicateCheckPage) 로직 ---
+
+def get_cache_dir():
+    """OS별 사용자 캐시 폴더(없으면 생성) 경로를 반환"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    cache_dir = os.path.join(base, 'iqa')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+class HashCache:
+    """
+    파일 식별 정보(device, inode, size, mtime_ns)를 키로 해시 결과를 저장하는 SQLite 캐시.
+    크기나 수정 시각이 달라진 파일은 캐시 미스로 처리되어 다시 해시됩니다.
+    """
+    # 캐시에 쓰기가 이만큼 쌓이면 자동으로 커밋
+    COMMIT_INTERVAL = 1000
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_cache_dir(), 'hash_cache.sqlite3')
+        # 해시 스레드 풀에서 함께 사용하므로 연결 공유 + 잠금으로 보호
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # kind: 해시 종류 (예: 'partial:4096:blake2b', 'full:blake2b')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (dev, ino, kind)
+            )
+        """)
+        self.conn.commit()
+        self.pending_writes = 0
+
+    def get(self, st, kind):
+        """stat 결과와 일치하는 캐시 값을 반환 (없거나 파일이 바뀌었으면 None)"""
+        if not st.st_ino:
+            return None  # inode를 제공하지 않는 파일 시스템(FAT, 일부 네트워크 드라이브)은 캐시하지 않음
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, digest FROM file_hashes WHERE dev=? AND ino=? AND kind=?",
+                (st.st_dev, st.st_ino, kind)).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return None
+        return row[2]
+
+    def put(self, st, kind, digest):
+        """해시 결과를 캐시에 저장 (같은 파일의 이전 값은 덮어씀)"""
+        if not st.st_ino:
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (dev, ino, kind, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, kind, st.st_size, st.st_mtime_ns, digest))
+            self.pending_writes += 1
+            if self.pending_writes >= self.COMMIT_INTERVAL:
+                self._commit()
+
+    def flush(self):
+        """쌓인 쓰기를 디스크에 반영"""
+        with self.lock:
+            self._commit()
+
+    def _commit(self):
+        if self.pending_writes:
+            self.conn.commit()
+            self.pending_writes = 0
+
+_hash_cache = None
+_hash_cache_failed = False
+_hash_cache_lock = threading.Lock()
+
+def get_hash_cache():
+    """전역 해시 캐시를 반환 (캐시를 열 수 없는 환경이면 None → 캐시 없이 동작)"""
+    global _hash_cache, _hash_cache_failed
+    with _hash_cache_lock:
+        if _hash_cache is None and not _hash_cache_failed:
+            try:
+                _hash_cache = HashCache()
+            except Exception as e:
+                _hash_cache_failed = True
+                print(f"⚠️ 해시 캐시를 열 수 없어 캐시 없이 검사합니다: {e}")
+    return _hash_cache
+
+class HashWorkerStats:
+    """해시 스레드별 처리량(실제로 읽은 파일 수, 바이트, 소요 시간)을 집계"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.per_worker = defaultdict(lambda: {'files': 0, 'bytes': 0, 'seconds': 0.0})
+
+    def record(self, nbytes, elapsed, files=1):
+        with self.lock:
+            entry = self.per_worker[threading.current_thread().name]
+            entry['files'] += files
+            entry['bytes'] += nbytes
+            entry['seconds'] += elapsed
+
+    def report(self):
+        """스레드별 처리량 목록 반환 (MB/s 포함)"""
+        rows = []
+        for name, entry in sorted(self.per_worker.items()):
+            mb_per_sec = entry['bytes'] / (1024 * 1024) / entry['seconds'] if entry['seconds'] > 0 else 0.0
+            rows.append({'worker': name, **entry, 'mb_per_sec': mb_per_sec})
+        return rows
+
+    def print_report(self):
+        for row in self.report():
+            print(f"   🧵 {row['worker']}: {row['files']}개 파일, {format_bytes(row['bytes'])}, "
+                  f"{row['seconds']:.2f}초 ({row['mb_per_sec']:.1f} MB/s)")
+
+def _is_same_file_state(st1, st2):
+    """두 stat 결과가 같은 파일의 같은 내용 상태를 가리키는지 확인"""
+    return (st1.st_dev, st1.st_ino, st1.st_size, st1.st_mtime_ns) == \
+           (st2.st_dev, st2.st_ino, st2.st_size, st2.st_mtime_ns)
+
+# --- 중복 검사용 해시 알고리즘 ---
+
+# xxHash(선택 사항): 설치되어 있으면 암호학적 해시보다 훨씬 빠른 128비트 해시를 사용할 수 있음
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+class _CombinedHash:
+    """여러 해시를 한 번의 읽기로 동시에 계산 (기존 MD5+SHA256 방식 호환용)"""
+    def __init__(self, *hashers):
+        self.hashers = hashers
+
+    def update(self, data):
+        for h in self.hashers:
+            h.update(data)
+
+    def hexdigest(self):
+        return "".join(h.hexdigest() for h in self.hashers)
+
+    def copy(self):
+        return _CombinedHash(*(h.copy() for h in self.hashers))
+
+# 알고리즘 이름 → 해시 객체 생성 함수
+HASH_ALGORITHMS = {
+    'blake2b': lambda: hashlib.blake2b(digest_size=16),  # 128비트 BLAKE2b (SHA256보다 빠름)
+    'md5': hashlib.md5,
+    'sha256': hashlib.sha256,
+    'md5_sha256': lambda: _CombinedHash(hashlib.md5(), hashlib.sha256()),
+}
+if XXHASH_AVAILABLE:
+    HASH_ALGORITHMS['xxh128'] = xxhash.xxh3_128
+
+# 로컬 중복 검사에는 한 번의 128비트 해시로 충분함 (필요하면 verify=True로 바이트 단위 확인)
+DEFAULT_HASH_ALGORITHM = 'blake2b'
+
+def new_hasher(algorithm):
+    """알고리즘 이름으로 해시 객체를 생성"""
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"지원하지 않는 해시 알고리즘: {algorithm} (사용 가능: {', '.join(HASH_ALGORITHMS)})")
+    return HASH_ALGORITHMS[algorithm]()
+
+def make_hash_key(algorithm, digest):
+    """중복 그룹 키 생성 (예: 'blake2b:3fa9...')"""
+    return f"{algorithm}:{digest}"
+
+def split_hash_key(hash_key):
+    """중복 그룹 키를 (알고리즘, 해시값)으로 분리"""
+    algorithm, _, digest = hash_key.partition(":")
+    return algorithm, digest
+
+# --- 해시용 파일 읽기 (복사 없는 I/O) ---
+
+# 한 번에 읽는 블록 크기 (8KB보다 크게 읽어야 시스템 콜/해시 호출 횟수가 줄어듦)
+HASH_BLOCK_SIZE = 1024 * 1024
+# 이 크기 이상인 파일은 mmap으로 매핑하여 커널 페이지 캐시에서 바로 해시
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+_read_buffers = threading.local()
+
+def _get_read_buffer(block_size):
+    """스레드마다 한 번만 할당해 재사용하는 읽기 버퍼(bytearray)를 반환"""
+    buf = getattr(_read_buffers, 'buf', None)
+    if buf is None or len(buf) != block_size:
+        buf = bytearray(block_size)
+        _read_buffers.buf = buf
+    return buf
+
+def hash_file_into(file_hash, filepath, block_size=HASH_BLOCK_SIZE, use_mmap=True):
+    """
+    파일 내용을 해시 객체(들)에 복사 없이 공급하고, 읽은 바이트 수를 반환.
+    - 큰 파일: mmap + memoryview 조각을 그대로 update
+    - 그 외: 미리 할당한 버퍼에 readinto 후 memoryview 조각을 update
+    """
+    with open(filepath, 'rb', buffering=0) as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if use_mmap and file_size >= MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    try:
+                        for offset in range(0, len(mm), block_size):
+                            file_hash.update(view[offset:offset + block_size])
+                    finally:
+                        view.release()  # 뷰가 남아 있으면 mmap을 닫을 수 없음
+                return file_size
+            except (OSError, ValueError):
+                # 매핑할 수 없는 파일(일부 네트워크/특수 파일)은 일반 읽기로 대체
+                f.seek(0)
+
+        buf = _get_read_buffer(block_size)
+        view = memoryview(buf)
+        bytes_read = 0
+        while n := f.readinto(buf):
+            file_hash.update(view[:n])
+            bytes_read += n
+        return bytes_read
+
+def benchmark_hash_io(filepath, algorithm=DEFAULT_HASH_ALGORITHM, block_sizes=(64 * 1024, HASH_BLOCK_SIZE, 4 * HASH_BLOCK_SIZE)):
+    """
+    기존 8KB f.read() 루프와 readinto/mmap 읽기의 해시 처리량(MB/s)을 비교하여 반환.
+    (1GB 이상 파일로 측정해야 의미 있는 결과가 나옵니다)
+    """
+    file_size = os.path.getsize(filepath)
+    results = []
+
+    def measure(label, run):
+        started = time.perf_counter()
+        digest = run()
+        elapsed = time.perf_counter() - started
+        results.append((label, file_size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0, digest))
+
+    def legacy_loop():
+        file_hash = new_hasher(algorithm)
+        with open(filepath, 'rb') as f:
+            while chunk := f.read(8192):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def zero_copy(block_size, use_mmap):
+        file_hash = new_hasher(algorithm)
+        hash_file_into(file_hash, filepath, block_size=block_size, use_mmap=use_mmap)
+        return file_hash.hexdigest()
+
+    measure("f.read(8192)", legacy_loop)
+    for block_size in block_sizes:
+        measure(f"readinto {format_bytes(block_size)}", lambda: zero_copy(block_size, False))
+    if file_size >= MMAP_THRESHOLD:
+        measure(f"mmap {format_bytes(HASH_BLOCK_SIZE)}", lambda: zero_copy(HASH_BLOCK_SIZE, True))
+
+    print(f"📈 해시 I/O 벤치마크 ({algorithm}, {format_bytes(file_size)}):")
+    for label, mb_per_sec, digest in results:
+        mismatch = "" if digest == results[0][2] else " ⚠️ 해시 불일치"
+        print(f"   {label:>16}: {mb_per_sec:8.1f} MB/s{mismatch}")
+    return [(label, mb_per_sec) for label, mb_per_sec, _ in results]
+
+def get_file_hash(filepath, algorithm=DEFAULT_HASH_ALGORITHM, st=None, use_cache=True, stats=None):
+    """파일 전체 내용의 해시(16진수 문자열)를 반환 (변경되지 않은 파일은 캐시에서 바로 반환)"""
+    cache = get_hash_cache() if use_cache else None
+    kind = f"full:{algorithm}"
+    if cache is not None:
+        if st is None:
+            st = os.stat(filepath)
+        cached = cache.get(st, kind)
+        if cached:
+            return cached
+
+    # [참고] 'rb' (read binary) 모드는 한글 경로와 상관없이 잘 동작합니다. (변경 불필요)
+    started = time.perf_counter()
+    file_hash = new_hasher(algorithm)
+    bytes_read = hash_file_into(file_hash, filepath)
+    digest = file_hash.hexdigest()
+    if stats is not None:
+        stats.record(bytes_read, time.perf_counter() - started)
+
+    # 해시하는 동안 파일이 바뀌지 않았을 때만 캐시에 저장
+    if cache is not None and _is_same_file_state(st, os.stat(filepath)):
+        cache.put(st, kind, digest)
+    return digest
+
+# 부분 해시에 사용할 앞/뒤 구간 크기 (바이트)
+PARTIAL_HASH_SIZE = 4096
+
+def get_partial_hash(filepath, file_size, chunk_size=PARTIAL_HASH_SIZE, algorithm=DEFAULT_HASH_ALGORITHM,
+                     st=None, use_cache=True, stats=None):
+    """파일의 앞부분과 뒷부분 chunk_size 바이트만 읽어 빠른 비교용 해시를 반환"""
+    cache = get_hash_cache() if use_cache else None
+    kind = f"partial:{chunk_size}:{algorithm}"
+    if cache is not None:
+        if st is None:
+            st = os.stat(filepath)
+        cached = cache.get(st, kind)
+        if cached:
+            return cached
+
+    started = time.perf_counter()
+    partial_hash = new_hasher(algorithm)
+    with open(filepath, 'rb') as f:
+        if file_size <= chunk_size * 2:
+            # 작은 파일은 앞/뒤 구간이 겹치므로 전체를 한 번에 읽음
+            partial_hash.update(f.read())
+        else:
+            partial_hash.update(f.read(chunk_size))
+            f.seek(-chunk_size, os.SEEK_END)
+            partial_hash.update(f.read(chunk_size))
+    partial_val = partial_hash.hexdigest()
+    if stats is not None:
+        stats.record(min(file_size, chunk_size * 2), time.perf_counter() - started)
+
+    if cache is not None and _is_same_file_state(st, os.stat(filepath)):
+        cache.put(st, kind, partial_val)
+    return partial_val
+
+# 빠른 모드에서 샘플 비교만 하는 파일 크기 하한 (이보다 작은 파일은 항상 전체 해시)
+QUICK_HASH_MIN_SIZE = 512 * 1024 * 1024
+# 빠른 모드의 샘플 하나의 크기 (앞/가운데/뒤 세 곳에서 읽음)
+QUICK_SAMPLE_SIZE = 1024 * 1024
+# 샘플로만 비교한 '추정 중복' 그룹 키의 알고리즘 접두사 (예: 'quick-blake2b:3fa9...')
+QUICK_KEY_PREFIX = "quick-"
+
+def get_quick_hash(filepath, file_size, sample_size=QUICK_SAMPLE_SIZE, algorithm=DEFAULT_HASH_ALGORITHM,
+                   st=None, use_cache=True, stats=None):
+    """
+    아주 큰 파일용 빠른 지문: 파일 크기 + 앞/가운데/뒤 sample_size 바이트만 해시.
+    내용 전체를 보지 않으므로 일치해도 '추정 중복'이며, 확정하려면 verify_probable_group으로 검증해야 합니다.
+    """
+    cache = get_hash_cache() if use_cache else None
+    kind = f"quick:{sample_size}:{algorithm}"
+    if cache is not None:
+        if st is None:
+            st = os.stat(filepath)
+        cached = cache.get(st, kind)
+        if cached:
+            return cached
+
+    started = time.perf_counter()
+    quick_hash = new_hasher(algorithm)
+    quick_hash.update(file_size.to_bytes(8, 'little'))
+    view = memoryview(_get_read_buffer(HASH_BLOCK_SIZE))[:sample_size]
+    bytes_read = 0
+    with open(filepath, 'rb', buffering=0) as f:
+        for offset in (0, max(0, (file_size - sample_size) // 2), max(0, file_size - sample_size)):
+            f.seek(offset)
+            n = f.readinto(view)
+            quick_hash.update(view[:n])
+            bytes_read += n
+    quick_val = quick_hash.hexdigest()
+    if stats is not None:
+        stats.record(bytes_read, time.perf_counter() - started)
+
+    if cache is not None and _is_same_file_state(st, os.stat(filepath)):
+        cache.put(st, kind, quick_val)
+    return quick_val
+
+def get_group_confidence(hash_key):
+    """중복 그룹 키의 신뢰도: 샘플로만 비교한 그룹은 'probable', 전체 내용을 비교한 그룹은 'confirmed'"""
+    algorithm, _ = split_hash_key(hash_key)
+    return 'probable' if algorithm.startswith(QUICK_KEY_PREFIX) else 'confirmed'
+
+# 해시 스레드 수 기본값: hashlib은 해시 중 GIL을 풀기 때문에 스레드로도 여러 코어를 사용할 수 있음.
+# NVMe/RAID는 동시 요청이 많을수록 빨라지지만, 너무 많으면 HDD에서 탐색(seek)만 늘어나므로 8개로 제한
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+def _iter_hash_tasks(func, items, workers, describe=lambda item: item[0], cancel=None):
+    """
+    items의 각 항목에 func(*항목)을 적용한 결과를 입력 순서대로 하나씩 yield.
+    workers가 2 이상이면 스레드 풀에서 병렬로 실행하며, 오류가 난 항목의 결과는 None입니다.
+    중지 요청(cancel) 후에는 남은 작업을 실행하지 않습니다.
+    """
+    def task(item):
+        if is_cancelled(cancel):
+            return None
+        try:
+            return func(*item)
+        except Exception as e:
+            print(f"❌ 오류 발생: {describe(item)} → {e}")
+            return None
+
+    if workers <= 1 or len(items) < 2:
+        for item in items:
+            yield task(item)
+        return
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash")
+    try:
+        # map은 입력 순서를 유지하므로 직렬 실행과 결과가 동일함
+        yield from executor.map(task, items)
+    finally:
+        # 소비자가 중간에 멈추면(중지/제너레이터 종료) 아직 시작하지 않은 작업은 취소
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# --- 동시 비교(lockstep) 엔진 ---
+
+# 첫 블록은 작게 읽어 앞부분에서 갈라지는 파일을 빨리 걸러내고, 같은 상태가 유지되면 블록을 두 배씩 키움
+LOCKSTEP_FIRST_BLOCK = 64 * 1024
+LOCKSTEP_MAX_BLOCK = 256 * 1024
+# 이보다 후보가 많으면 파일을 계속 열어두지 않고 블록마다 다시 열어 읽음 (열린 파일 수 제한 대비)
+LOCKSTEP_MAX_OPEN = 256
+
+class _LockstepReader:
+    """lockstep 비교용 파일 리더 (현재 위치만 기억하고, 버퍼는 호출자가 넘긴 공용 버퍼를 씀)"""
+    def __init__(self, path, st, keep_open):
+        self.path = path
+        self.st = st
+        self.keep_open = keep_open
+        self.f = None
+        self.offset = 0
+
+    def read(self, view, size):
+        """다음 size 바이트를 view(memoryview)에 읽어 읽은 부분을 반환 (파일 끝이면 더 짧음)"""
+        if self.f is None:
+            self.f = open(self.path, 'rb', buffering=0)
+            self.f.seek(self.offset)
+        n = 0
+        while n < size:
+            got = self.f.readinto(view[n:size])
+            if not got: break
+            n += got
+        self.offset += n
+        if not self.keep_open:
+            self.close()
+        return view[:n]
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+def compare_files_lockstep(items, algorithm=DEFAULT_HASH_ALGORITHM, use_cache=True, stats=None):
+    """
+    같은 크기의 후보 파일들((경로, stat) 목록)을 블록 단위로 동시에 읽으며 내용이 같은 그룹으로 나눔.
+    내용이 갈라지는 즉시 그룹을 분리하고, 혼자 남은 파일은 더 이상 읽지 않습니다.
+    그룹마다 읽은 내용을 해시하므로 (해시값, [경로...]) 목록을 반환하며, 내용은 바이트 단위로 일치가 보장됩니다.
+    """
+    started = time.perf_counter()
+    keep_open = len(items) <= LOCKSTEP_MAX_OPEN
+    readers = []
+    for path, st in items:
+        try:
+            readers.append(_LockstepReader(path, st, keep_open))
+        except Exception as e:
+            print(f"❌ 오류 발생: {path} → {e}")
+
+    # active: (지금까지 읽은 공통 내용의 해시, 같은 내용을 가진 리더들)
+    active = [(new_hasher(algorithm), readers)] if len(readers) > 1 else []
+    finished = []
+    block_size = LOCKSTEP_FIRST_BLOCK
+    bytes_read = 0
+    # 후보가 아무리 많아도 읽기 버퍼는 하나만 씀. 비교 기준이 되는 대표 블록(갈라진 종류마다 하나)만 복사해 둠
+    scratch = memoryview(bytearray(LOCKSTEP_MAX_BLOCK)) if len(readers) > 1 else None
+    try:
+        while active:
+            next_active = []
+            for file_hash, members in active:
+                # 이번 블록 내용이 같은 리더끼리 묶음 (대부분 한두 종류라 대표 블록과 memcmp로 충분)
+                splits = []
+                for reader in members:
+                    try:
+                        block = reader.read(scratch, block_size)
+                    except Exception as e:
+                        print(f"❌ 오류 발생: {reader.path} → {e}")
+                        reader.close()
+                        continue
+                    bytes_read += len(block)
+                    for split_block, split_members in splits:
+                        if split_block == block:
+                            split_members.append(reader)
+                            break
+                    else:
+                        splits.append((bytes(block), [reader]))
+
+                survivors = [(block, group) for block, group in splits if len(group) > 1]
+                for block, group in splits:
+                    if len(group) == 1:
+                        group[0].close()  # 유일해진 파일은 더 읽지 않음
+                for i, (block, group) in enumerate(survivors):
+                    # 그룹이 갈라지면 그때까지의 해시 상태를 복제해서 이어감
+                    group_hash = file_hash if i == len(survivors) - 1 else file_hash.copy()
+                    group_hash.update(block)
+                    if len(block) < block_size:
+                        finished.append((group_hash.hexdigest(), group))
+                        for reader in group:
+                            reader.close()
+                    else:
+                        next_active.append((group_hash, group))
+            active = next_active
+            block_size = min(block_size * 2, LOCKSTEP_MAX_BLOCK)
+    finally:
+        for reader in readers:
+            reader.close()
+
+    # 끝까지 읽은 그룹은 해시가 확정되므로 캐시에 저장 (다음 검사부터는 해시 모드에서 재사용)
+    cache = get_hash_cache() if use_cache else None
+    results = []
+    for digest, group in finished:
+        if cache is not None:
+            for reader in group:
+                try:
+                    if reader.st is not None and _is_same_file_state(reader.st, os.stat(reader.path)):
+                        cache.put(reader.st, f"full:{algorithm}", digest)
+                except OSError:
+                    pass
+        results.append((digest, [reader.path for reader in group]))
+    if stats is not None:
+        stats.record(bytes_read, time.perf_counter() - started, files=len(readers))
+    return results
+
+# --- 압축 파일(zip/tar) 내부 항목 ---
+
+# 내부 항목도 중복 검사 대상으로 보는 압축 파일 확장자 (소문자)
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tgz', '.tar.gz', '.tbz2', '.tar.bz2', '.txz', '.tar.xz')
+# 압축 파일 내부 항목의 가상 경로 구분자 (예: 'backup.zip!/DCIM/x.jpg')
+ARCHIVE_SEPARATOR = "!/"
+
+def make_archive_member_path(archive_path, name):
+    """압축 파일 경로와 내부 항목 이름으로 가상 경로를 만듦"""
+    return f"{archive_path}{ARCHIVE_SEPARATOR}{name}"
+
+def split_archive_member_path(path):
+    """가상 경로를 (압축 파일 경로, 내부 항목 이름)으로 분리 (일반 경로면 (경로, None))"""
+    start = 0
+    while (pos := path.find(ARCHIVE_SEPARATOR, start)) != -1:
+        archive_path = path[:pos]
+        if archive_path.lower().endswith(ARCHIVE_EXTENSIONS):
+            return archive_path, path[pos + len(ARCHIVE_SEPARATOR):]
+        start = pos + 1
+    return path, None
+
+def is_archive_member_path(path):
+    return split_archive_member_path(path)[1] is not None
+
+def list_archive_members(archive_path):
+    """
+    압축을 풀지 않고 내부 일반 파일 목록을 (이름, 크기, CRC32 또는 None)로 반환.
+    zip은 중앙 디렉터리의 크기/CRC를 그대로 쓰므로 내용을 읽지 않습니다. (tar는 CRC가 없어 None)
+    암호화된 zip 항목은 내용을 읽을 수 없으므로 제외합니다. (같은 이름이 여러 번 있으면 마지막 항목 기준)
+    """
+    members = {}
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or info.flag_bits & 0x1:
+                    members.pop(info.filename, None)
+                    continue
+                members[info.filename] = (info.filename, info.file_size, info.CRC)
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path, 'r:*') as tf:
+            for member in tf:
+                if member.isfile():
+                    members[member.name] = (member.name, member.size, None)
+                else:
+                    members.pop(member.name, None)
+    return list(members.values())
+
+@functools.lru_cache(maxsize=64)
+def _archive_member_sizes(archive_path, mtime_ns):
+    return {name: size for name, size, _ in list_archive_members(archive_path)}
+
+def get_archive_member_size(path):
+    """가상 경로가 가리키는 압축 파일 내부 항목의 크기 (없으면 FileNotFoundError)"""
+    archive_path, name = split_archive_member_path(path)
+    sizes = _archive_member_sizes(archive_path, os.stat(archive_path).st_mtime_ns)
+    if name not in sizes:
+        raise FileNotFoundError(path)
+    return sizes[name]
+
+def hash_archive_members(archive_path, names, algorithm=DEFAULT_HASH_ALGORITHM, st=None, use_cache=True, stats=None):
+    """
+    압축 파일을 임시 폴더에 풀지 않고, 지정한 내부 항목들의 내용을 스트리밍으로 해시하여 {이름: 해시}를 반환.
+    해시는 같은 알고리즘의 get_file_hash 결과와 같으므로 압축 밖의 파일과 바로 비교할 수 있습니다.
+    결과는 압축 파일의 식별 정보를 키로 해시 캐시에 저장됩니다. (압축 파일이 바뀌면 다시 계산)
+    """
+    cache = get_hash_cache() if use_cache else None
+    if st is None:
+        st = os.stat(archive_path)
+    digests = {}
+    remaining = set()
+    for name in names:
+        cached = cache.get(st, f"member:{algorithm}:{name}") if cache is not None else None
+        if cached:
+            digests[name] = cached
+        else:
+            remaining.add(name)
+    if not remaining:
+        return digests
+
+    started = time.perf_counter()
+    bytes_read = 0
+    buf = _get_read_buffer(HASH_BLOCK_SIZE)
+    view = memoryview(buf)
+
+    def hash_stream(stream):
+        nonlocal bytes_read
+        member_hash = new_hasher(algorithm)
+        while n := stream.readinto(buf):
+            member_hash.update(view[:n])
+            bytes_read += n
+        return member_hash.hexdigest()
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for name in remaining:
+                with zf.open(name) as stream:
+                    digests[name] = hash_stream(stream)
+    else:
+        # tar(특히 gz/bz2/xz)는 순차 읽기만 빠르므로, 한 번 훑으면서 필요한 항목만 해시
+        with tarfile.open(archive_path, 'r:*') as tf:
+            for member in tf:
+                if member.name in remaining and member.isfile():
+                    # 같은 이름이 뒤에 다시 나오면 덮어써서 목록(list_archive_members)과 같은 항목 기준을 유지
+                    digests[member.name] = hash_stream(tf.extractfile(member))
+    if stats is not None:
+        stats.record(bytes_read, time.perf_counter() - started, files=len(remaining))
+
+    if cache is not None and _is_same_file_state(st, os.stat(archive_path)):
+        for name in remaining:
+            if name in digests:
+                cache.put(st, f"member:{algorithm}:{name}", digests[name])
+    return digests
+
+def _hash_bucket(bucket, algorithm, stats, member_digests):
+    """(경로, stat) 묶음을 전체 해시로 나눠 [(해시, [경로...])]를 반환 (압축 내부 항목은 미리 계산한 해시 사용)"""
+    hash_map = defaultdict(list)
+    for path, st in bucket:
+        if st is None:
+            digest = member_digests.get(path)
+        else:
+            digest = get_file_hash(path, algorithm=algorithm, st=st, stats=stats)
+        if digest is not None:
+            hash_map[digest].append(path)
+    return [(digest, paths) for digest, paths in hash_map.items() if len(paths) > 1]
+
+def iter_duplicate_files(folder_path, workers=None, stats=None, algorithm=None, verify=False, hardlinks=None,
+                         progress=None, cancel=None, archives=False, quick=False, scan_filter=None,
+                         partials=None, digests=None):
+    """
+    폴더(또는 FileIndex)를 스캔하여 확정된 중복 그룹을 (그룹 키, [경로...])로 찾는 즉시 하나씩 yield.
+    1) 파일 크기로 분류 → 2) 같은 크기끼리 앞/뒤 부분 해시 비교 → 3) 그래도 겹치는 파일만 전체 해시
+    순서로 진행하여, 크기가 유일한 파일은 한 바이트도 읽지 않습니다.
+    부분/전체 해시는 해시 캐시(HashCache)를 거치므로 바뀌지 않은 파일은 다시 읽지 않습니다.
+
+    Parameters:
+    - folder_path: 폴더 경로, 여러 루트의 목록, 또는 FileIndex (겹치는 루트는 한 번만 검사)
+    - workers: 해시 스레드 수 (None이면 DEFAULT_HASH_WORKERS, 1이면 직렬 실행)
+    - stats: HashWorkerStats 객체를 넘기면 스레드별 처리량이 기록됩니다.
+    - algorithm: 해시 알고리즘 이름 (None이면 DEFAULT_HASH_ALGORITHM, HASH_ALGORITHMS 참고)
+    - verify: True이면 3단계를 전체 해시 대신 lockstep 동시 비교(compare_files_lockstep)로 수행하여
+              바이트 단위로 완전히 같은 파일만 남김 (한 번만 읽으며, 일찍 갈라지는 파일은 끝까지 읽지 않음)
+    - hardlinks: 딕셔너리를 넘기면 이미 하드링크로 공유 중인(같은 inode) 경로 그룹이 채워집니다.
+                 같은 inode는 한 번만 해시하고 중복(낭비 용량)으로 보고하지 않으며, 총 용량에도 한 번만 더합니다.
+    - progress: progress(단계, 처리 수, 전체 수) 콜백 (단계: 'index', 'partial', 'full')
+    - cancel: CancelToken (중지되면 그때까지 찾은 그룹만 내보내고 종료)
+    - archives: True이면 zip/tar 내부 항목도 풀지 않고 검사하여 'backup.zip!/DCIM/x.jpg' 같은
+                가상 경로로 보고합니다. 크기와 zip의 CRC32(중앙 디렉터리에 기록된 값)를 공짜 사전 필터로 쓰고,
+                내부 항목은 부분 해시나 lockstep 비교 없이 압축 파일별로 한 번씩 스트리밍 해시합니다.
+    - quick: True이면 QUICK_HASH_MIN_SIZE 이상인 파일은 전체 해시 대신 앞/가운데/뒤 샘플(get_quick_hash)로만
+             비교하여 '추정 중복' 그룹으로 가장 먼저 보고합니다. 이 그룹의 키는 'quick-알고리즘:해시값'이며
+             (get_group_confidence 참고), verify_probable_group으로 나중에 확정할 수 있습니다.
+    - scan_filter: ScanFilter (제외 폴더 가지치기, 최소/최대 크기). FileIndex를 넘기면 인덱스를 만들 때의 필터를 따름
+    - partials / digests: 딕셔너리를 넘기면 계산한 부분 해시 / 전체 해시가 {경로: 해시값}으로 채워집니다.
+                          (중복이 아닌 파일 포함. DuplicateTracker가 같은 파일을 다시 읽지 않도록 사용)
+
+    그룹 키는 '알고리즘:해시값' 형식입니다. (split_hash_key 참고)
+    """
+    if algorithm is None:
+        algorithm = DEFAULT_HASH_ALGORITHM
+    new_hasher(algorithm)  # 지원하지 않는 알고리즘이면 스캔 전에 ValueError 발생
+    if workers is None:
+        workers = DEFAULT_HASH_WORKERS
+    if stats is None:
+        stats = HashWorkerStats()
+
+    # [참고] os.scandir, os.stat 등은 현대 파이썬에서 한글 경로를 잘 지원합니다. (변경 불필요)
+    file_index = as_file_index(folder_path, scan_filter)
+    report_progress(progress, 'index', len(file_index), len(file_index))
+
+    # 1단계: 인덱스의 stat 정보로 크기별 분류 (하드링크는 inode당 대표 경로 하나만 후보로)
+    size_map = defaultdict(list)
+    inode_paths = {}
+    for entry in file_index:
+        st = entry.st
+        if st.st_nlink > 1 and st.st_ino:
+            if entry.inode in inode_paths:
+                inode_paths[entry.inode].append(entry.path)
+                continue
+            inode_paths[entry.inode] = [entry.path]
+        size_map[st.st_size].append((entry.path, st))
+
+    # 압축 파일 내부 항목은 stat 대신 None을 넣고, 어느 압축 파일의 어떤 항목인지/CRC를 따로 기록
+    members = {}
+    if archives:
+        for entry in file_index:
+            if not entry.path.lower().endswith(ARCHIVE_EXTENSIONS):
+                continue
+            try:
+                for name, size, crc in list_archive_members(entry.path):
+                    member_path = make_archive_member_path(entry.path, name)
+                    members[member_path] = (entry.path, entry.st, name, crc)
+                    size_map[size].append((member_path, None))
+            except Exception as e:
+                print(f"❌ 압축 파일 읽기 오류: {entry.path} → {e}")
+    if hardlinks is not None:
+        for (dev, ino), paths in inode_paths.items():
+            if len(paths) > 1:
+                hardlinks[f"inode:{dev}:{ino}"] = paths
+
+    emitted_keys = set()
+    def unique_key(digest, key_algorithm=algorithm):
+        # 서로 다른 내용이 같은 해시를 갖는 (사실상 없는) 경우 키 뒤에 번호를 붙여 구분
+        hash_key = make_hash_key(key_algorithm, digest)
+        suffix = 1
+        while hash_key in emitted_keys:
+            hash_key = f"{make_hash_key(key_algorithm, digest)}#{suffix}"
+            suffix += 1
+        emitted_keys.add(hash_key)
+        return hash_key
+
+    try:
+        # 2단계: 크기가 같은 파일끼리 앞/뒤 부분 해시로 후보 축소
+        partial_map = defaultdict(list)
+        candidates = []
+        for size, items in size_map.items():
+            if len(items) < 2:
+                continue
+            if not any(st is None for _, st in items):
+                candidates.extend(items)
+            elif all(st is None and members[path][3] is not None for path, st in items):
+                # zip 항목끼리만 있으면 중앙 디렉터리의 CRC32로 나눔 (한 바이트도 읽지 않음)
+                for item in items:
+                    partial_map[(size, members[item[0]][3])].append(item)
+            else:
+                # 압축 밖 파일이나 tar 항목과 섞이면 비교할 공통 부분 해시가 없으므로 전체 해시로 바로 확정
+                partial_map[(size, None)].extend(items)
+        partial_vals = _iter_hash_tasks(
+            lambda path, st: get_partial_hash(path, st.st_size, algorithm=algorithm, st=st, stats=stats),
+            candidates, workers, cancel=cancel)
+        for done, (item, partial_val) in enumerate(zip(candidates, partial_vals), 1):
+            if is_cancelled(cancel):
+                partial_vals.close()
+                return
+            if partial_val is not None:
+                partial_map[(item[1].st_size, partial_val)].append(item)
+                if partials is not None:
+                    partials[item[0]] = partial_val
+            report_progress(progress, 'partial', done, len(candidates))
+
+        # 3단계: 부분 해시까지 겹치는 묶음마다 확정 → 묶음이 끝나는 대로 바로 yield
+        buckets = [paths for paths in partial_map.values() if len(paths) > 1]
+        total = sum(len(bucket) for bucket in buckets)
+        done = 0
+
+        if quick:
+            # 빠른 모드: 아주 큰 파일 묶음은 샘플 지문으로만 나눠 '추정 중복'으로 먼저 보고
+            def is_quick_bucket(bucket):
+                return all(st is not None for _, st in bucket) and bucket[0][1].st_size >= QUICK_HASH_MIN_SIZE
+            quick_buckets = [bucket for bucket in buckets if is_quick_bucket(bucket)]
+            buckets = [bucket for bucket in buckets if not is_quick_bucket(bucket)]
+            quick_items = [item for bucket in quick_buckets for item in bucket]
+            quick_vals = _iter_hash_tasks(
+                lambda path, st: get_quick_hash(path, st.st_size, algorithm=algorithm, st=st, stats=stats),
+                quick_items, workers, cancel=cancel)
+            for bucket in quick_buckets:
+                hash_map = defaultdict(list)
+                for full_path, st in bucket:
+                    quick_val = next(quick_vals)
+                    if quick_val is not None:
+                        hash_map[quick_val].append(full_path)
+                if is_cancelled(cancel):
+                    quick_vals.close()
+                    return
+                done += len(bucket)
+                for quick_val, paths in hash_map.items():
+                    if len(paths) > 1:
+                        yield unique_key(quick_val, QUICK_KEY_PREFIX + algorithm), paths
+                report_progress(progress, 'full', done, total)
+
+        # 남은 압축 내부 항목은 압축 파일별로 한 번씩 열어(tar는 한 번 순차로 훑어) 먼저 해시
+        member_digests = {}
+        archive_names = defaultdict(list)
+        for bucket in buckets:
+            for path, st in bucket:
+                if st is None:
+                    archive_path, archive_st, name, _ = members[path]
+                    archive_names[(archive_path, archive_st)].append(name)
+        if archive_names:
+            archive_tasks = [(archive_path, archive_st, names) for (archive_path, archive_st), names in archive_names.items()]
+            results = _iter_hash_tasks(
+                lambda archive_path, archive_st, names: hash_archive_members(
+                    archive_path, names, algorithm=algorithm, st=archive_st, stats=stats),
+                archive_tasks, workers, cancel=cancel)
+            for (archive_path, _, _), digests in zip(archive_tasks, results):
+                if is_cancelled(cancel):
+                    results.close()
+                    return
+                for name, digest in (digests or {}).items():
+                    member_digests[make_archive_member_path(archive_path, name)] = digest
+
+        if verify:
+            # 정확 모드: 묶음마다 lockstep 동시 비교 (묶음 단위로 병렬 실행, 압축 내부 항목이 섞인 묶음은 해시로 비교)
+            results = _iter_hash_tasks(
+                lambda bucket: (compare_files_lockstep(bucket, algorithm=algorithm, stats=stats)
+                                if all(st is not None for _, st in bucket)
+                                else _hash_bucket(bucket, algorithm, stats, member_digests)),
+                [(bucket,) for bucket in buckets], workers, describe=lambda item: item[0][0][0], cancel=cancel)
+            for bucket, groups in zip(buckets, results):
+                if is_cancelled(cancel):
+                    results.close()
+                    return
+                for digest, paths in groups or []:
+                    if digests is not None:
+                        digests.update((path, digest) for path in paths if not is_archive_member_path(path))
+                    yield unique_key(digest), paths
+                done += len(bucket)
+                report_progress(progress, 'full', done, total)
+        else:
+            # 파일 단위로 병렬 해시하되, 결과가 입력 순서대로 오므로 한 묶음이 다 모이면 바로 그룹 확정
+            candidates = [item for bucket in buckets for item in bucket if item[1] is not None]
+            digest_vals = _iter_hash_tasks(
+                lambda path, st: get_file_hash(path, algorithm=algorithm, st=st, stats=stats),
+                candidates, workers, cancel=cancel)
+            for bucket in buckets:
+                hash_map = defaultdict(list)
+                for full_path, st in bucket:
+                    digest = next(digest_vals) if st is not None else member_digests.get(full_path)
+                    if is_cancelled(cancel):
+                        digest_vals.close()
+                        return
+                    if digest is not None:
+                        hash_map[digest].append(full_path)
+                        if digests is not None and st is not None:
+                            digests[full_path] = digest
+                done += len(bucket)
+                for digest, paths in hash_map.items():
+                    if len(paths) > 1:
+                        yield unique_key(digest), paths
+                report_progress(progress, 'full', done, total)
+    finally:
+        cache = get_hash_cache()
+        if cache is not None:
+            cache.flush()
+        if stats.per_worker:
+            print(f"🔎 중복 검사 해시 처리량 ({workers}개 스레드):")
+            stats.print_report()
+
+def verify_probable_group(hash_key, paths, stats=None):
+    """
+    빠른 모드의 '추정 중복' 그룹을 lockstep 동시 비교로 전체 내용까지 검증하여
+    확정된 [(그룹 키, [경로...])] 목록을 반환 (샘플만 같고 내용이 다르면 여러 그룹으로 나뉘거나 빈 목록).
+    """
+    algorithm, _ = split_hash_key(hash_key)
+    if algorithm.startswith(QUICK_KEY_PREFIX):
+        algorithm = algorithm[len(QUICK_KEY_PREFIX):]
+    items = []
+    for path in paths:
+        try:
+            items.append((path, os.stat(path)))
+        except OSError as e:
+            print(f"❌ 오류 발생: {path} → {e}")
+    if len(items) < 2:
+        return []
+    try:
+        return [(make_hash_key(algorithm, digest), group_paths)
+                for digest, group_paths in compare_files_lockstep(items, algorithm=algorithm, stats=stats)]
+    finally:
+        cache = get_hash_cache()
+        if cache is not None:
+            cache.flush()
+
+def find_duplicate_files(folder_path, workers=None, stats=None, algorithm=None, verify=False, hardlinks=None,
+                         progress=None, cancel=None, out_of_core=False, archives=False, quick=False,
+                         scan_filter=None, partials=None, digests=None):
+    """
+    폴더(또는 FileIndex)를 스캔하여 (중복 딕셔너리, 총 파일 수, 총 용량)을 반환.
+    인자는 iter_duplicate_files와 같으며, 중지(cancel)되면 그때까지 확정된 그룹만 담아 반환합니다.
+    out_of_core=True이면 파일 목록/해시를 임시 SQLite 파일에 두는 iter_duplicate_files_out_of_core를 사용
+    (수천만 개 파일용, 폴더 경로를 넘겨야 메모리 절약 효과가 있음, 압축 내부 항목 검사/빠른 모드/partials/digests는 지원하지 않음)
+    반환값은 모든 그룹을 담은 딕셔너리이므로, 그룹까지 메모리에 두지 않으려면 iter_duplicate_files_out_of_core를 직접 사용
+    """
+    if out_of_core:
+        if isinstance(folder_path, FileIndex):
+            folder_path, scan_filter = folder_path.roots, folder_path.scan_filter
+        summary = {}
+        duplicates = dict(iter_duplicate_files_out_of_core(
+            folder_path, workers=workers, stats=stats, algorithm=algorithm, verify=verify, hardlinks=hardlinks,
+            summary=summary, progress=progress, cancel=cancel, scan_filter=scan_filter))
+        return duplicates, summary.get('total_files', 0), summary.get('total_size', 0)
+    file_index = as_file_index(folder_path, scan_filter)
+    duplicates = dict(iter_duplicate_files(file_index, workers=workers, stats=stats, algorithm=algorithm,
+                                           verify=verify, hardlinks=hardlinks, progress=progress, cancel=cancel,
+                                           archives=archives, quick=quick, partials=partials, digests=digests))
+    return duplicates, len(file_index), file_index.total_size
+
+
+# --- 대용량(수천만 개 파일) 중복 검사: 디스크 기반 인덱스 ---
+
+# 한 번에 메모리에 올리는 행 수 (삽입/해시 묶음 단위). 최대 메모리는 파일 수와 무관하게 이 값으로 제한됨
+OUT_OF_CORE_BATCH = 4096
+# 정렬/그룹화에 쓰는 SQLite 페이지 캐시 크기 (KB, 넘치면 임시 파일로 외부 정렬)
+OUT_OF_CORE_CACHE_KB = 16 * 1024
+
+def _open_scan_store(workdir):
+    """검사 한 번에 쓰고 버리는 SQLite 작업 파일을 연다 (저널/동기화 없이 속도 우선)"""
+    fd, db_path = tempfile.mkstemp(prefix="dupscan-", suffix=".db", dir=workdir or get_cache_dir())
+    os.close(fd)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=FILE")
+    conn.execute(f"PRAGMA cache_size=-{OUT_OF_CORE_CACHE_KB}")
+    conn.executescript("""
+        CREATE TABLE files (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            dev INTEGER NOT NULL,
+            ino INTEGER NOT NULL,
+            nlink INTEGER NOT NULL,
+            linked INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE partials (
+            file_id INTEGER PRIMARY KEY,
+            size INTEGER NOT NULL,
+            digest BLOB NOT NULL
+        );
+    """)
+    return conn, db_path
+
+def _iter_batches(cursor, key=None):
+    """커서 결과를 OUT_OF_CORE_BATCH개씩 묶어 yield (key가 있으면 같은 key의 행은 한 묶음에 유지)"""
+    batch = []
+    for row in cursor:
+        if key is not None and len(batch) >= OUT_OF_CORE_BATCH and key(row) != key(batch[-1]):
+            yield batch
+            batch = []
+        batch.append(row)
+        if key is None and len(batch) >= OUT_OF_CORE_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_duplicate_files_out_of_core(sources, workers=None, stats=None, algorithm=None, verify=False,
+                                     hardlinks=None, summary=None, progress=None, cancel=None, workdir=None,
+                                     scan_filter=None):
+    """
+    iter_duplicate_files와 같은 결과를 내지만, 파일 목록과 해시를 메모리 대신 임시 SQLite 파일에 두는 버전.
+    해시는 16진수 문자열 대신 바이너리(BLOB)로 저장하고, 크기/해시 충돌은 SQLite의 정렬(메모리를 넘치면
+    임시 파일로 외부 정렬)과 GROUP BY로 찾으므로, 최대 메모리가 파일 수와 무관하게 거의 일정합니다.
+    (FileIndex를 만들지 않으므로 폴더/파일 경로 목록을 직접 받습니다)
+
+    Parameters:
+    - sources: 폴더 또는 파일 경로 (또는 그 목록)
+    - workers, stats, algorithm, verify, hardlinks, progress, cancel: iter_duplicate_files와 동일
+    - summary: 딕셔너리를 넘기면 'total_files', 'total_size'(하드링크는 한 번만)가 채워집니다.
+    - workdir: 임시 작업 파일을 만들 폴더 (None이면 캐시 폴더, 검사가 끝나면 삭제)
+    - scan_filter: ScanFilter (제외 폴더 가지치기, 최소/최대 크기)
+    """
+    sources = normalize_roots(sources)
+    if algorithm is None:
+        algorithm = DEFAULT_HASH_ALGORITHM
+    new_hasher(algorithm)  # 지원하지 않는 알고리즘이면 스캔 전에 ValueError 발생
+    if workers is None:
+        workers = DEFAULT_HASH_WORKERS
+    if stats is None:
+        stats = HashWorkerStats()
+
+    conn, db_path = _open_scan_store(workdir)
+    try:
+        # 0단계: 폴더를 훑으며 (경로, 크기, inode)만 묶음 단위로 디스크에 기록
+        total_files = 0
+        for batch in _iter_batches(_iter_source_files(sources, scan_filter)):
+            if is_cancelled(cancel):
+                return
+            conn.executemany(
+                "INSERT OR IGNORE INTO files (path, size, dev, ino, nlink) VALUES (?, ?, ?, ?, ?)",
+                [(path, st.st_size, st.st_dev, st.st_ino, st.st_nlink) for path, st in batch])
+            total_files += len(batch)
+            report_progress(progress, 'index', total_files, total_files)
+
+        # 하드링크: inode당 첫 경로만 후보로 남기고 나머지는 linked로 표시
+        conn.execute("""
+            UPDATE files SET linked = 1
+            WHERE nlink > 1 AND ino != 0 AND id NOT IN (
+                SELECT MIN(id) FROM files WHERE nlink > 1 AND ino != 0 GROUP BY dev, ino)""")
+        if hardlinks is not None:
+            rows = conn.execute("""
+                SELECT dev, ino, path FROM files
+                WHERE (dev, ino) IN (SELECT dev, ino FROM files WHERE linked = 1)
+                ORDER BY dev, ino, id""")
+            for (dev, ino), group in itertools.groupby(rows, key=lambda row: row[:2]):
+                hardlinks[f"inode:{dev}:{ino}"] = [row[2] for row in group]
+        if summary is not None:
+            summary['total_files'], summary['total_size'] = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(CASE WHEN linked = 0 THEN size END), 0) FROM files").fetchone()
+
+        # 1단계: 크기가 같은 파일이 있는 크기만 추림 (SQLite가 정렬/그룹화)
+        conn.executescript("""
+            CREATE TEMP TABLE dup_sizes (size INTEGER PRIMARY KEY);
+            INSERT INTO dup_sizes SELECT size FROM files WHERE linked = 0 GROUP BY size HAVING COUNT(*) > 1;
+        """)
+        candidate_total = conn.execute(
+            "SELECT COUNT(*) FROM files WHERE linked = 0 AND size IN dup_sizes").fetchone()[0]
+
+        # 2단계: 후보의 앞/뒤 부분 해시를 묶음 단위로 병렬 계산하여 바이너리로 기록
+        done = 0
+        last_id = 0
+        while True:
+            batch = conn.execute("""
+                SELECT id, path, size FROM files
+                WHERE id > ? AND linked = 0 AND size IN dup_sizes
+                ORDER BY id LIMIT ?""", (last_id, OUT_OF_CORE_BATCH)).fetchall()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            partial_vals = _iter_hash_tasks(
+                lambda file_id, path, size: get_partial_hash(path, size, algorithm=algorithm, stats=stats),
+                batch, workers, describe=lambda item: item[1], cancel=cancel)
+            conn.executemany("INSERT INTO partials (file_id, size, digest) VALUES (?, ?, ?)",
+                             [(file_id, size, bytes.fromhex(partial_val))
+                              for (file_id, path, size), partial_val in zip(batch, partial_vals)
+                              if partial_val is not None])
+            if is_cancelled(cancel):
+                return
+            done += len(batch)
+            report_progress(progress, 'partial', done, candidate_total)
+
+        # 3단계: (크기, 부분 해시)가 겹치는 행만 정렬된 순서로 읽어, 연속된 같은 묶음 단위로 확정
+        conn.executescript("""
+            CREATE INDEX partials_key ON partials (size, digest);
+            CREATE TEMP TABLE dup_partials AS
+                SELECT size, digest FROM partials GROUP BY size, digest HAVING COUNT(*) > 1;
+        """)
+        total = conn.execute("""
+            SELECT COUNT(*) FROM partials WHERE (size, digest) IN dup_partials""").fetchone()[0]
+        rows = conn.execute("""
+            SELECT p.size, p.digest, f.path FROM partials p JOIN files f ON f.id = p.file_id
+            WHERE (p.size, p.digest) IN dup_partials
+            ORDER BY p.size, p.digest, f.id""")
+
+        previous_size = None
+        emitted_keys = set()
+        def unique_key(size, digest):
+            # 해시가 같은 그룹은 크기도 같으므로, 키 중복 검사는 같은 크기 안에서만 하면 됨
+            nonlocal previous_size
+            if size != previous_size:
+                emitted_keys.clear()
+                previous_size = size
+            hash_key = make_hash_key(algorithm, digest)
+            suffix = 1
+            while hash_key in emitted_keys:
+                hash_key = f"{make_hash_key(algorithm, digest)}#{suffix}"
+                suffix += 1
+            emitted_keys.add(hash_key)
+            return hash_key
+
+        done = 0
+        for batch in _iter_batches(rows, key=lambda row: row[:2]):
+            buckets = [(key[0], [row[2] for row in group])
+                       for key, group in itertools.groupby(batch, key=lambda row: row[:2])]
+            if verify:
+                # 정확 모드: 묶음마다 lockstep 동시 비교 (묶음 단위로 병렬 실행)
+                results = _iter_hash_tasks(
+                    lambda bucket: compare_files_lockstep([(path, None) for path in bucket],
+                                                          algorithm=algorithm, stats=stats),
+                    [(bucket,) for _, bucket in buckets], workers, describe=lambda item: item[0][0], cancel=cancel)
+                for (size, _), groups in zip(buckets, results):
+                    if is_cancelled(cancel):
+                        results.close()
+                        return
+                    for digest, paths in groups or []:
+                        yield unique_key(size, digest), paths
+            else:
+                digests = _iter_hash_tasks(
+                    lambda path: get_file_hash(path, algorithm=algorithm, stats=stats),
+                    [(path,) for _, bucket in buckets for path in bucket], workers, cancel=cancel)
+                for size, bucket in buckets:
+                    hash_map = defaultdict(list)
+                    for path in bucket:
+                        digest = next(digests)
+                        if digest is not None:
+                            hash_map[digest].append(path)
+                    if is_cancelled(cancel):
+                        digests.close()
+                        return
+                    for digest, paths in hash_map.items():
+                        if len(paths) > 1:
+                            yield unique_key(size, digest), paths
+            done += len(batch)
+            report_progress(progress, 'full', done, total)
+    finally:
+        conn.close()
+        try:
+            os.remove(db_path)
+        except OSError:
+            pass
+        cache = get_hash_cache()
+        if cache is not None:
+            cache.flush()
+        if stats.per_worker:
+            print(f"🔎 중복 검사 해시 처리량 ({workers}개 스레드):")
+            stats.print_report()
+
+
+def benchmark_duplicate_memory(sources, out_of_core=True, workers=None):
+    """
+    중복 검사 한 번의 파이썬 힙 최대 사용량(tracemalloc)을 재어 (그룹 수, 파일 수, 최대 바이트)를 반환.
+    그룹은 세기만 하고 모으지 않으므로 인덱스 자체의 메모리를 비교할 수 있습니다.
+    (SQLite 페이지 캐시는 파이썬 힙 밖이지만 OUT_OF_CORE_CACHE_KB로 제한됨)
+    """
+    import tracemalloc
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        if out_of_core:
+            summary = {}
+            groups = sum(1 for _ in iter_duplicate_files_out_of_core(sources, workers=workers, summary=summary))
+            total_files = summary.get('total_files', 0)
+        else:
+            file_index = FileIndex(sources)
+            groups = sum(1 for _ in iter_duplicate_files(file_index, workers=workers))
+            total_files = len(file_index)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    mode = "디스크 인덱스" if out_of_core else "메모리 인덱스"
+    print(f"📈 중복 검사 메모리 ({mode}): 파일 {total_files}개, 그룹 {groups}개, "
+          f"최대 {format_bytes(peak)}, {time.perf_counter() - started:.2f}초")
+    return groups, total_files, peak
+
+# --- 중복 파일을 링크로 대체 (삭제 없이 용량 확보) ---
+
+def _reflink(source, target):
+    """source를 target으로 copy-on-write 복제 (Btrfs/XFS: FICLONE, APFS: clonefile)"""
+    if sys.platform.startswith('linux'):
+        import fcntl
+        FICLONE = 0x40049409
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    elif sys.platform == 'darwin':
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(target), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), target)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "이 운영체제에서는 reflink를 지원하지 않습니다.", target)
+
+def get_reclaimed_size(linked_paths):
+    """하드링크 그룹(같은 inode의 경로들)이 이미 절약하고 있는 용량을 반환"""
+    try:
+        return os.stat(linked_paths[0]).st_size * (len(linked_paths) - 1)
+    except OSError:
+        return 0
+
+def link_duplicate_file(source, target, mode='auto'):
+    """
+    내용이 같은 target 파일을 source에 대한 링크로 바꿔 경로는 그대로 두고 용량만 확보.
+    - mode: 'hardlink', 'reflink', 'auto'(reflink를 먼저 시도하고 안 되면 하드링크)
+    실제로 사용한 방식('hardlink' 또는 'reflink')을 반환하며, 이미 같은 inode면 'hardlink'를 반환합니다.
+    내용이 다르거나 링크할 수 없으면 예외가 발생하고 target은 바뀌지 않습니다.
+    """
+    if mode not in ('auto', 'hardlink', 'reflink'):
+        raise ValueError(f"지원하지 않는 링크 방식: {mode}")
+    src_st = os.stat(source)
+    dst_st = os.stat(target)
+    if (src_st.st_dev, src_st.st_ino) == (dst_st.st_dev, dst_st.st_ino):
+        return 'hardlink'
+    # 링크 직전에 바이트 단위로 다시 확인 (스캔 이후 파일이 바뀌었을 수 있음)
+    if src_st.st_size != dst_st.st_size or \
+            len(compare_files_lockstep([(source, None), (target, None)], use_cache=False)) != 1:
+        raise ValueError(f"내용이 같지 않아 링크할 수 없습니다: {target}")
+
+    temp_path = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.iqa-link-{os.getpid()}")
+    try:
+        used = None
+        if mode in ('auto', 'reflink'):
+            try:
+                _reflink(source, temp_path)
+                shutil.copystat(target, temp_path)  # reflink는 새 파일이므로 원래 권한/시각 유지
+                used = 'reflink'
+            except OSError:
+                if os.path.lexists(temp_path):
+                    os.remove(temp_path)
+                if mode == 'reflink':
+                    raise
+        if used is None:
+            if src_st.st_dev != dst_st.st_dev:
+                raise OSError(errno.EXDEV, "다른 드라이브의 파일은 하드링크할 수 없습니다.", target)
+            os.link(source, temp_path)
+            used = 'hardlink'
+        # 임시 링크를 원래 이름으로 원자적으로 교체 (중간에 실패해도 target은 그대로)
+        os.replace(temp_path, target)
+        return used
+    finally:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+
+
+def plan_duplicate_links(group_paths, selected_paths):
+    """
+    한 중복 그룹에서 선택한 파일을 링크로 대체할 계획을 (원본, [대상...])으로 반환.
+    원본은 선택하지 않은 첫 파일이며, 그룹 전체를 선택했다면 첫 파일을 원본으로 남깁니다. (대상에서 제외)
+    압축 파일 안의 항목은 원본/대상이 될 수 없고, 이미 원본과 같은 inode인 대상은 확보할 용량이 없으므로 제외합니다.
+    원본을 정할 수 없으면 (None, [])
+    """
+    candidates = [path for path in group_paths if not is_archive_member_path(path)]
+    unselected = [path for path in candidates if path not in selected_paths]
+    if not candidates:
+        return None, []
+    source = (unselected or candidates)[0]
+    try:
+        src_st = os.stat(source)
+    except OSError:
+        return None, []
+    targets = []
+    for path in candidates:
+        if path == source or path not in selected_paths:
+            continue
+        try:
+            st = os.stat(path)
+            if (st.st_dev, st.st_ino) == (src_st.st_dev, src_st.st_ino):
+                continue
+        except OSError:
+            pass  # 링크 단계에서 오류로 보고됨
+        targets.append(path)
+    return source, targets
+
+# --- 실시간 감시 모드 (변경된 파일만 다시 계산) ---
+
+class DuplicateTracker:
+    """
+    중복 그룹과 통계(StatisticsWidget에 표시하는 값)를 파일 변경 단위로 갱신하는 상태 객체.
+    처음 한 번은 find_duplicate_files로 전체를 계산하고, 이후에는 update()/remove()로
+    바뀐 파일과 같은 크기의 파일만 다시 확인합니다. 이때도 부분 해시로 먼저 거르고, 부분 해시까지 겹치는
+    파일만 전체 해시합니다. (해시는 HashCache를 거치므로 대부분 캐시 조회)
+    전체 계산은 시간이 걸리므로 UI에서는 백그라운드 스레드에서 만들고, cancel(CancelToken)로 중지할 수 있습니다.
+    """
+    def __init__(self, source, algorithm=None, scan_filter=None, cancel=None):
+        self.algorithm = algorithm or DEFAULT_HASH_ALGORITHM
+        self.scan_filter = scan_filter
+        self.build(source, cancel)
+
+    def build(self, source, cancel=None):
+        """전체 상태를 처음부터 다시 계산 (FileIndex를 넘기면 그 인덱스의 루트/필터를 이어서 사용)"""
+        file_index = as_file_index(source, self.scan_filter)
+        self.roots = file_index.roots
+        self.scan_filter = file_index.scan_filter
+        self.entries = {}                 # 경로 → stat (대표 경로만)
+        self.by_size = defaultdict(dict)  # 크기 → {경로: None} (순서 유지용 dict)
+        self.partials = {}                # 경로 → 부분 해시 (계산한 파일만)
+        self.digests = {}                 # 경로 → 중복 그룹 키 (해시한 파일만)
+        self.groups = defaultdict(dict)   # 그룹 키 → {경로: None}
+        self.group_info = {}              # 그룹 키 → (파일 크기, 카테고리)
+        self.links = {}                   # (dev, ino) → [경로...] (첫 경로가 대표)
+        self.alias_of = {}                # 대표가 아닌 하드링크 경로 → (dev, ino)
+        self.touched = set()              # 마지막 apply()에서 표시 내용(2개 이상인 그룹)이 바뀐 그룹 키
+        self.total_files = 0
+        self.total_size = 0
+        self.total_duplicates = 0
+        self.total_dup_space = 0
+        self.space_by_category = defaultdict(int)
+
+        partials, digests = {}, {}
+        duplicates, _, _ = find_duplicate_files(file_index, algorithm=self.algorithm, cancel=cancel,
+                                                partials=partials, digests=digests)
+        for entry in file_index:
+            self._add(entry.path, entry.st, check_duplicates=False)
+        for hash_key, paths in duplicates.items():
+            for path in paths:
+                self._join_group(path, hash_key)
+        # 검사 중에 이미 계산한 해시(중복이 아닌 파일 포함)도 기록 → 나중에 같은 크기 파일이 생겨도 다시 읽지 않음
+        for path, digest in digests.items():
+            if path in self.entries and path not in self.digests:
+                self._join_group(path, make_hash_key(self.algorithm, digest))
+        self.partials = {path: value for path, value in partials.items() if path in self.entries}
+
+    # --- 조회 ---
+    @property
+    def duplicates(self):
+        """find_duplicate_files와 같은 형식의 중복 딕셔너리"""
+        return {key: list(paths) for key, paths in self.groups.items() if len(paths) > 1}
+
+    @property
+    def hardlinks(self):
+        return {f"inode:{dev}:{ino}": list(paths) for (dev, ino), paths in self.links.items() if len(paths) > 1}
+
+    def stats(self):
+        """StatisticsWidget.update_stats에 그대로 넘길 수 있는 통계 딕셔너리"""
+        linked = [paths for paths in self.links.values() if len(paths) > 1]
+        return {
+            'total_files': self.total_files,
+            'total_size': self.total_size,
+            'total_duplicates': self.total_duplicates,
+            'total_dup_space': self.total_dup_space,
+            'space_by_category': {category: space for category, space in self.space_by_category.items() if space},
+            'linked_files': sum(len(paths) - 1 for paths in linked),
+            'linked_space': sum(self.entries[paths[0]].st_size * (len(paths) - 1)
+                                for paths in linked if paths[0] in self.entries),
+        }
+
+    # --- 변경 반영 ---
+    def apply(self, changed, deleted, deleted_dirs=()):
+        """
+        감시자가 보고한 변경(생성/수정된 경로, 삭제된 경로, 삭제/이동된 폴더)을 반영하고,
+        중복 그룹 구성이 바뀐 그룹 키 집합을 반환 (화면에서는 이 그룹의 행만 다시 그림. 통계는 stats()로 다시 읽음).
+        파일 하나의 변경은 그 파일과 같은 크기 파일만 확인하고, 폴더 아래 전체를 훑는 것은 폴더 이벤트일 때뿐
+        """
+        self.touched = set()
+        for path in deleted_dirs:
+            self.remove_tree(path)
+        for path in deleted:
+            self.remove(path)
+        for path in changed:
+            self.update(path)
+        cache = get_hash_cache()
+        if cache is not None:
+            cache.flush()
+        return self.touched
+
+    def update(self, path):
+        """생성/수정된 파일 하나를 반영 (없어졌으면 삭제로 처리)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.remove(path)
+            return
+        if os.path.isdir(path):
+            return
+        if self.scan_filter is not None and not self.scan_filter.accepts(path, st, self.roots):
+            # 제외 폴더 안이거나 크기 범위를 벗어난 파일 (범위 밖으로 바뀐 파일이면 목록에서 제거)
+            self.remove(path)
+            return
+        inode_key = self.alias_of.get(path)
+        if inode_key is not None and (st.st_dev, st.st_ino) == inode_key:
+            # 하드링크 별칭을 고쳐 쓰면 같은 inode인 대표 경로의 내용이 바뀐 것이므로 대표를 다시 확인
+            path = self.links[inode_key][0]
+        old_st = self.entries.get(path)
+        if old_st is not None and _is_same_file_state(old_st, st):
+            return
+        if old_st is not None and (old_st.st_dev, old_st.st_ino) == (st.st_dev, st.st_ino):
+            # 같은 파일의 내용만 바뀜: 하드링크 대표 자리는 그대로 두고 해시만 다시 확인
+            self._detach_entry(path)
+            self._insert_entry(path, st, check_duplicates=True)
+            return
+        if path in self.entries or path in self.alias_of:
+            self.remove(path)  # 다른 파일로 바뀜 (예: 다른 파일을 이 이름으로 옮겨 옴)
+        self._add(path, st, check_duplicates=True)
+
+    def remove(self, path):
+        """삭제된 파일 하나를 반영 (추적하지 않는 경로면 아무것도 하지 않음)"""
+        inode_key = self.alias_of.pop(path, None)
+        if inode_key is not None:
+            # 대표가 아닌 하드링크 경로: 목록에서만 제거
+            self.total_files -= 1
+            self.links[inode_key].remove(path)
+            return
+        st = self.entries.get(path)
+        if st is None:
+            return
+        self.total_files -= 1
+        inode_key = (st.st_dev, st.st_ino) if st.st_ino else None
+        partial, hash_key = self._detach_entry(path)
+        if inode_key in self.links:
+            paths = self.links[inode_key]
+            paths.remove(path)
+            if paths:
+                self._promote(paths[0], st, partial, hash_key)
+            else:
+                del self.links[inode_key]
+
+    def remove_tree(self, dir_path):
+        """삭제되거나 밖으로 옮겨진 폴더 아래의 추적 중인 파일을 모두 반영"""
+        prefix = dir_path.rstrip(os.sep) + os.sep
+        for path in [p for p in itertools.chain(self.entries, self.alias_of) if p.startswith(prefix)]:
+            self.remove(path)
+
+    def _detach_entry(self, path):
+        """대표 경로를 크기 묶음/그룹/용량에서 빼고 (부분 해시, 그룹 키)를 반환 (파일 수와 하드링크 목록은 그대로)"""
+        st = self.entries.pop(path)
+        hash_key = self.digests.get(path)
+        partial = self.partials.pop(path, None)
+        self._leave_group(path)
+        self.by_size[st.st_size].pop(path, None)
+        if not self.by_size[st.st_size]:
+            del self.by_size[st.st_size]
+        self.total_size -= st.st_size
+        return partial, hash_key
+
+    def _add(self, path, st, check_duplicates):
+        self.total_files += 1
+        if st.st_nlink > 1 and st.st_ino:
+            inode_key = (st.st_dev, st.st_ino)
+            paths = self.links.get(inode_key)
+            if paths is None:
+                # 이미 추적 중인 파일에 하드링크가 새로 생긴 경우: 같은 크기 묶음에서 같은 inode를 찾음
+                paths = [other for other in self.by_size.get(st.st_size, ())
+                         if (self.entries[other].st_dev, self.entries[other].st_ino) == inode_key]
+                self.links[inode_key] = paths
+            paths.append(path)
+            if len(paths) > 1:
+                self.alias_of[path] = inode_key
+                return  # 이미 대표 경로가 있는 하드링크: 해시/용량 계산에서 제외
+        self._insert_entry(path, st, check_duplicates)
+
+    def _promote(self, path, st, partial, hash_key):
+        """
+        하드링크 대표가 지워졌을 때 같은 inode의 다음 경로(links[...][0])를 대표로 올림.
+        내용이 같으므로 지워진 대표의 부분 해시/그룹을 그대로 이어받음 (파일 수는 별칭일 때 이미 세어져 있음)
+        """
+        self.alias_of.pop(path, None)
+        try:
+            st = os.stat(path)
+        except OSError:
+            pass  # 함께 지워졌으면 곧 삭제 이벤트로 반영됨
+        if partial is not None:
+            self.partials[path] = partial
+        self._insert_entry(path, st, check_duplicates=hash_key is None)
+        if hash_key is not None:
+            self._join_group(path, hash_key)
+
+    def _insert_entry(self, path, st, check_duplicates):
+        """대표 경로를 크기 묶음에 넣고, check_duplicates면 같은 크기 파일과 비교하여 그룹에 넣음"""
+        self.entries[path] = st
+        self.total_size += st.st_size
+        bucket = self.by_size[st.st_size]
+        bucket[path] = None
+        if check_duplicates and len(bucket) > 1:
+            # 같은 크기 파일 중 부분 해시까지 겹치는 파일만 전체 해시 (변경 수에 비례하는 비용)
+            partial = self._partial_hash(path)
+            if partial is None:
+                return
+            colliding = [other for other in bucket if other != path and self._partial_hash(other) == partial]
+            if not colliding:
+                return
+            for other in [path] + colliding:
+                if other in self.digests: continue
+                try:
+                    digest = get_file_hash(other, algorithm=self.algorithm, st=self.entries[other])
+                except OSError as e:
+                    print(f"❌ 오류 발생: {other} → {e}")
+                    continue
+                self._join_group(other, make_hash_key(self.algorithm, digest))
+
+    def _partial_hash(self, path):
+        """부분 해시 (한 번 구한 값은 기억하며, 파일이 바뀌면 remove()에서 지워짐)"""
+        partial = self.partials.get(path)
+        if partial is None:
+            st = self.entries[path]
+            try:
+                partial = get_partial_hash(path, st.st_size, algorithm=self.algorithm, st=st)
+            except OSError as e:
+                print(f"❌ 오류 발생: {path} → {e}")
+                return None
+            self.partials[path] = partial
+        return partial
+
+    def _join_group(self, path, hash_key):
+        group = self.groups[hash_key]
+        if hash_key not in self.group_info:
+            self.group_info[hash_key] = (self.entries[path].st_size, get_file_category(path))
+        self.digests[path] = hash_key
+        before = len(group)
+        group[path] = None
+        self._adjust_counts(hash_key, before, len(group))
+
+    def _leave_group(self, path):
+        hash_key = self.digests.pop(path, None)
+        if hash_key is None:
+            return
+        group = self.groups[hash_key]
+        before = len(group)
+        group.pop(path, None)
+        self._adjust_counts(hash_key, before, len(group))
+        if not group:
+            del self.groups[hash_key]
+            del self.group_info[hash_key]
+
+    def _adjust_counts(self, hash_key, before, after):
+        if before > 1 or after > 1:
+            self.touched.add(hash_key)
+        file_size, category = self.group_info[hash_key]
+        delta = max(after - 1, 0) - max(before - 1, 0)
+        self.total_duplicates += delta
+        self.total_dup_space += delta * file_size
+        self.space_by_category[category] += delta * file_size
+
+class _Inotify:
+    """Linux inotify를 ctypes로 감싼 최소 구현 (추가 라이브러리 없이 사용)"""
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self.ctypes = ctypes
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.wd_paths = {}
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            err = self.ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self.wd_paths[wd] = path
+
+    def add_tree(self, root, scan_filter=None):
+        """root와 모든 하위 폴더에 감시 등록 (폴더 심볼릭 링크는 따라가지 않고, 제외 폴더는 가지치기)"""
+        self.add_watch(root)
+        for dirpath, dirnames, _ in os.walk(root):
+            if scan_filter is not None:
+                dirnames[:] = [dirname for dirname in dirnames
+                               if not scan_filter.excludes(os.path.join(dirpath, dirname), dirname)]
+            for dirname in dirnames:
+                self.add_watch(os.path.join(dirpath, dirname))
+
+    def read_events(self):
+        """대기 중인 이벤트를 (경로, mask) 목록으로 반환 (없으면 빈 목록, 블로킹하지 않음)"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                base = self.wd_paths.get(wd)
+                if mask & self.IN_IGNORED:
+                    self.wd_paths.pop(wd, None)
+                if mask & self.IN_Q_OVERFLOW or base is not None:
+                    events.append((os.path.join(base, name) if base and name else base, mask))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class FolderWatcher:
+    """
+    폴더 변경 감시자. Linux에서는 inotify, 그 외 환경이나 inotify를 쓸 수 없으면 주기적 재스캔(폴링)을 사용.
+    poll()을 주기적으로 호출하면 (변경/생성된 경로, 삭제된 경로, 삭제/이동된 폴더, 전체 재계산 필요 여부)를 돌려줍니다.
+    (폴링 방식은 파일 단위로 비교하므로 폴더 목록은 항상 비어 있음)
+    """
+    def __init__(self, root, poll_interval=5.0, use_inotify=True, scan_filter=None):
+        self.roots = normalize_roots(root)
+        self.scan_filter = scan_filter
+        self.poll_interval = poll_interval
+        self.inotify = None
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self.inotify = _Inotify()
+                for watch_root in self.roots:
+                    self.inotify.add_tree(watch_root, scan_filter)
+            except OSError as e:
+                # 감시 개수 제한(max_user_watches) 초과 등
+                print(f"⚠️ inotify를 사용할 수 없어 폴링 방식으로 감시합니다: {e}")
+                if self.inotify is not None:
+                    self.inotify.close()
+                self.inotify = None
+        self.mode = 'inotify' if self.inotify is not None else 'polling'
+        self.last_poll = time.monotonic()
+        self.snapshot = {} if self.inotify is not None else self._take_snapshot()
+
+    def _take_snapshot(self):
+        return {entry.path: (entry.st.st_size, entry.st.st_mtime_ns, entry.st.st_ino)
+                for entry in FileIndex(self.roots, self.scan_filter)}
+
+    def poll(self):
+        if self.inotify is not None:
+            return self._poll_inotify()
+        return self._poll_snapshot()
+
+    def _poll_inotify(self):
+        changed, deleted, deleted_dirs, resync = set(), set(), set(), False
+        ino = self.inotify
+        for path, mask in ino.read_events():
+            if mask & ino.IN_Q_OVERFLOW:
+                resync = True
+                continue
+            if mask & ino.IN_ISDIR:
+                if mask & (ino.IN_CREATE | ino.IN_MOVED_TO):
+                    if self.scan_filter is not None and self.scan_filter.excludes(path):
+                        continue  # 새로 생긴 제외 폴더(예: node_modules)는 감시하지 않음
+                    # 새로 생기거나 옮겨 온 폴더: 감시를 추가하고 안의 파일을 모두 반영
+                    try:
+                        ino.add_tree(path, self.scan_filter)
+                    except OSError as e:
+                        print(f"⚠️ 폴더 감시 추가 실패: {path} → {e}")
+                        resync = True
+                    for entry in FileIndex(path, self.scan_filter):
+                        changed.add(entry.path)
+                        deleted.discard(entry.path)
+                elif mask & (ino.IN_DELETE | ino.IN_MOVED_FROM):
+                    deleted_dirs.add(path)
+            elif mask & (ino.IN_DELETE_SELF | ino.IN_MOVE_SELF):
+                if path in self.roots:
+                    resync = True
+            elif mask & (ino.IN_CLOSE_WRITE | ino.IN_MOVED_TO | ino.IN_CREATE):
+                changed.add(path)
+                deleted.discard(path)
+            elif mask & (ino.IN_DELETE | ino.IN_MOVED_FROM):
+                deleted.add(path)
+                changed.discard(path)
+        return changed, deleted, deleted_dirs, resync
+
+    def _poll_snapshot(self):
+        now = time.monotonic()
+        if now - self.last_poll < self.poll_interval:
+            return set(), set(), set(), False
+        self.last_poll = now
+        snapshot = self._take_snapshot()
+        changed = {path for path, state in snapshot.items() if self.snapshot.get(path) != state}
+        deleted = set(self.snapshot) - set(snapshot)
+        self.snapshot = snapshot
+        return changed, deleted, set(), False
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+
+# --- 유사 이미지 스캔 (SimilarImageScanPage) 로직 ---
+
+def get_image_similarity(file1_path, file2_path):
+    """
+    [수정] 두 이미지 파일의 SSIM, pHash 유사도를 반환: (SSIM %, pHash 유사도 %, 해밍 거리)
+    pHash는 해시 캐시에서, SSIM용 고정 크기 흑백 축소본은 축소본 저장소에서 읽음 (없으면 계산하여 저장)
+    """
+    try:
+        hashes = compute_image_hashes([file1_path, file2_path])
+        if len(hashes) < 2:
+            raise ValueError("이미지 해시 계산 실패")
+        hash_diff = hashes[file1_path] - hashes[file2_path]
+        phash_similarity = (64 - hash_diff) / 64 * 100
+        ssim_score = compute_pair_ssim(get_gray_thumbnails([file1_path, file2_path]), [(file1_path, file2_path)])[0]
+        if ssim_score is None:
+            raise ValueError("축소본 생성 실패")
+        return (ssim_score, phash_similarity, hash_diff)
+    except Exception as e:
+        print(f"Similarity error: {e}")
+        return (None, None, None)
+
+# --- 프로세스 풀 지문 계산 ---
+
+# 이미지 디코딩+DCT는 GIL을 잡고 있어 스레드로는 코어 하나만 쓰므로, 이미지 지문은 프로세스 풀에서 계산
+DEFAULT_FINGERPRINT_WORKERS = os.cpu_count() or 1
+# 이보다 파일이 적으면 현재 프로세스에서 계산 (풀을 처음 만들 때 작업 프로세스마다 모듈 임포트에 1~2초가 들고,
+# 적은 파일은 프로세스 간 전달 비용이 계산보다 큼)
+PROCESS_POOL_MIN_ITEMS = 256
+# 작업 하나로 묶어 보내는 파일 수 (프로세스 간 전달 비용을 나눠 줄이면서, 중지 요청에는 빨리 반응할 정도의 크기)
+PROCESS_POOL_CHUNK_SIZE = 16
+
+_process_pool = None
+_process_pool_failed = False
+_process_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """
+    지문 계산용 전역 프로세스 풀 (처음 필요할 때 한 번 만들어 검사/썸네일 계산마다 재사용, 만들 수 없으면 None).
+    GUI 프로세스는 Qt/작업 스레드가 떠 있어 fork하면 잠금 상태까지 복제되므로, 운영체제와 무관하게 spawn으로 시작
+    """
+    global _process_pool, _process_pool_failed
+    with _process_pool_lock:
+        if _process_pool is None and not _process_pool_failed:
+            try:
+                _process_pool = ProcessPoolExecutor(max_workers=DEFAULT_FINGERPRINT_WORKERS,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+            except (OSError, NotImplementedError, ValueError) as e:
+                _process_pool_failed = True
+                print(f"⚠️ 프로세스 풀을 만들 수 없어 현재 프로세스에서 계산합니다: {e}")
+    return _process_pool
+
+def reset_process_pool(pool):
+    """작업 프로세스가 죽은 풀을 버림 (다음 get_process_pool() 호출 때 새로 만듦)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _fingerprint_chunk(func, paths):
+    """작업 프로세스에서 실행: 경로 묶음의 (경로, 결과, 오류 메시지) 목록"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, func(path), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+def iter_fingerprints(paths, func, workers=1, ordered=True, cancel=None, chunk_size=PROCESS_POOL_CHUNK_SIZE):
+    """
+    경로마다 func(경로)를 계산하여 (경로, 결과, 오류 메시지)를 하나씩 yield (오류가 없으면 메시지는 None).
+    workers가 2 이상이고 파일이 PROCESS_POOL_MIN_ITEMS개 이상이면 전역 프로세스 풀에서 chunk_size개씩 나눠 계산합니다.
+    (한 번에 workers × 2 묶음까지만 제출하므로, workers는 이번 계산이 동시에 쓰는 작업 프로세스 수의 상한)
+    - ordered: True면 입력 순서대로, False면 먼저 끝난 묶음부터 yield
+    - func는 작업 프로세스로 pickle되어 전달되므로 모듈 최상위 함수여야 함
+    - 풀을 만들 수 없거나 작업 프로세스가 죽으면 남은 파일은 현재 프로세스에서 계산
+    """
+    paths = list(paths)
+    executor = get_process_pool() if workers > 1 and len(paths) >= PROCESS_POOL_MIN_ITEMS else None
+    if executor is None:
+        for path in paths:
+            if is_cancelled(cancel):
+                return
+            yield from _fingerprint_chunk(func, [path])
+        return
+
+    remaining = deque(paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size))
+    in_flight = {}  # future → 경로 묶음 (제출 순서 유지)
+    try:
+        while remaining or in_flight:
+            try:
+                # 한 번에 작업자 수의 2배까지만 제출해 두어, 중지 시 버려지는 작업과 결과 대기 메모리를 제한
+                while remaining and len(in_flight) < workers * 2 and not is_cancelled(cancel):
+                    in_flight[executor.submit(_fingerprint_chunk, func, remaining[0])] = remaining[0]
+                    remaining.popleft()  # 제출에 성공한 묶음만 꺼냄 (제출 중 풀이 깨지면 남은 목록에 그대로 둠)
+                if not in_flight:
+                    return
+                if ordered:
+                    done = [next(iter(in_flight))]
+                else:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                finished = [(future, future.result()) for future in done]
+            except BrokenProcessPool as e:
+                print(f"⚠️ 작업 프로세스가 비정상 종료되어 남은 파일은 현재 프로세스에서 계산합니다: {e}")
+                reset_process_pool(executor)
+                rest = list(in_flight.values()) + list(remaining)
+                in_flight.clear()
+                remaining.clear()
+                for path in itertools.chain.from_iterable(rest):
+                    if is_cancelled(cancel):
+                        return
+                    yield from _fingerprint_chunk(func, [path])
+                return
+            for future, results in finished:
+                del in_flight[future]
+                yield from results
+            if is_cancelled(cancel):
+                return
+    finally:
+        # 소비자가 중간에 멈추면(중지/제너레이터 종료) 아직 시작하지 않은 묶음은 취소 (풀은 다음 계산에 재사용)
+        for future in in_flight:
+            future.cancel()
+
+def compute_fingerprints(paths, func, stage, progress=None, cancel=None, error_label="해시 생성 오류", workers=1):
+    """
+    경로마다 func(경로)로 지문(해시/텍스트 등)을 계산하여 {경로: 결과}를 반환 (입력 순서 유지).
+    실패하거나 결과가 비어 있는 파일은 제외하며, 진행률 보고와 중지를 지원합니다.
+    workers가 2 이상이면 iter_fingerprints의 프로세스 풀에서 계산 (func는 모듈 최상위 함수)
+    """
+    fingerprints = {}
+    results = iter_fingerprints(paths, func, workers, ordered=False, cancel=cancel)
+    for done, (full_path, value, error) in enumerate(results, 1):
+        if error is not None:
+            print(f"❌ {error_label}: {full_path} → {error}")
+        elif value:
+            fingerprints[full_path] = value
+        report_progress(progress, stage, done, len(paths))
+    # 먼저 끝난 묶음부터 받았으므로 입력 순서로 되돌림 (그룹 순서가 실행마다 달라지지 않도록)
+    return {path: fingerprints[path] for path in paths if path in fingerprints}
+
+# --- 내장 미리보기(EXIF/TIFF) 읽기 ---
+
+# RAW(TIFF 구조) 파일의 내장 미리보기 JPEG가 있으면, 원본 대신 그것만 읽어 디코딩
+# (파일 앞부분과 미리보기 구간만 읽으므로 원본 전체를 읽고 디코딩하는 것보다 몇 배 빠름)
+# 일반 JPEG의 EXIF 썸네일은 보정/자르기 후에도 예전 그대로 남는 경우가 있어 지문 계산에는 쓰지 않고,
+# 1/8 축소 디코딩(open_reduced_image)을 사용 (미리보기 화면 표시에만 사용)
+RAW_IMAGE_EXTENSIONS = ('.cr2', '.nef', '.nrw', '.arw', '.dng', '.pef')
+# 지문 계산에 쓸 내장 미리보기의 최소 크기 (짧은 변, 픽셀). pHash는 32×32만 쓰므로 작은 미리보기(160×120)도 충분
+EMBEDDED_PREVIEW_MIN_SIZE = 120
+# 지문/축소본 캐시 종류에 넣는 디코딩 원본 정책 (미리보기를 쓰는 형식이나 최소 크기가 바뀌면 이전 캐시 값을 무효화)
+IMAGE_DECODE_SOURCE = f"rawpreview{EMBEDDED_PREVIEW_MIN_SIZE}"
+# 미리보기 가로세로 비율이 원본과 이만큼(비율) 넘게 다르면 사용하지 않음 (일부 카메라는 썸네일에 검은 띠를 넣어 4:3으로 맞춤)
+EMBEDDED_PREVIEW_ASPECT_TOLERANCE = 0.02
+# JPEG에서 EXIF(APP1)를 찾을 때 훑어보는 앞부분 마커 수 (EXIF는 보통 첫 번째 마커)
+_JPEG_MAX_HEADER_SEGMENTS = 16
+_TIFF_MAX_IFDS = 64
+
+def _find_jpeg_exif_base(f):
+    """JPEG 파일의 EXIF(APP1) 안 TIFF 헤더 위치 (없으면 None). f는 SOI 바로 뒤를 가리켜야 함"""
+    for _ in range(_JPEG_MAX_HEADER_SEGMENTS):
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker, length = header[1], struct.unpack('>H', header[2:])[0]
+        if marker == 0xDA:  # 영상 데이터 시작(SOS): 더 이상 헤더 없음
+            return None
+        if marker == 0xE1 and f.read(6) == b'Exif\x00\x00':
+            return f.tell()
+        f.seek(f.tell() - (6 if marker == 0xE1 else 0) + length - 2)
+    return None
+
+def _iter_tiff_ifds(f, base):
+    """TIFF 구조의 IFD를 차례로 읽어 {태그: 값 튜플}을 yield (다음 IFD 연결과 SubIFD/EXIF IFD까지 따라감, SHORT/LONG 태그만)"""
+    f.seek(base)
+    header = f.read(8)
+    if header[:4] not in (b'II*\x00', b'MM\x00*'):
+        return
+    endian = '<' if header[:2] == b'II' else '>'
+    pending = [struct.unpack(endian + 'I', header[4:8])[0]]
+    visited = set()
+    while pending and len(visited) < _TIFF_MAX_IFDS:
+        offset = pending.pop(0)
+        if not offset or offset in visited:
+            continue
+        visited.add(offset)
+        f.seek(base + offset)
+        raw = f.read(2)
+        if len(raw) < 2:
+            continue
+        count = struct.unpack(endian + 'H', raw)[0]
+        entries = f.read(count * 12 + 4)
+        if len(entries) < count * 12 + 4:
+            continue
+        tags = {}
+        for k in range(count):
+            entry = entries[k * 12:k * 12 + 12]
+            tag, value_type, n = struct.unpack(endian + 'HHI', entry[:8])
+            # 필요한 태그(위치/길이/압축 방식/하위 IFD)는 모두 SHORT(3)/LONG(4)/IFD(13)
+            if value_type not in (3, 4, 13) or n > 1024:
+                continue
+            size = 2 if value_type == 3 else 4
+            if size * n <= 4:
+                data = entry[8:8 + size * n]
+            else:
+                f.seek(base + struct.unpack(endian + 'I', entry[8:])[0])
+                data = f.read(size * n)
+                if len(data) < size * n:
+                    continue
+            tags[tag] = struct.unpack(endian + ('H' if size == 2 else 'I') * n, data)
+        yield tags
+        pending.append(struct.unpack(endian + 'I', entries[count * 12:])[0])
+        for pointer_tag in (0x014A, 0x8769):  # SubIFDs, EXIF IFD
+            pending.extend(tags.get(pointer_tag, ()))
+
+def _tiff_preview_candidates(tags):
+    """IFD 하나에서 JPEG 미리보기일 수 있는 (위치, 길이)들"""
+    if 0x0201 in tags and 0x0202 in tags:  # JPEGInterchangeFormat / Length (EXIF 썸네일, NEF/ARW 미리보기)
+        yield tags[0x0201][0], tags[0x0202][0]
+    compression = tags.get(0x0103, (0,))[0]
+    reduced = tags.get(0x00FE, (0,))[0] & 1  # NewSubfileType: 축소본
+    # 한 조각(strip)짜리 JPEG: CR2 IFD0 미리보기(압축 6), DNG 미리보기(압축 7 + 축소본. 원본 RAW 데이터는 제외)
+    if (compression == 6 or (compression == 7 and reduced)) \
+            and len(tags.get(0x0111, ())) == 1 and len(tags.get(0x0117, ())) == 1:
+        yield tags[0x0111][0], tags[0x0117][0]
+
+def read_embedded_preview(full_path, min_size=EMBEDDED_PREVIEW_MIN_SIZE):
+    """
+    카메라 JPEG(EXIF 썸네일)이나 RAW(TIFF 구조) 파일에 내장된 미리보기 JPEG 중 가장 큰 것의 바이트를 반환.
+    짧은 변이 min_size보다 작거나, JPEG 원본과 가로세로 비율이 다르거나, 열 수 없으면 None (원본을 디코딩해야 함)
+    """
+    try:
+        with open(full_path, 'rb') as f:
+            head = f.read(4)
+            if head[:2] == b'\xff\xd8':
+                f.seek(2)
+                base = _find_jpeg_exif_base(f)
+                if base is None:
+                    return None
+                f.seek(0)
+                with Image.open(f) as img:  # 헤더만 읽음 (디코딩하지 않음)
+                    main_width, main_height = img.size
+            elif head in (b'II*\x00', b'MM\x00*'):
+                base, main_width, main_height = 0, None, None
+            else:
+                return None
+            candidates = {candidate for tags in _iter_tiff_ifds(f, base) for candidate in _tiff_preview_candidates(tags)}
+            for offset, length in sorted(candidates, key=lambda candidate: -candidate[1]):
+                f.seek(base + offset)
+                data = f.read(length)
+                if len(data) < length or data[:2] != b'\xff\xd8':
+                    continue
+                try:
+                    with Image.open(io.BytesIO(data)) as preview:
+                        width, height = preview.size
+                except Exception:
+                    continue
+                if min(width, height) < min_size:
+                    continue
+                if main_width and abs(width / height - main_width / main_height) > \
+                        EMBEDDED_PREVIEW_ASPECT_TOLERANCE * main_width / main_height:
+                    continue
+                return data
+    except (OSError, struct.error, ValueError):
+        return None
+    return None
+
+def read_image_bytes(full_path, min_size=EMBEDDED_PREVIEW_MIN_SIZE):
+    """
+    축소 디코딩용 이미지 바이트: RAW 파일에 짧은 변이 min_size 이상인 내장 미리보기가 있으면 그것만, 없으면 파일 전체.
+    (반환값, 미리보기 사용 여부)
+    """
+    use_preview = min_size and full_path.lower().endswith(RAW_IMAGE_EXTENSIONS)
+    preview = read_embedded_preview(full_path, min_size) if use_preview else None
+    if preview is not None:
+        return preview, True
+    with open(full_path, 'rb') as f:
+        return f.read(), False
+
+# pHash는 32x32 흑백으로 줄인 이미지만 쓰므로, JPEG는 DCT 단계에서 1/2~1/8 크기의 흑백으로 바로 디코딩 (PIL draft)
+# 짧은 변이 이 크기 이상 남도록만 줄이면 해시는 원본 디코딩과 비트가 완전히 같지는 않지만 64비트 중 4비트 이내 차이
+# (시험 이미지 기준 pHash 0~2비트, dHash/aHash 0~3비트: tests/test_image_decode.py. 2400만 화소 JPEG 기준 약 10배 빠르고 디코딩 버퍼는 1/100 이하)
+# 0이면 축소 디코딩을 끔. PNG/BMP 등 draft를 지원하지 않는 형식은 그대로 원본 디코딩
+PHASH_DECODE_MIN_SIZE = 256
+
+def open_reduced_image(img_bytes, min_size=PHASH_DECODE_MIN_SIZE):
+    """이미지 바이트를 열되, JPEG는 짧은 변이 min_size 이상인 가장 작은 배율의 흑백으로 디코딩하도록 설정"""
+    img = Image.open(io.BytesIO(img_bytes))
+    if min_size:
+        img.draft('L', (min_size, min_size))
+    return img
+
+# 이미지 지문 종류 → imagehash 함수 이름 (모두 64비트)
+IMAGE_HASH_FUNCS = {'phash': 'phash', 'dhash': 'dhash', 'ahash': 'average_hash'}
+
+def get_image_hashes(full_path, kinds=('phash',)):
+    """
+    이미지를 '바이트'로 한 번만 읽고 디코딩하여 kinds('phash' / 'dhash' / 'ahash') 순서대로 지문 튜플을 계산.
+    RAW 파일은 내장 미리보기가 있으면 그것으로 계산하고, 디코딩에 실패하면 원본으로 다시 계산
+    """
+    # Image.open(경로) 대신, 바이트로 읽어서 Image.open(BytesIO) 사용 (한글 경로 문제 해결)
+    img_bytes, from_preview = read_image_bytes(full_path)
+    try:
+        with open_reduced_image(img_bytes) as img:
+            return tuple(getattr(imagehash, IMAGE_HASH_FUNCS[kind])(img) for kind in kinds)
+    except Exception:
+        if not from_preview:
+            raise
+    img_bytes, _ = read_image_bytes(full_path, min_size=0)
+    with open_reduced_image(img_bytes) as img:
+        return tuple(getattr(imagehash, IMAGE_HASH_FUNCS[kind])(img) for kind in kinds)
+
+def get_image_hash(full_path, kind='phash'):
+    """이미지를 '바이트'로 읽어 kind 지문 하나를 계산"""
+    return get_image_hashes(full_path, (kind,))[0]
 
-IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp', '.ico')
+def get_image_phash(full_path):
+    """[수정] 이미지를 '바이트'로 읽어 pHash를 계산 (한글 경로 문제 해결)"""
+    return get_image_hash(full_path, 'phash')
 
-def get_file_category(filepath):
+def compute_image_hashes(paths, progress=None, cancel=None, kind='phash', use_cache=True):
     """
-    파일 경로를 기반으로 카테고리(이미지, 영상 등) 반환.
-    확장자 기반으로 이미지 파일을 우선적으로 인식합니다.
+    이미지마다 kind 지문을 구하여 {경로: ImageHash}를 반환 (입력 순서 유지, 단계: 'hash').
+    kind에 ('phash', 'dhash')처럼 튜플을 넘기면 한 번의 디코딩으로 모두 계산하여 {경로: (지문...)}을 반환합니다.
+    지문은 해시 캐시(파일 식별 정보 키)에 저장되어, 바뀌지 않은 파일은 다시 디코딩하지 않고
+    앱을 다시 시작해도 캐시에서 바로 읽습니다. 캐시에 없는 파일만 프로세스 풀에서 계산합니다.
     """
-    filename = filepath.lower()
-    
-    # 1. 확장자 기반 체크 (JPEG, PNG 등)
-    if filename.endswith(IMAGE_EXTENSIONS): 
-        return "Images"
-    
-    # 2. MIME Type 기반 체크 (나머지 파일들)
-    import mimetypes # 함수 내에서 임포트 (안전성 확보)
-    mime_type, _ = mimetypes.guess_type(filepath)
-    
-    if mime_type:
-        main_type = mime_type.split('/')[0]
-        if main_type == "video": return "Videos"
-        if main_type == "audio": return "Audio"
-        if main_type == "text": return "Documents"
-    
-    # MIME 타입이 없거나 다른 모든 경우
-    return "Other"
+    kinds = (kind,) if isinstance(kind, str) else tuple(kind)
+    cache = get_hash_cache() if use_cache else None
+    # 축소 디코딩 크기나 디코딩 원본(내장 미리보기 정책)이 바뀌면 지문도 달라질 수 있으므로 캐시 종류에 포함
+    cache_kinds = [f"image:{k}:{PHASH_DECODE_MIN_SIZE}:{IMAGE_DECODE_SOURCE}" for k in kinds]
+    hashes = {}
+    stats = {}
+    misses = []
+    for full_path in paths:
+        if cache is not None:
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                st = None  # 계산 단계에서 오류로 보고됨
+            if st is not None:
+                cached = [cache.get(st, cache_kind) for cache_kind in cache_kinds]
+                if all(cached):
+                    hashes[full_path] = tuple(imagehash.hex_to_hash(value) for value in cached)
+                    continue
+            stats[full_path] = st
+        misses.append(full_path)
+    report_progress(progress, 'hash', len(hashes), len(paths))
 
-# --- 중복 파일 검사 (DuplicateCheckPage) 로직 ---
+    def miss_progress(stage, done, total):
+        report_progress(progress, stage, len(paths) - total + done, len(paths))
 
-def get_file_hashes(filepath):
-    """파일의 MD5와 SHA256 해시를 반환"""
-    # [참고] 'rb' (read binary) 모드는 한글 경로와 상관없이 잘 동작합니다. (변경 불필요)
-    md5_hash = hashlib.md5()
-    sha256_hash = hashlib.sha256()
-    with open(filepath, 'rb') as f:
-        while chunk := f.read(8192):
-            md5_hash.update(chunk)
-            sha256_hash.update(chunk)
-    return md5_hash.hexdigest(), sha256_hash.hexdigest()
-
-def find_duplicate_files(folder_path):
-    """폴더를 스캔하여 중복 파일 목록과 통계 정보를 반환"""
-    # [참고] os.walk, os.path.getsize 등은 현대 파이썬에서 한글 경로를 잘 지원합니다. (변경 불필요)
-    hash_map = defaultdict(list)
-    total_files_scanned = 0
-    total_size_scanned = 0
-    for root, dirs, files in os.walk(folder_path):
-        for filename in files:
-            total_files_scanned += 1
-            full_path = os.path.join(root, filename)
+    computed = compute_fingerprints(misses, functools.partial(get_image_hashes, kinds=kinds), 'hash', miss_progress,
+                                    cancel, "이미지 해시 생성 오류", DEFAULT_FINGERPRINT_WORKERS)
+    if cache is not None:
+        for full_path, values in computed.items():
+            st = stats.get(full_path)
+            try:
+                # 계산하는 동안 파일이 바뀌지 않았을 때만 캐시에 저장
+                if st is not None and _is_same_file_state(st, os.stat(full_path)):
+                    for cache_kind, value in zip(cache_kinds, values):
+                        cache.put(st, cache_kind, str(value))
+            except OSError:
+                pass
+        cache.flush()
+    hashes.update(computed)
+    if isinstance(kind, str):
+        return {full_path: hashes[full_path][0] for full_path in paths if full_path in hashes}
+    return {full_path: hashes[full_path] for full_path in paths if full_path in hashes}
+
+def group_hashes(hashes_dict, threshold, linkage=DEFAULT_LINKAGE):
+    """해시 딕셔너리를 받아 유사도 임계값 기준으로 그룹화"""
+    return list(iter_group_hashes(hashes_dict, threshold, linkage=linkage))
+
+# 한 번에 계산하는 해밍 거리 행렬의 최대 원소 수 (블록 행 수 × 비교 대상 수, uint64 기준 약 16MB)
+# 너무 크면 캐시를 벗어나 오히려 느려짐 (10만 장 기준 8M: 11초, 2M: 5초)
+HAMMING_BLOCK_ELEMENTS = 2 * 1024 * 1024
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def pack_phashes(hashes):
+    """
+    64비트 ImageHash 목록을 uint64 배열로 묶음 (8x8 pHash 한 장 = 정수 하나).
+    64비트가 아닌 해시가 섞여 있으면 None을 반환합니다.
+    """
+    if not hashes or any(h.hash.size != 64 for h in hashes):
+        return None
+    bits = np.stack([h.hash.reshape(64) for h in hashes]).astype(np.uint8)
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+def popcount64(values):
+    """uint64 배열의 원소별 1인 비트 수 (NumPy 2의 bitwise_count, 없으면 바이트 단위 표 조회)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    counts = _POPCOUNT_TABLE[values.view(np.uint8)]
+    return counts.reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def iter_hamming_neighbors(codes, threshold, cancel=None):
+    """
+    uint64 해시 배열에서 i < j 이고 해밍 거리가 threshold 이하인 쌍을 i 순서대로 (i, [j...], [거리...])로 yield.
+    행 블록 × 나머지 전체를 XOR + popcount로 한 번에 계산하므로 파이썬 반복은 블록 수와 이웃 수에만 비례합니다.
+    """
+    n = len(codes)
+    block = max(1, HAMMING_BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, n, block):
+        if is_cancelled(cancel):
+            return
+        stop = min(start + block, n)
+        # 위쪽 삼각형만: 블록의 각 행은 자기보다 뒤의 해시와만 비교
+        distances = popcount64(codes[start:stop, None] ^ codes[None, start:])
+        # 2차원 nonzero보다 1차원 flatnonzero + divmod가 훨씬 빠름 (일치하는 쌍은 드묾)
+        rows, cols = np.divmod(np.flatnonzero(distances <= threshold), distances.shape[1])
+        keep = cols > rows  # 자기 자신/앞쪽 열 제외 (cols는 start 기준 오프셋)
+        rows, cols = rows[keep], cols[keep]
+        dists = distances[rows, cols]
+        bounds = np.searchsorted(rows, np.arange(stop - start + 1))
+        for offset in range(stop - start):
+            lo, hi = bounds[offset], bounds[offset + 1]
+            if lo < hi:
+                yield start + offset, (cols[lo:hi] + start).tolist(), dists[lo:hi].tolist()
+
+class _ChunkTable:
+    """해시의 한 구간(chunk) 값 → 해당 해시 번호들을 찾는 정렬 테이블 (구간이 24비트 이하면 버킷 시작 위치 배열로 O(1) 조회)"""
+    def __init__(self, keys, bits):
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+        self.starts = None
+        if bits <= 24:
+            counts = np.bincount(keys.astype(np.int64), minlength=1 << bits)
+            self.starts = np.concatenate(([0], np.cumsum(counts)))
+
+    def lookup(self, queries):
+        """각 조회 값이 들어 있는 정렬 구간 [lo, hi)를 반환"""
+        if self.starts is not None:
+            q = queries.astype(np.int64)
+            return self.starts[q], self.starts[q + 1]
+        return (np.searchsorted(self.sorted_keys, queries, 'left'),
+                np.searchsorted(self.sorted_keys, queries, 'right'))
+
+class HammingIndex:
+    """
+    64비트 해시(uint64 배열)용 multi-index hashing 색인: "해밍 거리 t 이내의 모든 해시"를 n²보다 훨씬 적은 비용으로 찾음.
+    해시를 m개 구간으로 나누면, 거리가 t 이하인 두 해시는 적어도 한 구간에서 거리가 t // m 이하라는
+    비둘기집 원리를 이용합니다. 구간 값마다 정렬 테이블을 만들어 두고, 그 반경 안의 구간 값만 조회하여
+    후보를 얻은 뒤 전체 64비트 거리로 검증하므로, 비용은 (조회 수 + 실제 이웃 수)에 비례합니다.
+    색인은 메모리에만 둡니다. 만드는 비용은 구간별 정렬뿐이라(10만 장 기준 수십 ms) 검사마다 새로 만들며,
+    다시 쓸 지문은 해시 캐시(compute_image_hashes)에 저장됩니다.
+    """
+    def __init__(self, codes, max_distance, num_chunks=None):
+        self.codes = np.ascontiguousarray(codes, dtype=np.uint64)
+        self.max_distance = max_distance
+        n = len(self.codes)
+        if num_chunks is None:
+            # 구간 하나가 log2(n)비트 정도일 때 버킷당 해시가 1개 안팎이 되어 후보가 가장 적음
+            num_chunks = round(64 / max(math.log2(max(n, 2)), 1))
+        self.num_chunks = max(1, min(num_chunks, max_distance + 1, 64))
+        base, extra = divmod(64, self.num_chunks)
+        self.chunks = []  # (시프트, 비트 수, 테이블)
+        shift = 0
+        for k in range(self.num_chunks):
+            bits = base + (1 if k < extra else 0)
+            keys = self._chunk_values(self.codes, shift, bits)
+            self.chunks.append((shift, bits, _ChunkTable(keys, bits)))
+            shift += bits
+
+    @staticmethod
+    def _chunk_values(codes, shift, bits):
+        mask = np.uint64((1 << bits) - 1) if bits < 64 else np.uint64(0xFFFFFFFFFFFFFFFF)
+        return (codes >> np.uint64(shift)) & mask
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _flip_masks(self, bits, radius):
+        """구간 안에서 radius개 이하의 비트를 뒤집는 모든 마스크"""
+        for weight in range(radius + 1):
+            for positions in itertools.combinations(range(bits), weight):
+                yield sum(1 << pos for pos in positions)
+
+    def query(self, code, max_distance=None):
+        """해시 하나와 거리가 max_distance 이하인 색인 내 해시 번호와 거리를 (번호 배열, 거리 배열)로 반환"""
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        radius = max_distance // self.num_chunks
+        code = np.uint64(code)
+        candidates = []
+        for shift, bits, table in self.chunks:
+            key = int(self._chunk_values(np.array([code]), shift, bits)[0])
+            probes = np.array([key ^ mask for mask in self._flip_masks(bits, radius)], dtype=np.uint64)
+            lo, hi = table.lookup(probes)
+            for a, b in zip(lo.tolist(), hi.tolist()):
+                if a < b:
+                    candidates.append(table.order[a:b])
+        if not candidates:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        ids = np.unique(np.concatenate(candidates))
+        distances = popcount64(self.codes[ids] ^ code)
+        keep = distances <= max_distance
+        return ids[keep], distances[keep]
+
+    def iter_pairs(self, max_distance=None, cancel=None):
+        """
+        색인 안에서 거리가 max_distance 이하인 모든 쌍을 i 순서대로 (i, [j...], [거리...])로 yield (i < j, j 오름차순).
+        iter_hamming_neighbors와 같은 결과를, 구간 값이 가까운 후보끼리만 비교하여 구합니다.
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        radius = max_distance // self.num_chunks
+        found_i, found_j = [], []
+        for shift, bits, table in self.chunks:
+            keys = self._chunk_values(self.codes, shift, bits)
+            for mask in self._flip_masks(bits, radius):
+                if is_cancelled(cancel):
+                    return
+                # 모든 해시에 대해 "구간 값 ^ mask"와 같은 구간 값을 가진 해시들을 한 번에 조인
+                lo, hi = table.lookup(keys ^ np.uint64(mask))
+                counts = hi - lo
+                for start, stop in self._split_by_total(counts):
+                    left, right = self._expand(lo[start:stop], counts[start:stop], table.order, start)
+                    keep = left < right
+                    left, right = left[keep], right[keep]
+                    keep = popcount64(self.codes[left] ^ self.codes[right]) <= max_distance
+                    found_i.append(left[keep])
+                    found_j.append(right[keep])
+        if not found_i:
+            return
+        # 여러 구간/마스크에서 같은 쌍이 중복으로 나올 수 있으므로 (i, j) 기준으로 정리
+        n = np.int64(len(self.codes))
+        pair_ids = np.unique(np.concatenate(found_i).astype(np.int64) * n + np.concatenate(found_j))
+        rows, cols = np.divmod(pair_ids, n)
+        dists = popcount64(self.codes[rows] ^ self.codes[cols])
+        bounds = np.flatnonzero(np.diff(rows)) + 1
+        for row_ids, col_ids, row_dists in zip(np.split(rows, bounds), np.split(cols, bounds), np.split(dists, bounds)):
+            yield int(row_ids[0]), col_ids.tolist(), row_dists.tolist()
+
+    @staticmethod
+    def _split_by_total(counts, limit=HAMMING_BLOCK_ELEMENTS):
+        """후보 수 합계가 limit 안팎이 되도록 조회 범위를 나눔 (비슷한 해시가 몰린 버킷에서도 메모리 제한)"""
+        cumulative = np.cumsum(counts)
+        if len(cumulative) == 0 or cumulative[-1] == 0:
+            return
+        start = 0
+        while start < len(counts):
+            base = cumulative[start - 1] if start else 0
+            stop = int(np.searchsorted(cumulative, base + limit, 'right'))
+            stop = max(stop, start + 1)
+            yield start, stop
+            start = stop
+
+    @staticmethod
+    def _expand(lo, counts, order, offset):
+        """조회 i마다 정렬 구간 [lo, lo + count)의 해시 번호를 펼쳐 (i 배열, 후보 번호 배열)로 반환"""
+        total = int(counts.sum())
+        left = np.repeat(np.arange(offset, offset + len(counts)), counts)
+        positions = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+        return left, order[positions]
+
+# 이 개수 이상의 이미지는 전체 쌍 비교 대신 HammingIndex로 이웃을 찾음 (그보다 적으면 블록 비교와 비슷하거나 더 빠름)
+# 모여 있는 해시 기준 측정: 10만 장 t=6에서 0.7초(블록 비교 5.3초), 30만 장 t=10에서 23초(블록 비교 약 48초)
+HAMMING_INDEX_MIN_SIZE = 20000
+
+# --- 단계별(cascade) 유사 이미지 검증 ---
+
+# SSIM 비교용 흑백 축소본 크기 (원본 해상도와 무관하게 항상 같은 크기로 비교)
+# 64×64면 축소본 하나가 4KB(10만 장 약 400MB)이고, 쌍 하나의 SSIM은 약 0.25ms
+SSIM_THUMBNAIL_SIZE = 64
+# 화면의 '정밀 검증'에서 쓰는 SSIM 기준 (%). 같은 사진의 재압축/크기 변경본은 축소본 SSIM이 99% 이상,
+# 서로 다른 사진은 대개 20% 미만이므로 넉넉하게 둠
+DEFAULT_SSIM_THRESHOLD = 80
+# dHash 단계의 기본 허용 거리 = pHash 임계값 + 이 값 (두 지문의 거리는 비슷하게 움직이지만 같지는 않으므로 여유를 둠)
+DHASH_THRESHOLD_MARGIN = 6
+
+class CascadeStats:
+    """유사 검사 단계(tier)별 비용 집계: 단계 이름 → 검사한 수, 통과한 수, 소요 시간 (단위: 지문 단계는 파일, 나머지는 쌍)"""
+    def __init__(self):
+        self.tiers = {}
+
+    def record(self, tier, pairs, passed, seconds, unit='쌍'):
+        entry = self.tiers.setdefault(tier, {'pairs': 0, 'passed': 0, 'seconds': 0.0, 'unit': unit})
+        entry['pairs'] += pairs
+        entry['passed'] += passed
+        entry['seconds'] += seconds
+
+    def report(self):
+        """단계별 통과율(%) 포함 목록 반환 (실행 순서)"""
+        rows = []
+        for tier, entry in self.tiers.items():
+            pass_rate = entry['passed'] / entry['pairs'] * 100 if entry['pairs'] else 0.0
+            rows.append({'tier': tier, **entry, 'pass_rate': pass_rate})
+        return rows
+
+    def summary(self):
+        """화면 표시용 한 줄 요약 (예: 'hash 1,000개 → phash 120쌍 → dhash 80쌍, 1.23초')"""
+        rows = self.report()
+        if not rows:
+            return ""
+        steps = " → ".join(f"{row['tier']} {row['passed']:,}{row['unit']}" for row in rows)
+        return f"{steps}, {sum(row['seconds'] for row in rows):.2f}초"
+
+    def print_report(self):
+        for row in self.report():
+            print(f"   🔎 {row['tier']}: {row['pairs']:,}{row['unit']} → {row['passed']:,}{row['unit']} 통과 "
+                  f"({row['pass_rate']:.2f}%), {row['seconds']:.2f}초")
+
+def load_gray_thumbnail(full_path, size=SSIM_THUMBNAIL_SIZE):
+    """이미지(RAW는 내장 미리보기가 충분히 크면 그것)를 축소 디코딩하여 size×size 흑백 uint8 배열로 반환 (비율은 무시)"""
+    img_bytes, from_preview = read_image_bytes(full_path, size)
+    try:
+        with open_reduced_image(img_bytes, size) as img:
+            return np.asarray(img.convert('L').resize((size, size), Image.BILINEAR), dtype=np.uint8)
+    except Exception:
+        if not from_preview:
+            raise
+    img_bytes, _ = read_image_bytes(full_path, min_size=0)
+    with open_reduced_image(img_bytes, size) as img:
+        return np.asarray(img.convert('L').resize((size, size), Image.BILINEAR), dtype=np.uint8)
+
+def _load_gray_thumbnail_bytes(full_path, size=SSIM_THUMBNAIL_SIZE):
+    """작업 프로세스용: 축소본을 바이트로 반환 (프로세스 간 전달과 저장소 추가가 그대로 가능)"""
+    return load_gray_thumbnail(full_path, size).tobytes()
+
+# 저장소 파일 헤더: 형식 표시 8바이트 + 저장소 id(무작위 16진수 16자) + 여백 → 칸은 그 뒤부터 시작
+RECORD_STORE_MAGIC = b'RECSTOR1'
+RECORD_STORE_HEADER_BYTES = 32
+# 저장소 파일이 이보다 커지면, 다음 조회 때 그 검사에서 찾은 칸만 남기고 압축 (바뀐 파일의 예전 칸이 계속 쌓이므로)
+# 64×64 축소본 기준 약 26만 장
+RECORD_STORE_MAX_BYTES = 1024 * 1024 * 1024
+
+class RecordStore:
+    """
+    같은 모양(record_shape)·자료형의 배열을 한 파일에 이어 붙여 저장하고 np.memmap으로 읽는 저장소.
+    파일 → 칸 번호는 해시 캐시(파일 식별 정보 키, 종류 cache_kind)에 저장하므로, 바뀐 파일은 새 칸에 다시 저장됩니다.
+    cache_kind에는 헤더의 저장소 id가 들어 있어, 저장소를 새로 만들거나 비우면(reset/compact) 예전 칸 번호는 쓰이지 않음.
+    파일이 max_bytes를 넘으면 lookup이 이번에 찾은 칸만 남기고 압축합니다.
+    """
+    def __init__(self, path, record_shape, dtype, kind, max_bytes=RECORD_STORE_MAX_BYTES):
+        self.path = path
+        self.record_shape = tuple(record_shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.record_shape)) * self.dtype.itemsize
+        self.kind = kind
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._map = None
+        with open(self.path, 'a+b') as f:
+            f.seek(0)
+            header = f.read(RECORD_STORE_HEADER_BYTES)
+        if len(header) == RECORD_STORE_HEADER_BYTES and header.startswith(RECORD_STORE_MAGIC):
+            self._set_store_id(header[len(RECORD_STORE_MAGIC):].split(b'\0')[0].decode('ascii'))
+        else:
+            # 새 파일이거나 헤더가 없는(이전 형식/깨진) 파일은 비우고 새 id로 시작
+            self._write_empty(self.path)
+
+    def _set_store_id(self, store_id):
+        self.store_id = store_id
+        self.cache_kind = f"{self.kind}:{store_id}"
+
+    def _write_empty(self, path):
+        """헤더만 있는 빈 저장소 파일을 쓰고 새 id를 사용"""
+        store_id = os.urandom(8).hex()
+        header = (RECORD_STORE_MAGIC + store_id.encode('ascii')).ljust(RECORD_STORE_HEADER_BYTES, b'\0')
+        with open(path, 'wb') as f:
+            f.write(header)
+        self._map = None
+        self._set_store_id(store_id)
+
+    def __len__(self):
+        return max(0, os.path.getsize(self.path) - RECORD_STORE_HEADER_BYTES) // self.slot_bytes
+
+    def append(self, data):
+        """배열(또는 같은 크기의 바이트)을 끝에 추가하고 칸 번호를 반환"""
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data, dtype=self.dtype).tobytes()
+        with self.lock:
+            with open(self.path, 'r+b') as f:
+                # 이전에 중간까지만 쓰인 칸이 있으면 잘라내고 칸 경계부터 씀
+                slot = len(self)
+                f.seek(RECORD_STORE_HEADER_BYTES + slot * self.slot_bytes)
+                f.write(data)
+                f.truncate()
+            return slot
+
+    def _records(self, count):
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=RECORD_STORE_HEADER_BYTES,
+                         shape=(count,) + self.record_shape)
+
+    def view(self):
+        """저장된 모든 칸의 (칸 수, *record_shape) 읽기 전용 memmap (추가된 칸이 있으면 다시 매핑)"""
+        with self.lock:
+            count = len(self)
+            if count == 0:
+                return np.empty((0,) + self.record_shape, dtype=self.dtype)
+            if self._map is None or len(self._map) != count:
+                self._map = self._records(count)
+            return self._map
+
+    def reset(self):
+        """저장된 칸을 모두 버리고 새 id로 시작 (캐시에 남은 예전 칸 번호는 cache_kind가 달라 무시됨)"""
+        with self.lock:
+            self._write_empty(self.path)
+
+    def compact(self, slots, stats, cache):
+        """
+        slots({경로: 칸 번호})의 칸만 새 id의 저장소 파일로 옮기고 나머지는 버림 (버린 칸은 다음에 필요할 때 다시 계산).
+        옮긴 칸의 새 번호를 캐시에 기록(stats: {경로: 조회 때의 stat})하고 {경로: 새 칸 번호}를 반환.
+        다른 곳에서 파일을 쓰고 있어 바꿀 수 없으면(Windows의 열린 memmap 등) 그대로 둠
+        """
+        temp_path = self.path + '.tmp'
+        new_slots = {}
+        with self.lock:
+            old_store_id = self.store_id
+            count = len(self)
+            records = self._records(count) if count else None
+            try:
+                self._write_empty(temp_path)
+                with open(temp_path, 'ab') as f:
+                    for full_path, slot in slots.items():
+                        if slot < count:
+                            f.write(records[slot].tobytes())
+                            new_slots[full_path] = len(new_slots)
+                del records
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ 저장소를 압축하지 못했습니다: {self.path} → {e}")
+                self._set_store_id(old_store_id)
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                return slots
+        for full_path, slot in new_slots.items():
+            st = stats.get(full_path)
+            if st is not None:
+                cache.put(st, self.cache_kind, str(slot))
+        return new_slots
+
+    def lookup(self, paths, cache):
+        """
+        캐시에 칸 번호가 있는 파일은 {경로: 칸 번호}로, 나머지는 [(경로, stat 또는 None)...]으로 나눠 반환
+        (stat은 계산 후 add_computed에서 파일이 그 사이 바뀌지 않았는지 확인하는 데 사용).
+        저장소 파일이 max_bytes를 넘었으면 찾은 칸만 남기고 압축한 뒤의 칸 번호를 반환
+        """
+        slots, misses, hit_stats = {}, [], {}
+        count = len(self)
+        for full_path in paths:
             try:
-                file_size = os.path.getsize(full_path)
-                total_size_scanned += file_size
-                md5_val, sha_val = get_file_hashes(full_path)
-                combined_key = f"{md5_val}_{sha_val}"
-                hash_map[combined_key].append(full_path)
+                st = os.stat(full_path)
+            except OSError:
+                st = None  # 계산 단계에서 오류로 보고됨
+            cached = cache.get(st, self.cache_kind) if st is not None else None
+            if cached is not None and int(cached) < count:
+                slots[full_path] = int(cached)
+                hit_stats[full_path] = st
+            else:
+                misses.append((full_path, st))
+        if self.max_bytes and count * self.slot_bytes > self.max_bytes:
+            slots = self.compact(slots, hit_stats, cache)
+        return slots, misses
+
+    def add_computed(self, full_path, st, data, cache):
+        """계산한 값을 저장하고, 계산하는 동안 파일이 바뀌지 않았으면 칸 번호를 캐시에 기록. 칸 번호 반환"""
+        slot = self.append(data)
+        try:
+            if st is not None and _is_same_file_state(st, os.stat(full_path)):
+                cache.put(st, self.cache_kind, str(slot))
+        except OSError:
+            pass
+        return slot
+
+class ThumbnailStore(RecordStore):
+    """size×size 흑백 축소본 저장소 (캐시 폴더의 thumbnails_<size>.u8)"""
+    def __init__(self, path=None, size=SSIM_THUMBNAIL_SIZE):
+        self.size = size
+        super().__init__(path or os.path.join(get_cache_dir(), f'thumbnails_{size}.u8'),
+                         (size, size), np.uint8, f"thumb:{size}:{PHASH_DECODE_MIN_SIZE}:{IMAGE_DECODE_SOURCE}")
+
+_thumbnail_stores = {}
+_thumbnail_store_failed = False
+_thumbnail_store_lock = threading.Lock()
+
+def get_thumbnail_store(size=SSIM_THUMBNAIL_SIZE):
+    """크기별 전역 축소본 저장소를 반환 (열 수 없는 환경이면 None → 저장하지 않고 매번 계산)"""
+    global _thumbnail_store_failed
+    with _thumbnail_store_lock:
+        if size not in _thumbnail_stores and not _thumbnail_store_failed:
+            try:
+                _thumbnail_stores[size] = ThumbnailStore(size=size)
             except Exception as e:
-                print(f"❌ 오류 발생: {full_path} → {e}")
-    duplicates = {h: paths for h, paths in hash_map.items() if len(paths) > 1}
-    return duplicates, total_files_scanned, total_size_scanned
+                _thumbnail_store_failed = True
+                print(f"⚠️ 축소본 저장소를 열 수 없어 저장 없이 검사합니다: {e}")
+    return _thumbnail_stores.get(size)
+
+def get_gray_thumbnails(paths, size=SSIM_THUMBNAIL_SIZE, cancel=None):
+    """
+    이미지마다 size×size 흑백 축소본을 구하여 {경로: uint8 배열}을 반환 (읽을 수 없는 이미지는 제외).
+    저장소에 있는 축소본은 memmap에서 바로 읽고, 없는 것만 프로세스 풀에서 계산하여 저장소에 추가합니다.
+    """
+    store = get_thumbnail_store(size)
+    cache = get_hash_cache() if store is not None else None
+    if cache is not None:
+        slots, misses = store.lookup(paths, cache)
+    else:
+        slots, misses = {}, [(full_path, None) for full_path in paths]
+    stats = dict(misses)
 
+    computed = compute_fingerprints(list(stats), functools.partial(_load_gray_thumbnail_bytes, size=size), 'thumbnail',
+                                    None, cancel, "축소본 생성 오류", DEFAULT_FINGERPRINT_WORKERS)
+    thumbnails = {}
+    for full_path, data in computed.items():
+        if cache is None:
+            thumbnails[full_path] = np.frombuffer(data, dtype=np.uint8).reshape(size, size)
+        else:
+            slots[full_path] = store.add_computed(full_path, stats[full_path], data, cache)
+    if cache is not None:
+        cache.flush()
+    if slots:
+        stored = store.view()
+        for full_path, slot in slots.items():
+            thumbnails[full_path] = stored[slot]
+    return {full_path: thumbnails[full_path] for full_path in paths if full_path in thumbnails}
 
-# --- 유사 이미지 스캔 (SimilarImageScanPage) 로직 ---
+# 한 번에 SSIM을 계산하는 쌍 수 (64×64 기준 쌍마다 중간 배열 약 150KB)
+SSIM_BATCH_PAIRS = 64
 
-def get_image_similarity(file1_path, file2_path):
-    """[수정] 두 이미지 파일의 SSIM, pHash 유사도를 '바이트' 기반으로 반환"""
+def _window_sums(images, win_size):
+    """(개수, 높이, 너비) 정수 배열의 win_size×win_size 창 합 (가장자리를 뺀 유효 영역만, 행/열 누적 합 사용)"""
+    summed = np.cumsum(images, axis=1, dtype=np.int32)
+    summed = np.concatenate([summed[:, win_size - 1:win_size], summed[:, win_size:] - summed[:, :-win_size]], axis=1)
+    summed = np.cumsum(summed, axis=2, dtype=np.int32)
+    return np.concatenate([summed[:, :, win_size - 1:win_size], summed[:, :, win_size:] - summed[:, :, :-win_size]], axis=2)
+
+def batch_ssim(images1, images2, win_size=7, data_range=255):
+    """
+    같은 크기의 8비트 흑백 이미지 쌍 묶음 (개수, 높이, 너비)의 SSIM(0~1)을 한 번에 계산하여 (개수,) 배열로 반환.
+    skimage structural_similarity의 기본 설정(7×7 균일 창, 표본 공분산, 가장자리 제외 평균)과 같은 값.
+    창 합과 분산/공분산의 분자는 int32로 정확히 계산 (7×7 창에서 255² × 49 × 49 < 2³¹)
+    """
+    x = np.asarray(images1, dtype=np.int32)
+    y = np.asarray(images2, dtype=np.int32)
+    n = win_size * win_size
+    sum_x, sum_y = _window_sums(x, win_size), _window_sums(y, win_size)
+    sum_xx, sum_yy, sum_xy = _window_sums(x * x, win_size), _window_sums(y * y, win_size), _window_sums(x * y, win_size)
+    sq_x, sq_y, prod_xy = sum_x * sum_x, sum_y * sum_y, sum_x * sum_y
+    # 평균/분산 식을 창 크기 n으로 통분: 평균항은 n², 분산항은 n(n-1)로 나눈 값이므로 비율에서 약분됨
+    c1 = (0.01 * data_range) ** 2 * n * n
+    c2 = (0.03 * data_range) ** 2 * n * (n - 1)
+    numerator = (2.0 * prod_xy + c1) * (2.0 * (n * sum_xy - prod_xy) + c2)
+    denominator = ((sq_x + sq_y) + c1) * ((n * sum_xx - sq_x) + (n * sum_yy - sq_y) + c2)
+    return (numerator / denominator).mean(axis=(1, 2))
+
+def compute_pair_ssim(thumbnails, pairs, cancel=None):
+    """
+    {키: 축소본} 에서 (키1, 키2) 쌍 목록의 SSIM(%)을 SSIM_BATCH_PAIRS개씩 묶어 계산하여 목록으로 반환.
+    축소본이 없는 쌍은 None (중지되면 남은 쌍도 None)
+    """
+    scores = [None] * len(pairs)
+    valid = [k for k, (a, b) in enumerate(pairs) if a in thumbnails and b in thumbnails]
+    for start in range(0, len(valid), SSIM_BATCH_PAIRS):
+        if is_cancelled(cancel):
+            break
+        batch = valid[start:start + SSIM_BATCH_PAIRS]
+        images1 = np.stack([thumbnails[pairs[k][0]] for k in batch])
+        images2 = np.stack([thumbnails[pairs[k][1]] for k in batch])
+        for k, score in zip(batch, batch_ssim(images1, images2)):
+            scores[k] = float(score) * 100
+    return scores
+
+def make_dhash_pair_filter(dhashes_dict, max_distance):
+    """
+    후보 쌍 중 dHash 해밍 거리도 max_distance 이하인 쌍만 남기는 필터 (pHash와 다른 방식의 지문이 함께 맞아야 통과).
+    모든 후보 쌍을 한 번의 벡터 연산으로 비교하므로 비용은 거의 없음
+    """
+    def pair_filter(edges, image_paths):
+        codes = pack_phashes([dhashes_dict[path] for path in image_paths])
+        if codes is None or not edges:
+            return edges
+        first = np.fromiter((edge[0] for edge in edges), dtype=np.int64, count=len(edges))
+        second = np.fromiter((edge[1] for edge in edges), dtype=np.int64, count=len(edges))
+        keep = np.flatnonzero(popcount64(codes[first] ^ codes[second]) <= max_distance)
+        return [edges[k] for k in keep]
+    return pair_filter
+
+def make_ssim_pair_filter(min_score, cancel=None):
+    """
+    후보 쌍 중 흑백 축소본의 SSIM(%)이 min_score 이상인 쌍만 남기는 필터 (가장 비싼 마지막 단계).
+    축소본은 살아남은 쌍에 나온 이미지만 저장소에서 읽고(없으면 계산), SSIM은 여러 쌍을 묶어 벡터 연산으로 계산.
+    읽을 수 없는 이미지의 쌍은 판정하지 않고 남김
+    """
+    def pair_filter(edges, image_paths):
+        used = sorted({i for edge in edges for i in edge[:2]})
+        thumbnails = get_gray_thumbnails([image_paths[i] for i in used], cancel=cancel)
+        if is_cancelled(cancel):
+            return edges
+        scores = compute_pair_ssim(thumbnails, [(image_paths[edge[0]], image_paths[edge[1]]) for edge in edges], cancel)
+        return [edge for edge, score in zip(edges, scores) if score is None or score >= min_score]
+    return pair_filter
+
+# --- CLIP 의미 유사 검색 (잘라내기/편집된 사진 찾기) ---
+
+# pHash는 잘라내기·회전·강한 보정에 약하므로, CLIP 임베딩의 코사인 유사도(%)로 "같은 장면" 사진을 추가로 찾음
+SEMANTIC_SIMILARITY_THRESHOLD = 92.0
+# 임베딩 계산 묶음 크기 (GPU 메모리 여유에 맞춰 조정)
+CLIP_BATCH_SIZE = 32
+# 이 개수 이상은 전체 쌍 비교 대신 IVFIndex로 이웃을 찾음
+# 코어 1개, 512차원 측정: 10만 개 전체 쌍 84초 → IVF 학습 14초 + 쌍 검색 48초 (재현율 100%), 질의 하나 0.4ms
+EMBEDDING_INDEX_MIN_SIZE = 20000
+# 전체 쌍 비교 시 한 번에 계산하는 유사도 행렬의 최대 원소 수 (float32 약 32MB)
+EMBEDDING_BLOCK_ELEMENTS = 8 * 1024 * 1024
+
+_embedding_stores = {}
+_embedding_store_failed = False
+_embedding_store_lock = threading.Lock()
+
+def get_embedding_store(dim):
+    """CLIP 임베딩 저장소를 반환 (float16으로 저장: 512차원 기준 1KB/장. 열 수 없으면 None)"""
+    global _embedding_store_failed
+    with _embedding_store_lock:
+        if dim not in _embedding_stores and not _embedding_store_failed:
+            try:
+                model = hybrid_scorer.CLIP_MODEL_NAME.replace('/', '_')
+                _embedding_stores[dim] = RecordStore(os.path.join(get_cache_dir(), f'embeddings_{model}_{dim}.f16'),
+                                                     (dim,), np.float16, f"clip:{model}")
+            except Exception as e:
+                _embedding_store_failed = True
+                print(f"⚠️ 임베딩 저장소를 열 수 없어 저장 없이 검사합니다: {e}")
+    return _embedding_stores.get(dim)
+
+def get_clip_embeddings(paths, progress=None, cancel=None):
+    """
+    이미지마다 길이 1로 정규화된 CLIP 임베딩을 구하여 (경로 목록, (개수, 차원) float32 배열)을 반환 (단계: 'embedding').
+    저장소에 있는 임베딩은 바로 읽고, 없는 것만 CLIP_BATCH_SIZE장씩 계산하여 저장합니다.
+    AI 모델을 쓸 수 없는 환경이면 빈 결과를 반환합니다.
+    """
+    if not IQA_AVAILABLE or hybrid_scorer is None:
+        print("⚠️ AI 모델(CLIP)을 사용할 수 없어 의미 유사 검색을 건너뜁니다.")
+        return [], np.empty((0, 0), dtype=np.float32)
+    dim = hybrid_scorer.embedding_dim
+    store = get_embedding_store(dim)
+    cache = get_hash_cache() if store is not None else None
+    if cache is not None:
+        slots, misses = store.lookup(paths, cache)
+    else:
+        slots, misses = {}, [(full_path, None) for full_path in paths]
+    computed = {}
+    report_progress(progress, 'embedding', len(slots), len(paths))
+    for start in range(0, len(misses), CLIP_BATCH_SIZE):
+        if is_cancelled(cancel):
+            break
+        batch = misses[start:start + CLIP_BATCH_SIZE]
+        try:
+            vectors = hybrid_scorer.get_image_embeddings([full_path for full_path, _ in batch], CLIP_BATCH_SIZE)
+        except Exception as e:
+            print(f"❌ 임베딩 계산 오류: {e}")
+            vectors = {}
+        for full_path, st in batch:
+            if full_path not in vectors:
+                continue
+            if cache is not None:
+                slots[full_path] = store.add_computed(full_path, st, vectors[full_path], cache)
+            else:
+                computed[full_path] = vectors[full_path]
+        report_progress(progress, 'embedding', len(paths) - len(misses) + start + len(batch), len(paths))
+    if cache is not None:
+        cache.flush()
+    stored = store.view() if slots else None
+    found = [full_path for full_path in paths if full_path in slots or full_path in computed]
+    matrix = np.empty((len(found), dim), dtype=np.float32)
+    for row, full_path in enumerate(found):
+        matrix[row] = stored[slots[full_path]] if full_path in slots else computed[full_path]
+    # float16 저장으로 생긴 작은 길이 오차를 다시 정규화
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    return found, matrix
+
+def iter_embedding_neighbors(vectors, min_similarity, cancel=None):
+    """
+    정규화된 임베딩 (n, 차원)의 모든 쌍 중 코사인 유사도가 min_similarity(0~1) 이상인 쌍을
+    (i, [j...], [유사도...])로 yield (i < j). 행 블록마다 행렬 곱 한 번으로 비교하는 정확한 방식
+    """
+    n = len(vectors)
+    block_rows = max(1, EMBEDDING_BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, n, block_rows):
+        if is_cancelled(cancel):
+            return
+        stop = min(n, start + block_rows)
+        sims = vectors[start:stop] @ vectors[start:].T
+        rows, cols = np.nonzero(sims >= min_similarity)
+        keep = cols > rows  # 자기 자신과 이미 본 쌍(j <= i) 제외
+        rows, cols = rows[keep], cols[keep]
+        # np.nonzero는 행 순서로 반환하므로 행이 바뀌는 위치에서 잘라 묶음
+        heads = np.flatnonzero(np.diff(rows, prepend=-1))
+        for head, tail in zip(heads, itertools.chain(heads[1:], [len(rows)])):
+            row = rows[head]
+            yield start + int(row), cols[head:tail] + start, sims[row, cols[head:tail]]
+
+class IVFIndex:
+    """
+    정규화된 임베딩용 IVF(inverted file) 근사 최근접 이웃 색인 (NumPy만 사용).
+    구형 k-means로 벡터를 n_lists개 목록으로 나눠 두고, 질의 벡터와 가까운 중심 n_probe개의 목록만 정확히 비교합니다.
+    비교 대상이 전체의 약 n_probe / n_lists로 줄어들며, 놓치는 이웃은 경계 근처의 일부뿐입니다.
+    색인은 메모리에만 두고 검사마다 새로 학습합니다. (임베딩 자체는 저장소에 캐시되며, 10만 개 학습은 약 14초)
+    """
+    def __init__(self, vectors, n_lists=None, n_probe=8, seed=0, iterations=10):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = len(self.vectors)
+        if n_lists is None:
+            n_lists = int(4 * math.sqrt(n))
+        self.n_lists = max(1, min(n_lists, n, 4096))
+        self.n_probe = max(1, min(n_probe, self.n_lists))
+        self.centroids = np.ascontiguousarray(self._train(seed, iterations), dtype=np.float32)
+        self.assignments = self._nearest_centroids(self.vectors, 1)[:, 0]
+        # 목록별 원소 번호를 한 배열에 모아 두고 시작 위치(offsets)로 잘라 씀
+        self.order = np.argsort(self.assignments, kind='stable')
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(self.assignments, minlength=self.n_lists))])
+
+    def _train(self, seed, iterations):
+        """표본(목록당 최대 64개)으로 구형 k-means 학습: 내적이 가장 큰 중심에 배정하고 평균을 다시 정규화"""
+        rng = np.random.default_rng(seed)
+        n = len(self.vectors)
+        sample = self.vectors[rng.choice(n, size=min(n, self.n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=self.n_lists)
+            empty = counts == 0
+            # 빈 목록은 임의의 표본으로 다시 시작
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        return centroids
+
+    def _nearest_centroids(self, queries, count):
+        """질의마다 내적이 큰 중심 count개의 번호 (블록 단위로 계산)"""
+        result = np.empty((len(queries), count), dtype=np.int64)
+        block_rows = max(1, EMBEDDING_BLOCK_ELEMENTS // self.n_lists)
+        for start in range(0, len(queries), block_rows):
+            scores = queries[start:start + block_rows] @ self.centroids.T
+            if count < self.n_lists:
+                result[start:start + block_rows] = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+            else:
+                result[start:start + block_rows] = np.argsort(-scores, axis=1)
+        return result
+
+    def _members(self, lists):
+        return np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists]) \
+            if len(lists) else np.empty(0, dtype=np.int64)
+
+    def query(self, vector, min_similarity):
+        """vector와 코사인 유사도가 min_similarity 이상인 (원소 번호 배열, 유사도 배열) (유사도 내림차순)"""
+        vector = np.asarray(vector, dtype=np.float32)
+        candidates = self._members(self._nearest_centroids(vector[None, :], self.n_probe)[0])
+        sims = self.vectors[candidates] @ vector
+        keep = np.flatnonzero(sims >= min_similarity)
+        ranked = keep[np.argsort(-sims[keep], kind='stable')]
+        return candidates[ranked], sims[ranked]
+
+    def iter_pairs(self, min_similarity, cancel=None):
+        """
+        색인 안에서 코사인 유사도가 min_similarity 이상인 쌍을 (i, [j...], [유사도...])로 yield (i < j, 쌍마다 한 번).
+        목록 단위로 구성원의 탐색 목록을 합쳐 행렬 곱 한 번으로 비교하므로, 구성원별로 따로 조회하는 것보다 빠름
+        """
+        seen = set()
+        for l in range(self.n_lists):
+            if is_cancelled(cancel):
+                return
+            members = self.order[self.offsets[l]:self.offsets[l + 1]]
+            if len(members) == 0:
+                continue
+            queries = self.vectors[members]
+            probes = np.unique(self._nearest_centroids(queries, self.n_probe))
+            candidates = self._members(probes)
+            block_rows = max(1, EMBEDDING_BLOCK_ELEMENTS // len(candidates))
+            for start in range(0, len(members), block_rows):
+                block = members[start:start + block_rows]
+                sims = self.vectors[block] @ self.vectors[candidates].T
+                for row, col in zip(*np.nonzero(sims >= min_similarity)):
+                    i, j = int(block[row]), int(candidates[col])
+                    if i == j:
+                        continue
+                    pair = (i, j) if i < j else (j, i)
+                    if pair not in seen:
+                        seen.add(pair)
+        # 쌍을 모은 뒤 i 순서로 묶어서 반환 (HammingIndex.iter_pairs와 같은 모양)
+        by_first = defaultdict(list)
+        for i, j in seen:
+            by_first[i].append(j)
+        for i in sorted(by_first):
+            neighbors = np.array(sorted(by_first[i]), dtype=np.int64)
+            yield i, neighbors, self.vectors[neighbors] @ self.vectors[i]
+
+def find_semantic_edges(paths, min_similarity=SEMANTIC_SIMILARITY_THRESHOLD, progress=None, cancel=None):
+    """
+    CLIP 임베딩 코사인 유사도(%)가 min_similarity 이상인 이미지 쌍을 (경로1, 경로2, 유사도 %) 목록으로 반환.
+    EMBEDDING_INDEX_MIN_SIZE장 이상이면 IVFIndex(근사), 그보다 적으면 전체 쌍 비교(정확)
+    """
+    found, vectors = get_clip_embeddings(paths, progress, cancel)
+    if is_cancelled(cancel) or len(found) < 2:
+        return []
+    threshold = min_similarity / 100.0
+    if len(found) >= EMBEDDING_INDEX_MIN_SIZE:
+        neighbor_pairs = IVFIndex(vectors).iter_pairs(threshold, cancel)
+    else:
+        neighbor_pairs = iter_embedding_neighbors(vectors, threshold, cancel)
+    return [(found[i], found[int(j)], min(100.0, float(sim) * 100))
+            for i, neighbors, sims in neighbor_pairs
+            for j, sim in zip(neighbors, sims)]
+
+# --- 메타데이터 후보 제한 (촬영 시각/카메라/비율) ---
+# 같은 장면의 연속 촬영/재촬영으로 보는 촬영 시각 차이 (초). 이보다 멀리 떨어진 사진끼리는 비교하지 않음
+METADATA_TIME_WINDOW = 120.0
+# 가로세로 비율이 이 비율(상대 차이) 이내면 같은 비율로 봄 (헤더 크기의 반올림, 몇 픽셀 잘라낸 사본 허용)
+METADATA_ASPECT_TOLERANCE = 0.03
+# 비율 블록의 폭 (log 비율 기준). 허용 차이 안의 두 비율은 같은 블록이나 바로 옆 블록에 들어감
+_ASPECT_BUCKET_WIDTH = -math.log(1 - METADATA_ASPECT_TOLERANCE)
+# 해시 캐시에 저장하는 메타데이터 형식 (읽는 항목이 바뀌면 올려서 기존 값을 무효화)
+IMAGE_METADATA_CACHE_KIND = "image:meta:1"
+
+def read_image_metadata(full_path):
+    """
+    픽셀을 디코딩하지 않고 헤더(EXIF)만 읽어 (촬영 시각(초), 카메라 모델, 가로세로 비율)을 반환.
+    비율은 긴 변/짧은 변(회전과 무관, 소수 둘째 자리). 읽지 못한 항목은 None
+    """
+    captured = camera = aspect = None
     try:
-        # --- [수정] ---
-        # 1. 파일을 파이썬의 open()으로 직접 읽습니다. (한글 경로 문제 해결)
-        with open(file1_path, 'rb') as f:
-            img_bytes1 = f.read()
-        with open(file2_path, 'rb') as f:
-            img_bytes2 = f.read()
-            
-        # 2. Pillow(Image)를 경로가 아닌 바이트(BytesIO)로 엽니다.
-        image1_pil = Image.open(io.BytesIO(img_bytes1))
-        image2_pil = Image.open(io.BytesIO(img_bytes2))
-        # --- [수정 끝] ---
-
-        hash1 = imagehash.phash(image1_pil)
-        hash2 = imagehash.phash(image2_pil)
-        hash_diff = hash1 - hash2 
-        phash_similarity = (64 - hash_diff) / 64 * 100
+        with Image.open(full_path) as img:  # 지연 열기: 헤더만 읽음
+            width, height = img.size
+            exif = img.getexif()
+            camera = str(exif.get(0x0110) or '').strip('\x00 ') or None  # Model
+            # DateTimeOriginal (Exif IFD), 없으면 DateTime
+            taken = exif.get_ifd(0x8769).get(0x9003) or exif.get(0x0132)
+        if min(width, height) > 0:
+            aspect = round(max(width, height) / min(width, height), 2)
+        if taken:
+            # 시간대 정보가 없으므로 UTC로 간주 (같은 카메라끼리의 시각 차이만 쓰므로 충분)
+            captured = float(calendar.timegm(time.strptime(str(taken).strip('\x00 ')[:19], '%Y:%m:%d %H:%M:%S')))
+    except (OSError, ValueError, OverflowError, SyntaxError):
+        pass  # RAW 등 PIL이 못 여는 파일: 모든 블록과 비교됨
+    return captured, camera, aspect
 
-        # --- [수정] ---
-        # 3. np.fromfile(경로) 대신 np.frombuffer(바이트)를 사용합니다. (한글 경로 문제 해결)
-        np_array1 = np.frombuffer(img_bytes1, np.uint8)
-        np_array2 = np.frombuffer(img_bytes2, np.uint8)
-        # --- [수정 끝] ---
+def get_image_metadata(paths, progress=None, cancel=None, use_cache=True):
+    """
+    이미지마다 read_image_metadata 결과를 구하여 {경로: (촬영 시각, 카메라, 비율)}을 반환 (단계: 'metadata').
+    compute_image_hashes와 같이 해시 캐시에 저장하여 바뀌지 않은 파일은 다시 읽지 않습니다.
+    """
+    cache = get_hash_cache() if use_cache else None
+    metadata = {}
+    stats = {}
+    misses = []
+    for full_path in paths:
+        if cache is not None:
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                st = None
+            if st is not None:
+                cached = cache.get(st, IMAGE_METADATA_CACHE_KIND)
+                if cached:
+                    metadata[full_path] = tuple(json.loads(cached))
+                    continue
+            stats[full_path] = st
+        misses.append(full_path)
+    report_progress(progress, 'metadata', len(metadata), len(paths))
 
-        image1_cv = cv2.imdecode(np_array1, cv2.IMREAD_GRAYSCALE)
-        image2_cv = cv2.imdecode(np_array2, cv2.IMREAD_GRAYSCALE)
-        
-        if image1_cv is None or image2_cv is None:
-            raise ValueError("OpenCV 이미지 로드 실패")
+    def miss_progress(stage, done, total):
+        report_progress(progress, stage, len(paths) - total + done, len(paths))
 
-        if image1_cv.shape != image2_cv.shape:
-            h, w = image2_cv.shape
-            image1_cv = cv2.resize(image1_cv, (w, h))
+    computed = compute_fingerprints(misses, read_image_metadata, 'metadata', miss_progress, cancel,
+                                    "이미지 메타데이터 읽기 오류", DEFAULT_FINGERPRINT_WORKERS)
+    if cache is not None:
+        for full_path, values in computed.items():
+            st = stats.get(full_path)
+            try:
+                if st is not None and _is_same_file_state(st, os.stat(full_path)):
+                    cache.put(st, IMAGE_METADATA_CACHE_KIND, json.dumps(values))
+            except OSError:
+                pass
+        cache.flush()
+    metadata.update(computed)
+    return {full_path: metadata[full_path] for full_path in paths if full_path in metadata}
 
-        ssim_score = ssim(image1_cv, image2_cv) * 100
-        
-        return (ssim_score, phash_similarity, hash_diff)
-    except Exception as e:
-        print(f"Similarity error: {e}")
-        return (None, None, None)
+def _split_blocks(blocks, key_func, adjacent=False):
+    """
+    블록마다 key_func(번호) 값이 같은 원소끼리 나눔. 값이 None인 원소는 따로 한 블록으로 두고,
+    원래 블록의 나머지 원소 전체와 교차 비교하도록 (None 원소, 나머지) 쌍을 함께 반환 (메타데이터가 없는 사본도 비교되도록)
+    - adjacent: True면 key가 정수 구간 번호이고, 이웃 구간(key, key + 1)끼리도 교차 비교 (허용 오차가 구간 경계에 걸친 쌍)
+    """
+    result = []
+    crosses = []
+    for block in blocks:
+        groups = defaultdict(list)
+        unknown = []
+        for index in block:
+            key = key_func(index)
+            (unknown if key is None else groups[key]).append(index)
+        if adjacent:
+            crosses.extend((groups[key], groups[key + 1]) for key in sorted(groups) if key + 1 in groups)
+        if not groups or not unknown:
+            result.extend(groups.values() or [block])
+            continue
+        result.extend(groups.values())
+        result.append(unknown)
+        crosses.append((unknown, [index for members in groups.values() for index in members]))
+    return result, crosses
+
+def aspect_bucket(aspect):
+    """비율의 블록 번호 (log 비율을 _ASPECT_BUCKET_WIDTH 폭으로 나눈 구간, 모르면 None)"""
+    return None if aspect is None else int(math.floor(math.log(aspect) / _ASPECT_BUCKET_WIDTH))
+
+def build_metadata_blocks(metadata, time_window=METADATA_TIME_WINDOW):
+    """
+    메타데이터 목록 [(촬영 시각, 카메라, 비율)...]을 비율 구간 → 카메라 → 촬영 시각 순으로 나누어
+    비교할 범위 [(행 번호 배열, 열 번호 배열 또는 None)...]을 반환.
+    열이 None이면 행끼리 모든 쌍을, 아니면 행 × 열 쌍을 비교합니다. (값을 모르는 원소와 나머지, 이웃 비율 구간끼리의 교차 비교)
+    촬영 시각은 정렬한 뒤 이웃과의 차이가 time_window를 넘는 곳에서 끊으므로,
+    블록 안의 time_window보다 먼 쌍, 비율이 허용 오차를 넘는 쌍, 교차 비교의 다른 카메라 쌍은 make_metadata_pair_filter로 거릅니다.
+    (결과는 is_metadata_compatible로 모든 쌍을 비교한 것과 같음)
+    """
+    blocks, crosses = _split_blocks([list(range(len(metadata)))], lambda index: aspect_bucket(metadata[index][2]),
+                                    adjacent=True)
+    blocks, camera_crosses = _split_blocks(blocks, lambda index: metadata[index][1])
+    crosses += camera_crosses
+    segments = []
+    for block in blocks:
+        known = sorted((index for index in block if metadata[index][0] is not None), key=lambda index: metadata[index][0])
+        unknown = [index for index in block if metadata[index][0] is None]
+        block_segments = []
+        for index in known:
+            if block_segments and metadata[index][0] - metadata[block_segments[-1][-1]][0] <= time_window:
+                block_segments[-1].append(index)
+            else:
+                block_segments.append([index])
+        segments.extend(block_segments)
+        if unknown:
+            segments.append(unknown)
+            if known:
+                crosses.append((unknown, known))
+    as_array = lambda members: np.array(sorted(members), dtype=np.int64)
+    return ([(as_array(segment), None) for segment in segments if len(segment) >= 2] +
+            [(as_array(rows), as_array(cols)) for rows, cols in crosses])
+
+def count_block_pairs(blocks):
+    """비교 범위 목록에서 비교하는 쌍 수"""
+    return sum(len(rows) * (len(rows) - 1) // 2 if cols is None else len(rows) * len(cols) for rows, cols in blocks)
+
+def iter_cross_hamming_neighbors(row_codes, col_codes, threshold, cancel=None):
+    """iter_hamming_neighbors의 교차 버전: 행 해시마다 해밍 거리 threshold 이하인 열 해시를 (행, [열...], [거리...])로 yield"""
+    block = max(1, HAMMING_BLOCK_ELEMENTS // max(len(col_codes), 1))
+    for start in range(0, len(row_codes), block):
+        if is_cancelled(cancel):
+            return
+        stop = min(start + block, len(row_codes))
+        distances = popcount64(row_codes[start:stop, None] ^ col_codes[None, :])
+        rows, cols = np.divmod(np.flatnonzero(distances <= threshold), distances.shape[1])
+        dists = distances[rows, cols]
+        bounds = np.searchsorted(rows, np.arange(stop - start + 1))
+        for offset in range(stop - start):
+            lo, hi = bounds[offset], bounds[offset + 1]
+            if lo < hi:
+                yield start + offset, cols[lo:hi].tolist(), dists[lo:hi].tolist()
+
+def iter_block_hamming_edges(codes, threshold, blocks, cancel=None):
+    """
+    비교 범위(build_metadata_blocks)마다 해밍 거리 threshold 이하인 쌍을 찾아 (i, j, 유사도 %) 간선을 yield (i < j, 전체 번호).
+    여러 범위에 함께 들어간 쌍은 한 번만 yield합니다.
+    """
+    seen = set()
+    for rows, cols in blocks:
+        if is_cancelled(cancel):
+            return
+        if cols is not None:
+            neighbor_pairs = iter_cross_hamming_neighbors(codes[rows], codes[cols], threshold, cancel)
+        elif len(rows) >= HAMMING_INDEX_MIN_SIZE:
+            cols = rows
+            neighbor_pairs = HammingIndex(codes[rows], threshold).iter_pairs(cancel=cancel)
+        else:
+            cols = rows
+            neighbor_pairs = iter_hamming_neighbors(codes[rows], threshold, cancel)
+        for i, neighbors, distances in neighbor_pairs:
+            first = int(rows[i])
+            for j, diff in zip(neighbors, distances):
+                second = int(cols[j])
+                pair = (min(first, second), max(first, second))
+                if pair not in seen:
+                    seen.add(pair)
+                    yield pair[0], pair[1], (64 - diff) / 64 * 100
+
+def is_metadata_compatible(metadata1, metadata2, time_window=METADATA_TIME_WINDOW):
+    """
+    두 사진의 (촬영 시각, 카메라, 비율) 중 둘 다 아는 항목이 모두 맞는지
+    (시각은 time_window초 이내, 비율은 상대 차이 METADATA_ASPECT_TOLERANCE 이내)
+    """
+    time1, camera1, aspect1 = metadata1
+    time2, camera2, aspect2 = metadata2
+    if camera1 is not None and camera2 is not None and camera1 != camera2:
+        return False
+    if aspect1 is not None and aspect2 is not None and \
+            abs(aspect1 - aspect2) > METADATA_ASPECT_TOLERANCE * max(aspect1, aspect2):
+        return False
+    return time1 is None or time2 is None or abs(time1 - time2) <= time_window
+
+def make_metadata_pair_filter(metadata_dict, time_window=METADATA_TIME_WINDOW):
+    """
+    is_metadata_compatible인 간선만 남기는 필터.
+    블록 안의 시각 사슬(A~B~C가 각각 time_window 이내)이나 교차 비교로 들어온 쌍을 정확히 거릅니다.
+    """
+    unknown = (None, None, None)
+    def pair_filter(edges, image_paths):
+        return [(i, j, similarity) for i, j, similarity in edges
+                if is_metadata_compatible(metadata_dict.get(image_paths[i], unknown),
+                                          metadata_dict.get(image_paths[j], unknown), time_window)]
+    return pair_filter
 
-def group_hashes(hashes_dict, threshold):
-    """해시 딕셔너리를 받아 유사도 임계값 기준으로 그룹화 (변경 없음)"""
+def iter_group_hashes(hashes_dict, threshold, cancel=None, linkage=DEFAULT_LINKAGE, pair_filters=(), stats=None,
+                      extra_edges=(), blocks=None):
+    """
+    group_hashes의 스트리밍 버전.
+    해밍 거리 threshold 이하인 쌍을 간선으로 모은 뒤 clustering 엔진으로 그룹화 (linkage: 'single' / 'complete')
+    - pair_filters: 후보 쌍을 차례로 거르는 (단계 이름, filter(간선 목록, 경로 목록) → 간선 목록) 목록 (싼 단계부터)
+    - stats: CascadeStats를 넘기면 단계별 쌍 수/통과율/시간을 기록
+    - extra_edges: 필터를 거치지 않고 더하는 (경로1, 경로2, 유사도 %) 간선 (예: CLIP 의미 유사 쌍)
+    - blocks: 서로 비교할 원소 번호 블록 목록 (build_metadata_blocks). None이면 전체 쌍에서 후보를 찾음
+    """
     image_paths = list(hashes_dict.keys())
-    groups = []
-    processed = set()
-    for i in range(len(image_paths)):
-        path1 = image_paths[i]
-        if path1 in processed: continue
-        current_group = {path1: 100.0}
-        hash1 = hashes_dict[path1]
-        for j in range(i + 1, len(image_paths)):
-            path2 = image_paths[j]
-            if path2 in processed: continue
-            hash2 = hashes_dict[path2]
-            diff = hash1 - hash2
-            if diff <= threshold:
-                similarity = (64 - diff) / 64 * 100
-                current_group[path2] = similarity
-                processed.add(path2)
-        if len(current_group) > 1:
-            processed.add(path1)
-            sorted_group = sorted(current_group.items(), key=lambda item: item[1], reverse=True)
-            groups.append(sorted_group)
-    return groups
-
-def find_similar_images_from_folder(folder_path, threshold):
-    """[수정] 폴더 내의 이미지들을 '바이트' 기반으로 스캔하여 유사 그룹 반환"""
-    hashes = {}
-    image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
-    for root, dirs, files in os.walk(folder_path):
-        for filename in files:
-            if not filename.lower().endswith(image_extensions): continue
-            full_path = os.path.join(root, filename)
-            try:
-                # --- [수정] ---
-                # Image.open(경로) 대신, 바이트로 읽어서 Image.open(BytesIO) 사용
-                with open(full_path, 'rb') as f:
-                    img_bytes = f.read()
-                with Image.open(io.BytesIO(img_bytes)) as img:
-                    hashes[full_path] = imagehash.phash(img)
-                # --- [수정 끝] ---
-            except Exception as e: 
-                print(f"❌ 이미지 해시 생성 오류: {full_path} → {e}")
-    return group_hashes(hashes, threshold)
-
-def find_similar_images_from_list(file_list, threshold):
+    started = time.perf_counter()
+    codes = pack_phashes(list(hashes_dict.values()))
+    if codes is None:
+        hashes = list(hashes_dict.values())
+        edges = list(iter_all_pairs_edges(hashes, lambda h1, h2: (64 - (h1 - h2)) / 64 * 100,
+                                          (64 - threshold) / 64 * 100, cancel=cancel))
+        score_func = lambda a, b: (64 - (hashes[a] - hashes[b])) / 64 * 100
+    else:
+        # 이웃 목록은 벡터 연산(많으면 HammingIndex)으로 구하고, 그룹화는 간선 목록만으로 처리 (입력 순서와 무관)
+        if blocks is not None:
+            neighbor_pairs = None
+        elif len(codes) >= HAMMING_INDEX_MIN_SIZE:
+            neighbor_pairs = HammingIndex(codes, threshold).iter_pairs(cancel=cancel)
+        else:
+            neighbor_pairs = iter_hamming_neighbors(codes, threshold, cancel)
+        if neighbor_pairs is None:
+            edges = list(iter_block_hamming_edges(codes, threshold, blocks, cancel))
+        else:
+            edges = [(i, j, (64 - diff) / 64 * 100)
+                     for i, neighbors, distances in neighbor_pairs
+                     for j, diff in zip(neighbors, distances)]
+        score_func = lambda a, b: (64 - int(popcount64(codes[a] ^ codes[b]))) / 64 * 100
+    if stats is not None:
+        n = len(image_paths)
+        compared = n * (n - 1) // 2 if blocks is None or codes is None else count_block_pairs(blocks)
+        stats.record('phash', compared, len(edges), time.perf_counter() - started)
+    for tier, pair_filter in pair_filters:
+        if is_cancelled(cancel):
+            return
+        started = time.perf_counter()
+        passed = pair_filter(edges, image_paths)
+        if stats is not None:
+            stats.record(tier, len(edges), len(passed), time.perf_counter() - started)
+        edges = passed
+    if is_cancelled(cancel):
+        return
+    if extra_edges:
+        index_of = {path: i for i, path in enumerate(image_paths)}
+        existing = {(i, j) for i, j, _ in edges}
+        for path1, path2, similarity in extra_edges:
+            i, j = index_of.get(path1), index_of.get(path2)
+            if i is None or j is None:
+                continue
+            i, j = min(i, j), max(i, j)
+            if (i, j) not in existing:
+                existing.add((i, j))
+                edges.append((i, j, similarity))
+    clusters = cluster_edges(len(image_paths), edges, linkage)
+    yield from build_similarity_groups(image_paths, clusters, edges, score_func)
+
+def iter_image_groups(paths, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE,
+                      dhash_threshold=None, ssim_threshold=None, stats=None, semantic_threshold=None,
+                      metadata_blocking=False, time_window=METADATA_TIME_WINDOW):
+    """
+    이미지 경로 목록을 싼 단계부터 비싼 단계 순으로 걸러 유사 그룹을 yield.
+    1) pHash 후보 검색 (해밍 거리 threshold 이하, 벡터 연산/HammingIndex)
+    2) dHash 일치 확인 (dhash_threshold 이하, None이면 생략. 'auto'면 threshold + DHASH_THRESHOLD_MARGIN)
+    3) 흑백 축소본 SSIM 확인 (ssim_threshold % 이상, None이면 생략. 살아남은 쌍의 이미지만 읽음)
+    + CLIP 의미 유사 쌍 추가 (semantic_threshold % 이상, None이면 생략). pHash가 놓치는 잘라내기/편집본을 같은 그룹으로 묶음
+    - metadata_blocking: True면 헤더의 비율/카메라/촬영 시각(time_window초 이내)이 맞는 사진끼리만 1)을 비교하고,
+      나머지 어긋난 쌍을 'metadata' 단계로 거름 ('blocking' 통계: 전체 쌍 → 비교 범위 쌍). False면 모든 사진을 서로 비교
+    - stats: CascadeStats를 넘기면 지문 계산('hash')과 단계별 쌍 수/통과율/시간을 기록
+    """
+    started = time.perf_counter()
+    kinds = ('phash', 'dhash') if dhash_threshold is not None else 'phash'
+    fingerprints = compute_image_hashes(paths, progress, cancel, kinds)
+    if stats is not None:
+        stats.record('hash', len(paths), len(fingerprints), time.perf_counter() - started, unit='개')
+    if is_cancelled(cancel):
+        return
+    pair_filters = []
+    blocks = None
+    if metadata_blocking:
+        started = time.perf_counter()
+        image_paths = list(fingerprints)
+        metadata = get_image_metadata(image_paths, progress, cancel)
+        if is_cancelled(cancel):
+            return
+        blocks = build_metadata_blocks([metadata.get(path, (None, None, None)) for path in image_paths], time_window)
+        pair_filters.append(('metadata', make_metadata_pair_filter(metadata, time_window)))
+        if stats is not None:
+            n = len(image_paths)
+            stats.record('blocking', n * (n - 1) // 2, count_block_pairs(blocks), time.perf_counter() - started)
+    if dhash_threshold is not None:
+        if dhash_threshold == 'auto':
+            dhash_threshold = threshold + DHASH_THRESHOLD_MARGIN
+        hashes = {path: values[0] for path, values in fingerprints.items()}
+        dhashes = {path: values[1] for path, values in fingerprints.items()}
+        pair_filters.append(('dhash', make_dhash_pair_filter(dhashes, dhash_threshold)))
+    else:
+        hashes = fingerprints
+    if ssim_threshold is not None:
+        pair_filters.append(('ssim', make_ssim_pair_filter(ssim_threshold, cancel)))
+    extra_edges = []
+    if semantic_threshold is not None:
+        started = time.perf_counter()
+        extra_edges = find_semantic_edges(list(hashes), semantic_threshold, progress, cancel)
+        if stats is not None:
+            n = len(hashes)
+            stats.record('clip', n * (n - 1) // 2, len(extra_edges), time.perf_counter() - started)
+        if is_cancelled(cancel):
+            return
+    yield from iter_group_hashes(hashes, threshold, cancel, linkage, pair_filters, stats, extra_edges, blocks)
+
+def iter_similar_images(folder_path, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE,
+                        dhash_threshold=None, ssim_threshold=None, stats=None, semantic_threshold=None,
+                        metadata_blocking=False, time_window=METADATA_TIME_WINDOW):
+    """
+    폴더(또는 FileIndex) 내 이미지의 유사 그룹을 확정되는 즉시 yield.
+    - progress: progress(단계, 처리 수, 전체 수) 콜백 (단계: 'hash')
+    - cancel: CancelToken (중지되면 그룹화 없이 종료)
+    - dhash_threshold / ssim_threshold / stats / semantic_threshold: 추가 검증·검색 단계와 통계 (iter_image_groups 참고)
+    - metadata_blocking / time_window: 촬영 시각/카메라/비율로 비교 범위 제한 (iter_image_groups 참고)
+    """
+    # RAW 파일은 내장 미리보기로 지문을 계산 (미리보기가 없는 파일은 오류로 보고됨)
+    image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif') + RAW_IMAGE_EXTENSIONS
+    paths = as_file_index(folder_path).paths(extensions=image_extensions)
+    yield from iter_image_groups(paths, threshold, progress, cancel, linkage, dhash_threshold, ssim_threshold, stats,
+                                 semantic_threshold, metadata_blocking, time_window)
+
+def find_similar_images_from_folder(folder_path, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE,
+                                    dhash_threshold=None, ssim_threshold=None, stats=None, semantic_threshold=None,
+                                    metadata_blocking=False, time_window=METADATA_TIME_WINDOW):
+    """[수정] 폴더(또는 FileIndex) 내의 이미지들을 '바이트' 기반으로 스캔하여 유사 그룹 반환"""
+    return list(iter_similar_images(folder_path, threshold, progress, cancel, linkage,
+                                    dhash_threshold, ssim_threshold, stats, semantic_threshold,
+                                    metadata_blocking, time_window))
+
+def find_similar_images_from_list(file_list, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE,
+                                  dhash_threshold=None, ssim_threshold=None, stats=None, semantic_threshold=None,
+                                  metadata_blocking=False, time_window=METADATA_TIME_WINDOW):
     """[수정] 파일 리스트 내의 이미지들을 '바이트' 기반으로 스캔하여 유사 그룹 반환"""
-    hashes = {}
-    for full_path in file_list:
-        if not os.path.isfile(full_path): continue
-        try:
-            # --- [수정] ---
-            # Image.open(경로) 대신, 바이트로 읽어서 Image.open(BytesIO) 사용
-            with open(full_path, 'rb') as f:
-                img_bytes = f.read()
-            with Image.open(io.BytesIO(img_bytes)) as img:
-                hashes[full_path] = imagehash.phash(img)
-            # --- [수정 끝] ---
-        except Exception as e: 
-            print(f"❌ 이미지 해시 생성 오류: {full_path} → {e}")
-    return group_hashes(hashes, threshold)
+    paths = [full_path for full_path in file_list if os.path.isfile(full_path)]
+    groups = list(iter_image_groups(paths, threshold, progress, cancel, linkage, dhash_threshold, ssim_threshold, stats,
+                                    semantic_threshold, metadata_blocking, time_window))
+    return [] if is_cancelled(cancel) else groups
 
 # app_logic.py 파일에 추가
 
 # app_logic.py 파일 끝 부분에 추가
 
-def analyze_image_quality_in_folder(folder_path):
+def iter_image_quality(folder_path, progress=None, cancel=None):
     """
-    폴더를 스캔하여 이미지 품질 점수를 계산하고 결과를 반환합니다.
-    (iqa_scorer.py의 로직을 호출)
+    폴더(또는 FileIndex)의 이미지를 하나씩 IQA 스코어러로 분석하여 결과 딕셔너리를 yield.
+    (IQA 기능이 비활성화된 경우 아무것도 yield하지 않습니다. 정렬은 호출자 몫입니다.)
     """
-    # [주의] 이 함수가 실행되려면 파일 상단에 'from iqa_scorer import hybrid_scorer, IQA_AVAILABLE'이 있어야 합니다.
     from iqa_scorer import hybrid_scorer, IQA_AVAILABLE
 
-    processed_groups = []
-    total_best_shots_found = 0
-
     if not IQA_AVAILABLE or hybrid_scorer is None:
-        # IQA 기능이 비활성화된 경우
-        return [], False 
-
-    image_paths = []
-    # 폴더 내 모든 파일을 순회하며 이미지 파일 경로를 수집
-    for root, _, files in os.walk(folder_path):
-        for filename in files:
-            full_path = os.path.join(root, filename)
-            # 수정된 get_file_category 함수를 사용해 이미지인지 확인
-            if get_file_category(full_path) == "Images":
-                image_paths.append(full_path)
-    
-    if not image_paths:
-        return [], True # 이미지가 없으므로 정상 종료
+        return
 
-    results = [] 
-    
-    # 1. 수집된 이미지 경로를 IQA 스코어러로 분석
-    for path in image_paths:
-        # [안전 모드] 충돌 대비: 데이터 구조를 미리 정의 (KeyError 방지)
-        iqa_score_data = {
-            "final_score": 0.0, 
-            "technical": 0.0, 
-            "aesthetic": 0.0, 
-            "raw_metrics": {"raw_laplacian": 0.0, "raw_brisque": 0.0, "raw_brightness": 127.0},
-            "penalty_applied": True, 
-        }
-        
+    # 인덱스에 기록된 카테고리로 이미지 파일만 수집 (크기/카테고리도 인덱스 값을 재사용)
+    image_entries = [entry for entry in as_file_index(folder_path) if entry.category == "Images"]
+
+    for done, entry in enumerate(image_entries, 1):
+        if is_cancelled(cancel):
+            return
+        path = entry.path
         try:
             # IQA_Scorer의 analyze_image 함수 호출
-            score_data = hybrid_scorer.analyze_image(path) 
-            results.append({
+            score_data = hybrid_scorer.analyze_image(path)
+            yield {
                 'path': path,
-                'category': get_file_category(path),
-                'size': os.path.getsize(path),
+                'category': entry.category,
+                'size': entry.size,
                 'score_data': score_data # 완성된 점수 구조
-            })
+            }
         except Exception as e:
-            # 오류 발생 시, 0점짜리 안전모드 데이터를 사용하거나 건너뜁니다.
-            # 여기서는 오류가 난 파일은 제외하고 건너뜁니다.
+            # 오류가 난 파일은 결과에 포함하지 않고 다음 파일로 이동
             print(f"❌ 품질 분석 오류 ({os.path.basename(path)}): {e}")
-            continue # 오류 난 파일은 결과에 포함하지 않고 다음 파일로 이동
-            
-    # 2. 최종 점수(final_score) 기준으로 내림차순 정렬
+        finally:
+            report_progress(progress, 'quality', done, len(image_entries))
+
+def analyze_image_quality_in_folder(folder_path, progress=None, cancel=None):
+    """
+    폴더(또는 FileIndex)를 스캔하여 이미지 품질 점수를 계산하고 결과를 반환합니다.
+    (iqa_scorer.py의 로직을 호출)
+    """
+    from iqa_scorer import hybrid_scorer, IQA_AVAILABLE
+
+    if not IQA_AVAILABLE or hybrid_scorer is None:
+        # IQA 기능이 비활성화된 경우
+        return [], False
+
+    results = list(iter_image_quality(folder_path, progress, cancel))
+
+    # 최종 점수(final_score) 기준으로 내림차순 정렬
     results.sort(key=lambda x: x['score_data']['final_score'], reverse=True)
-    
+
     return results, True
 
 
@@ -339,74 +3565,52 @@ def calculate_video_similarity(hashes1, hashes2):
             
     return (match_count / min_len) * 100.0
 
-def group_video_hashes(hashes_dict, threshold):
+def iter_similarity_groups(items_dict, similarity_func, threshold, cancel=None, linkage=DEFAULT_LINKAGE):
+    """
+    {경로: 지문} 딕셔너리를 similarity_func(지문1, 지문2) → 0~100% 기준으로 그룹화하여 yield (비디오/문서 공용)
+    - linkage: 'single'(연결 요소, 이미 이어진 쌍은 비교 생략) / 'complete'(모든 쌍 비교)
+    'single'은 건너뛴 쌍을 그룹이 정해진 뒤 그룹 안에서만 다시 비교하므로, 그룹 구성/기준/유사도 모두 입력 순서와 무관함
+    """
+    paths = list(items_dict.keys())
+    values = list(items_dict.values())
+    union_find = UnionFind(len(paths)) if linkage == 'single' else None
+    edges = list(iter_all_pairs_edges(values, similarity_func, threshold, union_find, cancel))
+    if is_cancelled(cancel):
+        return
+    if union_find is not None:
+        clusters = union_find.components()
+    else:
+        clusters = cluster_edges(len(paths), edges, linkage)
+    yield from build_similarity_groups(paths, clusters, edges,
+                                       lambda a, b: similarity_func(values[a], values[b]),
+                                       complete_scores=union_find is not None)
+
+def group_video_hashes(hashes_dict, threshold, linkage=DEFAULT_LINKAGE):
     """비디오 해시 딕셔너리를 받아 유사도 임계값(%) 기준으로 그룹화"""
-    video_paths = list(hashes_dict.keys())
-    groups = []
-    processed = set()
-    
-    for i in range(len(video_paths)):
-        path1 = video_paths[i]
-        if path1 in processed: continue
-        
-        current_group = {path1: 100.0}
-        hashes1 = hashes_dict[path1]
-        
-        for j in range(i + 1, len(video_paths)):
-            path2 = video_paths[j]
-            if path2 in processed: continue
-            
-            hashes2 = hashes_dict[path2]
-            
-            # 두 비디오의 유사도 계산 (0~100.0)
-            similarity = calculate_video_similarity(hashes1, hashes2)
-            
-            if similarity >= threshold:
-                current_group[path2] = similarity
-                processed.add(path2)
-        
-        if len(current_group) > 1:
-            processed.add(path1)
-            # 유사도 높은 순 정렬
-            sorted_group = sorted(current_group.items(), key=lambda item: item[1], reverse=True)
-            groups.append(sorted_group)
-            
-    return groups
+    return list(iter_similarity_groups(hashes_dict, calculate_video_similarity, threshold, linkage=linkage))
 
-def find_similar_videos_from_folder(folder_path, threshold):
-    """폴더 내 비디오들을 스캔하여 유사 그룹 반환"""
-    hashes = {}
+def iter_similar_videos(folder_path, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE):
+    """폴더(또는 FileIndex) 내 비디오의 유사 그룹을 확정되는 즉시 yield (단계: 'fingerprint')"""
     # 비디오 확장자 목록 (소문자)
     video_extensions = ('.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v')
-    
-    for root, dirs, files in os.walk(folder_path):
-        for filename in files:
-            if not filename.lower().endswith(video_extensions): continue
-            
-            full_path = os.path.join(root, filename)
-            try:
-                # 프레임 추출 및 해싱 (기본 10프레임)
-                vid_hashes = extract_video_fingerprint(full_path)
-                if vid_hashes:
-                    hashes[full_path] = vid_hashes
-            except Exception as e: 
-                print(f"❌ 비디오 해시 생성 오류: {full_path} → {e}")
-                
-    return group_video_hashes(hashes, threshold)
-
-def find_similar_videos_from_list(file_list, threshold):
+    paths = as_file_index(folder_path).paths(extensions=video_extensions)
+    # 프레임 추출 및 해싱 (기본 10프레임)
+    hashes = compute_fingerprints(paths, extract_video_fingerprint, 'fingerprint', progress, cancel, "비디오 해시 생성 오류")
+    if is_cancelled(cancel):
+        return
+    yield from iter_similarity_groups(hashes, calculate_video_similarity, threshold, cancel, linkage)
+
+def find_similar_videos_from_folder(folder_path, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE):
+    """폴더(또는 FileIndex) 내 비디오들을 스캔하여 유사 그룹 반환"""
+    return list(iter_similar_videos(folder_path, threshold, progress, cancel, linkage))
+
+def find_similar_videos_from_list(file_list, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE):
     """파일 리스트 내 비디오들을 스캔하여 유사 그룹 반환"""
-    hashes = {}
-    for full_path in file_list:
-        if not os.path.isfile(full_path): continue
-        try:
-            vid_hashes = extract_video_fingerprint(full_path)
-            if vid_hashes:
-                hashes[full_path] = vid_hashes
-        except Exception as e: 
-            print(f"❌ 비디오 해시 생성 오류: {full_path} → {e}")
-            
-    return group_video_hashes(hashes, threshold)
+    paths = [full_path for full_path in file_list if os.path.isfile(full_path)]
+    hashes = compute_fingerprints(paths, extract_video_fingerprint, 'fingerprint', progress, cancel, "비디오 해시 생성 오류")
+    if is_cancelled(cancel):
+        return []
+    return group_video_hashes(hashes, threshold, linkage)
 
 
 # --- 문서 유사도 검사 로직 ---
@@ -560,142 +3764,85 @@ def calculate_text_similarity(text1, text2):
     matcher = difflib.SequenceMatcher(None, text1, text2)
     return matcher.ratio() * 100.0
 
-def find_similar_docs_from_folder(folder_path, threshold):
-    """폴더 내 문서들을 스캔하여 유사 그룹 반환"""
-    
-    # [복구 완료] 변수명을 원래대로 doc_extensions로 되돌렸습니다.
+def extract_doc_text(filepath):
+    """비교용 문서 텍스트 추출: 내용이 너무 짧으면(10자 미만) 비교 제외를 위해 빈 문자열 반환"""
+    extracted_text = extract_text_from_file(filepath)
+    return extracted_text if len(extracted_text) > 10 else ""
+
+def iter_similar_docs(folder_path, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE):
+    """폴더(또는 FileIndex) 내 문서의 유사 그룹을 확정되는 즉시 yield (단계: 'text')"""
     # 단, 분석을 원하시는 .smi, .hwp, .srt는 목록에 포함되어야 인식이 가능합니다.
     doc_extensions = ('.txt', '.md', '.py', '.pdf', '.docx', '.hwp', '.smi', '.srt')
-    
-    docs = {}
-    
+
     # 1. 텍스트 추출 단계
-    for root, dirs, files in os.walk(folder_path):
-        for filename in files:
-            # 설정한 확장자로 끝나는 파일만 골라냅니다.
-            if filename.lower().endswith(doc_extensions):
-                full_path = os.path.join(root, filename)
-                extracted_text = extract_text_from_file(full_path)
-                
-                # 내용이 너무 짧으면(10자 미만) 비교 제외
-                if len(extracted_text) > 10:
-                    docs[full_path] = extracted_text
-
-    # 2. 비교 및 그룹화 단계 (기존 로직 그대로 유지)
-    doc_paths = list(docs.keys())
-    groups = []
-    processed = set()
-    
-    for i in range(len(doc_paths)):
-        path1 = doc_paths[i]
-        if path1 in processed: continue
-        
-        current_group = {path1: 100.0}
-        text1 = docs[path1]
-        
-        for j in range(i + 1, len(doc_paths)):
-            path2 = doc_paths[j]
-            if path2 in processed: continue
-            
-            text2 = docs[path2]
-            similarity = calculate_text_similarity(text1, text2)
-            
-            if similarity >= threshold:
-                current_group[path2] = similarity
-                processed.add(path2)
-        
-        if len(current_group) > 1:
-            processed.add(path1)
-            sorted_group = sorted(current_group.items(), key=lambda item: item[1], reverse=True)
-            groups.append(sorted_group)
-            
-    return groups
+    paths = as_file_index(folder_path).paths(extensions=doc_extensions)
+    docs = compute_fingerprints(paths, extract_doc_text, 'text', progress, cancel, "문서 텍스트 추출 오류")
+    if is_cancelled(cancel):
+        return
+
+    # 2. 비교 및 그룹화 단계
+    yield from iter_similarity_groups(docs, calculate_text_similarity, threshold, cancel, linkage)
 
+def find_similar_docs_from_folder(folder_path, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE):
+    """폴더(또는 FileIndex) 내 문서들을 스캔하여 유사 그룹 반환"""
+    return list(iter_similar_docs(folder_path, threshold, progress, cancel, linkage))
 
-def find_similar_docs_from_list(file_list, threshold):
+
+def find_similar_docs_from_list(file_list, threshold, progress=None, cancel=None, linkage=DEFAULT_LINKAGE):
     """파일 리스트 내 문서들을 스캔하여 유사 그룹 반환"""
-    docs = {}
-    
-    for full_path in file_list:
-        if not os.path.isfile(full_path):
-            continue
-        extracted_text = extract_text_from_file(full_path)
-        
-        if len(extracted_text) > 10:
-            docs[full_path] = extracted_text
-    
+    paths = [full_path for full_path in file_list if os.path.isfile(full_path)]
+    docs = compute_fingerprints(paths, extract_doc_text, 'text', progress, cancel, "문서 텍스트 추출 오류")
+    if is_cancelled(cancel):
+        return []
+
     # 비교 및 그룹화 단계
-    doc_paths = list(docs.keys())
-    groups = []
-    processed = set()
-    
-    for i in range(len(doc_paths)):
-        path1 = doc_paths[i]
-        if path1 in processed:
-            continue
-        
-        current_group = {path1: 100.0}
-        text1 = docs[path1]
-        
-        for j in range(i + 1, len(doc_paths)):
-            path2 = doc_paths[j]
-            if path2 in processed:
-                continue
-            
-            text2 = docs[path2]
-            similarity = calculate_text_similarity(text1, text2)
-            
-            if similarity >= threshold:
-                current_group[path2] = similarity
-                processed.add(path2)
-        
-        if len(current_group) > 1:
-            processed.add(path1)
-            sorted_group = sorted(current_group.items(), key=lambda item: item[1], reverse=True)
-            groups.append(sorted_group)
-    
-    return groups
+    return list(iter_similarity_groups(docs, calculate_text_similarity, threshold, linkage=linkage))
 
 
 # --- 통합 스캔 함수 (UnifiedScanPage) 로직 ---
 
-def unified_scan_folder(folder_path, image_threshold=10, video_threshold=60, doc_threshold=75, scan_img=True, scan_vid=True, scan_doc=True):
+def unified_scan_folder(folder_path, image_threshold=10, video_threshold=60, doc_threshold=75, scan_img=True, scan_vid=True, scan_doc=True, progress=None, cancel=None):
     """
     폴더를 스캔하여 선택된 유형(이미지, 비디오, 문서)의 유사도를 분석합니다.
     
     Parameters:
-    - folder_path: 스캔할 폴더 경로
+    - folder_path: 스캔할 폴더 경로 (또는 FileIndex)
     - image_threshold: 이미지 임계값
     - video_threshold: 비디오 임계값
     - doc_threshold: 문서 임계값
     - scan_img: 이미지 스캔 여부 (Boolean)
     - scan_vid: 비디오 스캔 여부 (Boolean)
     - scan_doc: 문서 스캔 여부 (Boolean)
+    - progress: progress(단계, 처리 수, 전체 수) 콜백 (단계: 'hash' / 'fingerprint' / 'text')
+    - cancel: CancelToken (중지되면 남은 검사를 건너뛰고 그때까지의 결과 반환)
     """
     results = {
         'images': [],
         'videos': [],
         'documents': []
     }
+
+    # 폴더는 한 번만 훑고, 세 가지 검사가 같은 인덱스를 공유
+    file_index = as_file_index(folder_path)
     
     # 1. 이미지 스캔 (선택 시에만 실행)
     if scan_img:
         try:
-            results['images'] = find_similar_images_from_folder(folder_path, image_threshold)
+            results['images'] = find_similar_images_from_folder(file_index, image_threshold, progress, cancel)
         except Exception as e:
             print(f"❌ 이미지 스캔 오류: {e}")
     
     # 2. 비디오 스캔 (선택 시에만 실행)
-    if scan_vid:
+    if scan_vid and not is_cancelled(cancel):
         try:
-            results['videos'] = find_similar_videos_from_folder(folder_path, video_threshold)
+            results['videos'] = find_similar_videos_from_folder(file_index, video_threshold, progress, cancel)
         except Exception as e:
             print(f"❌ 비디오 스캔 오류: {e}")
     
     # 3. 문서 스캔 (선택 시에만 실행)
-    if scan_doc:
+    if scan_doc and not is_cancelled(cancel):
         try:
-            results['documents'] = find_similar_docs_from_folder(folder_path, doc_threshold)
+            results['documents'] = find_similar_docs_from_folder(file_index, doc_threshold, progress, cancel)
         except Exception as e:
             print(f"❌ 문서 스캔 오류: {e}")
     
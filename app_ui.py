@@ -2,12 +2,16 @@
 
 import sys
 import os
+import time
+import re
+import multiprocessing
+from collections import defaultdict
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QPushButton, QLabel, QStackedWidget, QFrame,
                              QMessageBox, QTableWidget, QTableWidgetItem, 
                              QHeaderView, QHBoxLayout, QStyle, QSlider, QGridLayout, QTextEdit,
-                             QCheckBox, QSizePolicy)
-from PyQt5.QtCore import Qt, QSize
+                             QCheckBox, QSizePolicy, QLineEdit, QSpinBox)
+from PyQt5.QtCore import Qt, QSize, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor, QPalette
 
 # --- 1. 로직 파일 임포트 ---
@@ -50,6 +54,39 @@ def load_stylesheet(file_name):
         print(f"⚠️ 스타일시트 로드 오류: {e}")
         return ""
 
+# --- 미리보기 이미지 로더 ---
+def load_preview_pixmap(file_path, target_size=None):
+    """
+    미리보기용 QPixmap: RAW 파일은 내장된 미리보기 JPEG를 읽어 표시하고 (target_size 이상인 것을 우선, 없으면 작더라도),
+    그 밖의 파일은 원본을 디코딩 (JPEG의 EXIF 썸네일은 편집 전 이미지일 수 있으므로 쓰지 않음, 해시 계산과 같은 기준)
+    """
+    pixmap = QPixmap()
+    preview = None
+    if file_path.lower().endswith(app_logic.RAW_IMAGE_EXTENSIONS):
+        min_size = max(target_size.width(), target_size.height()) if target_size is not None else 0
+        preview = app_logic.read_embedded_preview(file_path, min_size) if min_size else None
+        if preview is None:
+            preview = app_logic.read_embedded_preview(file_path, 0)
+    if preview is not None and pixmap.loadFromData(preview):
+        return pixmap
+    # 한글 경로 대응: 바이트로 읽어서 로드
+    with open(file_path, 'rb') as f:
+        pixmap.loadFromData(f.read())
+    return pixmap
+
+
+# --- 유사도 그룹화 방식 선택 ---
+def make_linkage_checkbox():
+    """유사 검사 화면 공용 '엄격한 그룹화' 체크박스 (켜면 complete linkage, 끄면 single linkage)"""
+    checkbox = QCheckBox("엄격한 그룹화 (그룹 안의 모든 쌍이 기준 이상)")
+    checkbox.setToolTip(
+        "끄면 A~B, B~C처럼 이어지기만 해도 한 그룹으로 묶습니다. (빠름)\n"
+        "켜면 그룹 안의 모든 파일 쌍이 유사도 기준을 넘을 때만 묶어, 사슬처럼 길어지는 그룹을 막습니다.")
+    return checkbox
+
+def selected_linkage(checkbox):
+    return 'complete' if checkbox.isChecked() else 'single'
+
 
 # --- 메인 드롭/분석 화면 (UI 클래스) ---
 class MainDropAnalyzePage(QWidget):
@@ -65,6 +102,7 @@ class MainDropAnalyzePage(QWidget):
         self.setAcceptDrops(True)
         self.dropped_files = []
         self.folder_path = None
+        self.file_index = None  # 드롭한 파일/폴더의 공유 인덱스 (드롭마다 한 번만 생성)
         self.current_analysis_type = None  # 현재 분석 타입 저장
         self.current_duplicates = {}  # 중복 검사 결과 저장
         self.current_similar_groups = []  # 유사도 검사 결과 저장
@@ -289,52 +327,31 @@ class MainDropAnalyzePage(QWidget):
             return
         self.dropped_files = files
         self.folder_path = files[0] if os.path.isdir(files[0]) else os.path.dirname(files[0])
-        self.show_file_list(files)
-        self.show_stats(files)
+        # 폴더는 여기서 한 번만 훑고, 목록/통계/모든 검사가 같은 인덱스를 재사용
+        self.file_index = app_logic.FileIndex(files)
+        self.show_file_list(self.file_index)
+        self.show_stats(self.file_index)
         self.info_label.setText("✅ 파일 로드 완료!\n아래에서 원하는 기능을 선택하세요.")
 
-    def show_file_list(self, files):
+    def show_file_list(self, file_index):
         self.result_table.setRowCount(0)
-        # 폴더인 경우 내부 파일들을 수집
-        all_files = []
-        for f in files:
-            if os.path.isdir(f):
-                for root, dirs, filenames in os.walk(f):
-                    for fname in filenames:
-                        all_files.append(os.path.join(root, fname))
-            else:
-                all_files.append(f)
-        
-        # 최대 100개만 표시
-        display_files = all_files[:100]
-        for f in display_files:
+        # 최대 100개만 표시 (경로/크기는 인덱스에 기록된 값 사용)
+        display_entries = file_index.entries[:100]
+        for entry in display_entries:
             row = self.result_table.rowCount()
             self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(f))
-            try:
-                size = os.path.getsize(f) if os.path.isfile(f) else 0
-            except Exception:
-                size = 0
-            self.result_table.setItem(row, 1, QTableWidgetItem(app_logic.format_bytes(size)))
+            self.result_table.setItem(row, 0, QTableWidgetItem(entry.path))
+            self.result_table.setItem(row, 1, QTableWidgetItem(app_logic.format_bytes(entry.size)))
         
-        if len(all_files) > 100:
+        if len(file_index) > 100:
             row = self.result_table.rowCount()
             self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(f"... 외 {len(all_files) - 100}개 파일"))
+            self.result_table.setItem(row, 0, QTableWidgetItem(f"... 외 {len(file_index) - 100}개 파일"))
             self.result_table.setItem(row, 1, QTableWidgetItem(""))
 
-    def show_stats(self, files):
-        all_files = []
-        for f in files:
-            if os.path.isdir(f):
-                for root, dirs, filenames in os.walk(f):
-                    for fname in filenames:
-                        all_files.append(os.path.join(root, fname))
-            else:
-                all_files.append(f)
-        
-        total = len(all_files)
-        total_size = sum(os.path.getsize(f) for f in all_files if os.path.isfile(f))
+    def show_stats(self, file_index):
+        total = len(file_index)
+        total_size = file_index.total_size
         self.stats_label.setText(
             f"📊 <b>총 파일 수:</b> {total}개 | <b>총 용량:</b> {app_logic.format_bytes(total_size)}"
         )
@@ -349,7 +366,7 @@ class MainDropAnalyzePage(QWidget):
         QApplication.processEvents()
         
         try:
-            duplicates, total_files, total_size = app_logic.find_duplicate_files(self.folder_path)
+            duplicates, total_files, total_size = app_logic.find_duplicate_files(self.file_index)
             self.current_analysis_type = "duplicate"
             self.current_duplicates = duplicates
             self.display_duplicate_results(duplicates, total_files, total_size)
@@ -371,7 +388,7 @@ class MainDropAnalyzePage(QWidget):
         
         try:
             threshold = 10  # 기본값
-            groups = app_logic.find_similar_images_from_folder(self.folder_path, threshold)
+            groups = app_logic.find_similar_images_from_folder(self.file_index, threshold)
             self.current_analysis_type = "similar_image"
             self.current_similar_groups = groups
             self.display_similar_groups(groups, "이미지")
@@ -391,7 +408,7 @@ class MainDropAnalyzePage(QWidget):
         QApplication.processEvents()
         
         try:
-            results, success = app_logic.analyze_image_quality_in_folder(self.folder_path)
+            results, success = app_logic.analyze_image_quality_in_folder(self.file_index)
             if success:
                 self.current_analysis_type = "image_quality"
                 self.current_quality_results = results  # 품질 결과 저장
@@ -415,7 +432,7 @@ class MainDropAnalyzePage(QWidget):
         
         try:
             threshold = 60  # 기본값
-            groups = app_logic.find_similar_videos_from_folder(self.folder_path, threshold)
+            groups = app_logic.find_similar_videos_from_folder(self.file_index, threshold)
             self.current_analysis_type = "similar_video"
             self.current_similar_groups = groups
             self.display_similar_groups(groups, "비디오")
@@ -436,7 +453,7 @@ class MainDropAnalyzePage(QWidget):
         
         try:
             threshold = 75  # 기본값
-            groups = app_logic.find_similar_docs_from_folder(self.folder_path, threshold)
+            groups = app_logic.find_similar_docs_from_folder(self.file_index, threshold)
             self.current_analysis_type = "similar_doc"
             self.current_similar_groups = groups
             self.display_similar_groups(groups, "문서")
@@ -589,6 +606,8 @@ class MainDropAnalyzePage(QWidget):
             try:
                 if os.path.isfile(p):
                     os.remove(p)
+                    if self.file_index is not None:
+                        self.file_index.remove(p)
                     deleted += 1
                 else:
                     errors.append(f"파일이 존재하지 않습니다: {p}")
@@ -597,12 +616,9 @@ class MainDropAnalyzePage(QWidget):
         # 테이블에서 체크된 행 제거
         for r in sorted(checked_rows, reverse=True):
             self.analysis_result_table.removeRow(r)
-        # 통계 갱신
-        if self.folder_path and os.path.isdir(self.folder_path):
-            try:
-                self.show_stats([self.folder_path])
-            except Exception:
-                pass
+        # 통계 갱신 (삭제한 파일만 인덱스에서 빼고 다시 훑지 않음)
+        if self.file_index is not None:
+            self.show_stats(self.file_index)
         # 결과 알림
         if errors:
             QMessageBox.warning(self, "일부 삭제 실패", f"삭제: {deleted}개, 실패: {len(errors)}개\n\n" + "\n".join(errors[:10]))
@@ -722,7 +738,7 @@ class MainDropAnalyzePage(QWidget):
             if not self.first_selected_image:
                 self.first_selected_image = clicked_path
                 # 첫 번째 이미지만 표시
-                pixmap = QPixmap(clicked_path)
+                pixmap = load_preview_pixmap(clicked_path, self.img_preview_top.size())
                 if not pixmap.isNull():
                     scaled = pixmap.scaled(self.img_preview_top.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
                     filename = os.path.basename(clicked_path)
@@ -805,7 +821,7 @@ class MainDropAnalyzePage(QWidget):
                     similarity_info = f"📊 유사도: {phash_sim:.2f}%"
             
             # 첫 번째 이미지
-            pixmap1 = QPixmap(img_path1)
+            pixmap1 = load_preview_pixmap(img_path1, self.img_preview_top.size())
             if not pixmap1.isNull():
                 scaled1 = pixmap1.scaled(self.img_preview_top.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
                 self.img_preview_top.setPixmap(scaled1)
@@ -824,7 +840,7 @@ class MainDropAnalyzePage(QWidget):
                 )
             
             # 두 번째 이미지
-            pixmap2 = QPixmap(img_path2)
+            pixmap2 = load_preview_pixmap(img_path2, self.img_preview_bottom.size())
             if not pixmap2.isNull():
                 scaled2 = pixmap2.scaled(self.img_preview_bottom.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
                 self.img_preview_bottom.setPixmap(scaled2)
@@ -1033,7 +1049,7 @@ class MainDropAnalyzePage(QWidget):
     def show_quality_image_detail(self, img_path, result):
         """이미지 품질 검사 결과 상세 표시"""
         try:
-            pixmap = QPixmap(img_path)
+            pixmap = load_preview_pixmap(img_path, QSize(400, 400))
             if not pixmap.isNull():
                 scaled = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
                 self.img_preview_top.setPixmap(scaled)
@@ -1118,7 +1134,8 @@ class StatisticsWidget(QFrame):
             self.stats_label.setText("Matplotlib 라이브러리가 없어 그래프를 표시할 수 없습니다.\n`pip install matplotlib`를 실행하세요.")
             layout.addWidget(self.stats_label)
     
-    def update_stats(self, total_files, total_size, total_duplicates, total_dup_space, space_by_category):
+    def update_stats(self, total_files, total_size, total_duplicates, total_dup_space, space_by_category,
+                     linked_files=0, linked_space=0, archive_duplicates=0):
         valid_categories = {k: v for k, v in space_by_category.items() if v > 0}
         text = f"""
         <b>📊 스캔 통계</b><br>
@@ -1129,6 +1146,14 @@ class StatisticsWidget(QFrame):
         &nbsp; • 중복 파일 수: <b>{total_duplicates} 개</b> (총 {len(valid_categories)}개 유형)<br>
         &nbsp; • 낭비되는 용량: <font color='#FF6347' size='+1'><b>{app_logic.format_bytes(total_dup_space)}</b></font>
         """
+        if linked_files:
+            text += f"""<br>
+        &nbsp; • 하드링크로 이미 공유 중: {linked_files} 개 (절약 중: {app_logic.format_bytes(linked_space)})
+        """
+        if archive_duplicates:
+            text += f"""<br>
+        &nbsp; • 압축 파일 안의 중복 항목: {archive_duplicates} 개 (지우거나 링크로 바꿀 수 없어 낭비 용량에서 제외)
+        """
         self.stats_label.setText(text)
         if not MATPLOTLIB_AVAILABLE: return
         self.canvas.axes.clear()
@@ -1172,6 +1197,78 @@ class StatisticsWidget(QFrame):
             self.canvas.axes.set_facecolor('#3A3A3A')
             self.canvas.draw()
 
+# --- 추정 중복 그룹 백그라운드 검증 (빠른 검사 모드) ---
+class ProbableVerifyWorker(QThread):
+    """샘플로만 비교한 '추정 중복' 그룹을 백그라운드에서 전체 비교하여 하나씩 확정 결과를 알림"""
+    group_verified = pyqtSignal(str, list)  # (추정 그룹 키, [(확정 그룹 키, [경로...]), ...])
+
+    def __init__(self, groups, parent=None):
+        super().__init__(parent)
+        self.groups = list(groups)
+        self.cancel_token = app_logic.CancelToken()
+
+    def run(self):
+        for hash_key, paths in self.groups:
+            if self.cancel_token.cancelled:
+                return
+            try:
+                confirmed = app_logic.verify_probable_group(hash_key, paths)
+            except Exception as e:
+                print(f"❌ 추정 중복 검증 오류: {e}")
+                continue
+            if not self.cancel_token.cancelled:
+                self.group_verified.emit(hash_key, confirmed)
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+# --- 실시간 감시용 중복 상태 계산 (백그라운드) ---
+class TrackerBuildWorker(QThread):
+    """실시간 감시에 쓸 DuplicateTracker를 백그라운드에서 만듦 (전체 검사라서 GUI 스레드를 막지 않도록)"""
+    built = pyqtSignal(object)  # 완성된 DuplicateTracker
+    failed = pyqtSignal(str)
+
+    def __init__(self, source, scan_filter=None, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.scan_filter = scan_filter
+        self.cancel_token = app_logic.CancelToken()
+
+    def run(self):
+        try:
+            tracker = app_logic.DuplicateTracker(self.source, scan_filter=self.scan_filter, cancel=self.cancel_token)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if not self.cancel_token.cancelled:
+            self.built.emit(tracker)
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+class TrackerApplyWorker(QThread):
+    """감시자가 보고한 변경을 DuplicateTracker에 반영 (새 파일의 해시 계산이 GUI 스레드를 막지 않도록)"""
+    applied = pyqtSignal(object, object, object, int, int)  # 바뀐 그룹 키 집합, 통계, 하드링크, 변경 수, 삭제 수
+    failed = pyqtSignal(str)
+
+    def __init__(self, tracker, changed, deleted, deleted_dirs, parent=None):
+        super().__init__(parent)
+        self.tracker = tracker
+        self.changed = changed
+        self.deleted = deleted
+        self.deleted_dirs = deleted_dirs
+
+    def run(self):
+        try:
+            touched = self.tracker.apply(self.changed, self.deleted, self.deleted_dirs)
+            # 통계/하드링크 목록도 전체 상태를 훑으므로 여기서 미리 계산
+            stats = self.tracker.stats()
+            hardlinks = self.tracker.hardlinks
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.applied.emit(touched, stats, hardlinks, len(self.changed), len(self.deleted) + len(self.deleted_dirs))
+
 # --- 중복 파일 검사 화면 (UI 클래스) ---
 class DuplicateCheckPage(QWidget):
     def __init__(self, controller):
@@ -1179,6 +1276,23 @@ class DuplicateCheckPage(QWidget):
         self.controller = controller
         self.setAcceptDrops(True)
         self.current_stats = {}
+        self.current_hardlinks = {}
+        self.file_index = None
+        self.scanned_roots = []
+        # 실시간 감시 모드 상태 (감시자 + 변경분만 반영하는 중복 상태)
+        self.watcher = None
+        self.tracker = None
+        self.tracker_worker = None
+        self.apply_worker = None
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(1000)
+        self.watch_timer.timeout.connect(self.poll_watch_changes)
+        # 진행 중인 검사의 중지 토큰 (검사 중이 아니면 None)
+        self.cancel_token = None
+        self.last_progress_update = 0.0
+        # 빠른 검사로 찾은 '추정 중복' 그룹을 확정하는 백그라운드 작업
+        self.current_duplicates = {}
+        self.verify_worker = None
         
         main_layout = QHBoxLayout(self)
         main_layout.setContentsMargins(20, 20, 20, 20)
@@ -1216,6 +1330,53 @@ class DuplicateCheckPage(QWidget):
         self.batch_delete_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_TrashIcon))
         self.batch_delete_btn.setStyleSheet("background-color: #7A3A3A;")
         self.batch_delete_btn.clicked.connect(self.handle_batch_delete)
+        self.batch_link_btn = QPushButton("선택한 파일을 링크로 대체")
+        self.batch_link_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_FileLinkIcon))
+        self.batch_link_btn.setToolTip("파일 경로는 그대로 두고, 같은 그룹의 원본에 대한 하드링크(가능하면 reflink)로 바꿔 용량을 확보합니다.")
+        self.batch_link_btn.clicked.connect(self.handle_batch_link)
+        self.watch_checkbox = QCheckBox("실시간 감시 (폴더 변경 시 자동 갱신)")
+        self.watch_checkbox.setToolTip("새로 생기거나 바뀐 파일만 해시하여 중복 목록과 통계를 계속 최신 상태로 유지합니다.")
+        self.watch_checkbox.toggled.connect(self.toggle_watch_mode)
+        self.archive_checkbox = QCheckBox("압축 파일(zip/tar) 내부도 검사")
+        self.archive_checkbox.setToolTip("압축을 풀지 않고 내부 파일도 비교하여 'backup.zip!/DCIM/x.jpg' 형식으로 표시합니다.\n"
+                                         "압축 파일 안의 항목은 삭제하거나 링크로 대체할 수 없습니다.")
+        self.quick_checkbox = QCheckBox("빠른 검사 (대용량 파일은 샘플 비교 후 백그라운드 검증)")
+        self.quick_checkbox.setToolTip(
+            f"{app_logic.format_bytes(app_logic.QUICK_HASH_MIN_SIZE)} 이상인 파일은 앞/가운데/뒤 일부만 비교하여 "
+            "'추정 중복'으로 먼저 표시하고,\n백그라운드에서 전체 내용을 비교해 '확정'으로 바꿉니다.")
+        self.out_of_core_checkbox = QCheckBox("대용량 모드 (파일 목록을 메모리 대신 디스크에 보관)")
+        self.out_of_core_checkbox.setToolTip(
+            "수백만 개 이상의 파일을 검사할 때 사용합니다. 파일 목록과 해시를 임시 SQLite 파일에 두어\n"
+            "메모리 사용량이 파일 수와 거의 무관합니다. 압축 파일 내부 검사와 빠른 검사는 함께 쓸 수 없습니다.")
+        self.out_of_core_checkbox.toggled.connect(self.archive_checkbox.setDisabled)
+        self.out_of_core_checkbox.toggled.connect(self.quick_checkbox.setDisabled)
+        # 검사 범위: 제외 패턴(폴더는 통째로 건너뜀)과 크기 범위
+        # 기본값은 비워 두어 그냥 드롭하면 모든 파일을 검사 (자주 쓰는 제외 목록은 안내로만 표시)
+        self.exclude_edit = QLineEdit()
+        self.exclude_edit.setToolTip("이름과 일치하는 폴더는 하위까지 통째로 건너뜁니다.\n"
+                                     "'/'가 들어간 패턴은 전체 경로와 비교합니다. (예: */build/*)\n"
+                                     f"자주 쓰는 제외 목록: {', '.join(app_logic.DEFAULT_EXCLUDE_PATTERNS)}")
+        self.exclude_regex_checkbox = QCheckBox("정규식")
+        self.exclude_regex_checkbox.setToolTip("입력한 내용을 하나의 정규식으로 보고 전체 경로('/' 구분)에서 검색합니다.\n"
+                                               "예: /(build|dist)/|\\.tmp$")
+        self.exclude_regex_checkbox.toggled.connect(self.update_exclude_placeholder)
+        self.update_exclude_placeholder(False)
+        self.min_size_spin = QSpinBox()
+        self.min_size_spin.setRange(0, 10 * 1024 * 1024)
+        self.min_size_spin.setSuffix(" KB 이상")
+        self.min_size_spin.setToolTip("이보다 작은 파일은 해시하지 않고 검사에서 제외합니다.")
+        self.max_size_spin = QSpinBox()
+        self.max_size_spin.setRange(0, 10 * 1024 * 1024)
+        self.max_size_spin.setSuffix(" MB 이하")
+        self.max_size_spin.setSpecialValueText("최대 크기 제한 없음")
+        size_layout = QHBoxLayout()
+        size_layout.addWidget(self.min_size_spin)
+        size_layout.addWidget(self.max_size_spin)
+        self.stop_scan_btn = QPushButton("검사 중지")
+        self.stop_scan_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_BrowserStop))
+        self.stop_scan_btn.setToolTip("검사를 멈추고 지금까지 찾은 중복 그룹만 표시합니다.")
+        self.stop_scan_btn.setEnabled(False)
+        self.stop_scan_btn.clicked.connect(self.cancel_scan)
         button_layout = QHBoxLayout()
         button_layout.setAlignment(Qt.AlignRight)
         reset_btn = QPushButton("다시 하기")
@@ -1233,6 +1394,17 @@ class DuplicateCheckPage(QWidget):
         
         right_layout.addWidget(self.stats_widget, 1)
         right_layout.addWidget(self.batch_delete_btn)
+        right_layout.addWidget(self.batch_link_btn)
+        right_layout.addWidget(self.watch_checkbox)
+        right_layout.addWidget(self.archive_checkbox)
+        right_layout.addWidget(self.quick_checkbox)
+        right_layout.addWidget(self.out_of_core_checkbox)
+        exclude_layout = QHBoxLayout()
+        exclude_layout.addWidget(self.exclude_edit, 1)
+        exclude_layout.addWidget(self.exclude_regex_checkbox)
+        right_layout.addLayout(exclude_layout)
+        right_layout.addLayout(size_layout)
+        right_layout.addWidget(self.stop_scan_btn)
         right_layout.addLayout(button_layout)
 
         main_layout.addLayout(left_layout, 2)
@@ -1243,121 +1415,506 @@ class DuplicateCheckPage(QWidget):
         super().showEvent(event)
         main_window = self.controller.parent()
         if main_window and hasattr(main_window, 'folder_path') and main_window.folder_path:
-            if os.path.isdir(main_window.folder_path):
+            if os.path.isdir(main_window.folder_path) and self.cancel_token is None:
                 # 자동으로 스캔 시작
                 QApplication.processEvents()
                 self.info_label.setText(f"'{os.path.basename(main_window.folder_path)}' 스캔 중...")
                 QApplication.processEvents()
-                duplicates, total_files, total_size = app_logic.find_duplicate_files(main_window.folder_path)
-                self.process_statistics(duplicates, total_files, total_size)
-                self.populate_table(duplicates)
-                if not duplicates:
+                result = self.run_duplicate_scan([main_window.folder_path])
+                if result is None:
+                    return  # 이미 다른 검사가 진행 중
+                duplicates, cancelled = result
+                if cancelled:
+                    self.info_label.setText(f"⏹ 스캔 중지: 지금까지 {len(duplicates)}개 그룹의 중복 발견")
+                elif not duplicates:
                     self.info_label.setText("✅ 스캔 완료: 중복 파일이 없습니다.")
                 else:
                     self.info_label.setText(f"✅ 스캔 완료: {len(duplicates)}개 그룹의 중복 발견")
+                if self.watch_checkbox.isChecked() and not cancelled:
+                    self.start_watch_mode()
 
     def reset_page(self):
-        # (변경 없음)
+        self.cancel_scan()
+        self.stop_probable_verification()
+        self.stop_watch_mode()
+        self.scanned_roots = []
         self.info_label.setText("\n\n결과를 표시할 폴더를\n이곳으로 드래그 앤 드롭하세요.\n\n")
         self.info_label.setStyleSheet("")
         self.result_table.setRowCount(0)
         self.stats_widget.reset()
         self.current_stats = {}
+        self.current_hardlinks = {}
+        self.file_index = None
 
     def dragEnterEvent(self, event):
-        # (변경 없음)
-        if event.mimeData().hasUrls():
+        # 검사 중에는 드롭을 받지 않음 (진행 중인 검사의 안내 문구도 그대로 유지)
+        if event.mimeData().hasUrls() and self.cancel_token is None:
             event.accept()
             self.info_label.setText("\n\n좋습니다! 여기에 놓으세요.\n\n")
             self.info_label.setStyleSheet("border-color: #0078D7; color: #012433;")
         else: event.ignore()
 
-    def dragLeaveEvent(self, event): self.reset_page()
+    def dragLeaveEvent(self, event):
+        # 감시 중인 결과나 진행 중인 검사는 드래그가 지나가는 것만으로 지우거나 중지하지 않음
+        if self.watcher is None and self.cancel_token is None:
+            self.reset_page()
 
     def dropEvent(self, event):
-        # (변경 없음)
+        # 여러 폴더를 함께 놓으면 하나의 검사로 묶어 폴더 사이의 중복도 찾음
         files = [u.toLocalFile() for u in event.mimeData().urls()]
-        if not files: return
-        folder_path = files[0]
-        if os.path.isdir(folder_path):
-            self.info_label.setText(f"'{os.path.basename(folder_path)}' 폴더 검사 중...")
+        if not files or self.cancel_token is not None: return
+        folder_paths = [path for path in files if os.path.isdir(path)]
+        if folder_paths:
+            self.info_label.setText(f"{self.describe_roots(folder_paths)} 폴더 검사 중...")
             QApplication.processEvents()
-            duplicates, total_files, total_size = app_logic.find_duplicate_files(folder_path)
-            self.process_statistics(duplicates, total_files, total_size)
-            self.populate_table(duplicates)
-            if not duplicates:
+            result = self.run_duplicate_scan(folder_paths)
+            if result is None:
+                return  # 이미 다른 검사가 진행 중
+            duplicates, cancelled = result
+            if cancelled:
+                self.info_label.setText(f"⏹ 검사 중지: 지금까지 찾은 {len(duplicates)}개 그룹만 표시합니다.")
+            elif not duplicates:
                 self.info_label.setText("✅ 검사 완료: 중복된 파일이 없습니다.")
             else:
                 self.info_label.setText(f"검색 완료. 중복된 파일 목록은 아래와 같습니다.")
+            if self.watch_checkbox.isChecked() and not cancelled:
+                self.start_watch_mode()
         else:
             self.info_label.setText("⚠️ 폴더가 아닙니다. 폴더를 드래그 앤 드롭해주세요.")
             self.stats_widget.reset()
             self.current_stats = {}
 
+    def describe_roots(self, roots):
+        """검사 루트를 안내 문구용으로 표시 ('사진' 또는 '사진' 외 2개)"""
+        name = f"'{os.path.basename(roots[0].rstrip(os.sep)) or roots[0]}'"
+        return name if len(roots) == 1 else f"{name} 외 {len(roots) - 1}개"
+
+    def update_exclude_placeholder(self, regex):
+        if regex:
+            self.exclude_edit.setPlaceholderText("제외할 경로 정규식 (예: /(build|dist)/|\\.tmp$)")
+        else:
+            examples = ", ".join(app_logic.DEFAULT_EXCLUDE_PATTERNS[:4])
+            self.exclude_edit.setPlaceholderText(f"제외할 폴더/파일 패턴 (쉼표로 구분, 예: {examples}, *.tmp)")
+
+    def build_scan_filter(self):
+        """
+        입력한 제외 패턴(또는 정규식)/크기 범위로 ScanFilter를 만듦 (0이면 제한 없음).
+        정규식이 잘못되었으면 안내 후 None을 반환합니다.
+        """
+        text = self.exclude_edit.text()
+        exclude, exclude_regex = text.split(","), None
+        if self.exclude_regex_checkbox.isChecked():
+            exclude = ()
+            try:
+                exclude_regex = re.compile(text.strip()) if text.strip() else None
+            except re.error as e:
+                self.info_label.setText("⚠️ 제외 정규식이 올바르지 않아 검사하지 않았습니다.")
+                QMessageBox.warning(self, "정규식 오류", f"제외 정규식을 해석할 수 없습니다:\n{e}")
+                return None
+        return app_logic.ScanFilter(
+            exclude=exclude, exclude_regex=exclude_regex,
+            min_size=self.min_size_spin.value() * 1024 or None,
+            max_size=self.max_size_spin.value() * 1024 * 1024 or None)
+
+    def run_duplicate_scan(self, folder_paths):
+        """
+        중복 검사를 스트리밍으로 실행: 확정된 그룹을 즉시 표에 추가하고, 진행률을 표시하며,
+        '검사 중지'를 누르면 그때까지의 결과로 마무리합니다. (중복 딕셔너리, 중지 여부) 반환
+        이미 검사 중이면(processEvents 중 재진입) 아무것도 하지 않고 None을 반환합니다.
+        """
+        if self.cancel_token is not None:
+            return None
+        scan_filter = self.build_scan_filter()
+        if scan_filter is None:
+            return None
+        self.stop_watch_mode()
+        self.stop_probable_verification()
+        self.current_hardlinks = {}
+        self.result_table.setRowCount(0)
+        self.cancel_token = app_logic.CancelToken()
+        self.last_progress_update = 0.0
+        self.stop_scan_btn.setEnabled(True)
+        duplicates = {}
+        summary = {}
+        try:
+            if self.out_of_core_checkbox.isChecked():
+                # 대용량 모드: 파일 인덱스를 만들지 않고, 임시 SQLite 파일에서 확정된 그룹만 받아옴
+                self.file_index = None
+                self.scanned_roots = app_logic.normalize_roots(folder_paths)
+                groups = app_logic.iter_duplicate_files_out_of_core(
+                    self.scanned_roots, hardlinks=self.current_hardlinks, summary=summary,
+                    progress=self.on_scan_progress, cancel=self.cancel_token, scan_filter=scan_filter)
+            else:
+                self.file_index = app_logic.FileIndex(folder_paths, scan_filter)
+                # 겹치는 폴더는 하나로 정리된 루트 목록을 감시/안내에 사용
+                self.scanned_roots = self.file_index.roots
+                groups = app_logic.iter_duplicate_files(
+                    self.file_index, hardlinks=self.current_hardlinks,
+                    progress=self.on_scan_progress, cancel=self.cancel_token,
+                    archives=self.archive_checkbox.isChecked(), quick=self.quick_checkbox.isChecked())
+            for file_hash, paths in groups:
+                duplicates[file_hash] = paths
+                self.append_group_rows(file_hash, paths)
+                QApplication.processEvents()
+            cancelled = self.cancel_token.cancelled
+        finally:
+            self.cancel_token = None
+            self.stop_scan_btn.setEnabled(False)
+        self.current_duplicates = duplicates
+        if self.file_index is not None:
+            self.process_statistics(duplicates, len(self.file_index), self.file_index.total_size)
+        else:
+            self.process_statistics(duplicates, summary.get('total_files', 0), summary.get('total_size', 0))
+        if not cancelled:
+            self.start_probable_verification(duplicates)
+        return duplicates, cancelled
+
+    def start_probable_verification(self, duplicates):
+        """'추정 중복' 그룹이 있으면 백그라운드에서 전체 비교로 하나씩 확정"""
+        probable = [(key, paths) for key, paths in duplicates.items()
+                    if app_logic.get_group_confidence(key) == 'probable']
+        if not probable:
+            return
+        # 부모를 지정하므로 Python 참조가 사라져도 스레드가 끝날 때까지 객체가 유지됨
+        self.verify_worker = ProbableVerifyWorker(probable, self)
+        self.verify_worker.group_verified.connect(self.on_group_verified)
+        self.verify_worker.finished.connect(self.on_verify_finished)
+        self.verify_worker.start()
+
+    def on_verify_finished(self):
+        worker = self.sender()
+        if worker is self.verify_worker:
+            self.verify_worker = None
+        worker.deleteLater()
+
+    def stop_probable_verification(self):
+        if self.verify_worker is not None:
+            # 검증 중인 파일 하나는 끝까지 읽지만, 결과는 더 이상 표에 반영하지 않음
+            self.verify_worker.group_verified.disconnect(self.on_group_verified)
+            self.verify_worker.cancel()
+            self.verify_worker = None
+
+    def find_group_rows(self, file_hash):
+        """그룹 헤더 행 번호와 그 그룹에 속한 행 수(헤더 포함)를 반환 (없으면 (None, 0))"""
+        for row in range(self.result_table.rowCount()):
+            item = self.result_table.item(row, 0)
+            if item is not None and item.data(Qt.UserRole) == file_hash:
+                end = row + 1
+                while end < self.result_table.rowCount() and self.result_table.cellWidget(end, 0) is not None:
+                    end += 1
+                return row, end - row
+        return None, 0
+
+    def on_group_verified(self, probable_key, confirmed):
+        """추정 그룹의 검증 결과 반영: 그대로 확정되면 헤더만 바꾸고, 나뉘거나 틀렸으면 행을 다시 만듦"""
+        paths = self.current_duplicates.pop(probable_key, None)
+        if paths is None:
+            return
+        header_row, row_count = self.find_group_rows(probable_key)
+        if len(confirmed) == 1 and sorted(confirmed[0][1]) == sorted(paths) and header_row is not None:
+            file_hash = confirmed[0][0]
+            self.current_duplicates[file_hash] = paths
+            self.set_group_header(self.result_table.item(header_row, 0), file_hash)
+            for row in range(header_row + 1, header_row + row_count):
+                chk_box = self.result_table.cellWidget(row, 0).findChild(QCheckBox)
+                if chk_box is not None and not app_logic.is_archive_member_path(chk_box.property("file_path")):
+                    chk_box.setEnabled(True)
+                    chk_box.setToolTip("")
+            return
+
+        # 샘플만 같고 내용이 달랐던 경우: 기존 행을 지우고 확정된 그룹만 다시 추가, 통계도 차이만큼 조정
+        for row in reversed(range(header_row, header_row + row_count) if header_row is not None else []):
+            self.result_table.removeRow(row)
+        self.adjust_duplicate_stats(paths, -1)
+        for file_hash, group_paths in confirmed:
+            self.current_duplicates[file_hash] = group_paths
+            self.append_group_rows(file_hash, group_paths)
+            self.adjust_duplicate_stats(group_paths, +1)
+        self.renumber_rows()
+        self.stats_widget.update_stats(**self.current_stats)
+
+    def count_group_waste(self, paths):
+        """
+        그룹 하나의 (회수할 수 있는 중복 파일 수, 낭비 용량, 카테고리, 압축 파일 안의 항목 수)를 반환.
+        압축 파일 안의 항목은 지우거나 링크로 바꿀 수 없으므로, 일반 파일 중 하나를 남기고 나머지만 셉니다.
+        (파일이 없어졌으면 FileNotFoundError)
+        """
+        regular = [path for path in paths if not app_logic.is_archive_member_path(path)]
+        file_size, category = self.get_file_info(paths[0])
+        count = max(len(regular) - 1, 0)
+        return count, file_size * count, category, len(paths) - len(regular)
+
+    def adjust_duplicate_stats(self, paths, sign):
+        """그룹 하나가 차지하는 중복 파일 수/낭비 용량을 통계에 더하거나(+1) 뺌(-1)"""
+        if not self.current_stats or len(paths) < 2:
+            return
+        try:
+            count, wasted, category, archive_count = self.count_group_waste(paths)
+        except FileNotFoundError:
+            return
+        self.current_stats['total_duplicates'] += sign * count
+        self.current_stats['total_dup_space'] += sign * wasted
+        self.current_stats['archive_duplicates'] = self.current_stats.get('archive_duplicates', 0) + sign * archive_count
+        space_by_category = self.current_stats['space_by_category']
+        space_by_category[category] = space_by_category.get(category, 0) + sign * wasted
+
+    def renumber_rows(self):
+        """행을 중간에서 지운 뒤 체크박스에 기록된 행 번호(table_row)를 다시 맞춤"""
+        for row in range(self.result_table.rowCount()):
+            cell_widget = self.result_table.cellWidget(row, 0)
+            if cell_widget:
+                chk_box = cell_widget.findChild(QCheckBox)
+                if chk_box:
+                    chk_box.setProperty("table_row", row)
+
+    def cancel_scan(self):
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+
+    def on_scan_progress(self, stage, done, total):
+        """검사 진행률 표시 (UI 갱신은 0.1초에 한 번으로 제한)"""
+        now = time.monotonic()
+        if done < total and now - self.last_progress_update < 0.1:
+            return
+        self.last_progress_update = now
+        stage_names = {'index': "파일 목록 작성", 'partial': "앞부분 비교", 'full': "전체 내용 비교"}
+        percent = done * 100 // total if total else 100
+        self.info_label.setText(f"{self.describe_roots(self.scanned_roots)} 검사 중... "
+                                f"{stage_names.get(stage, stage)} {done}/{total} ({percent}%)")
+        QApplication.processEvents()
+
+    def toggle_watch_mode(self, checked):
+        if checked:
+            self.start_watch_mode()
+        else:
+            self.stop_watch_mode()
+
+    def start_watch_mode(self):
+        """검사한 폴더를 감시하며, 바뀐 파일만 반영하도록 증분 상태를 준비"""
+        if not self.scanned_roots or self.watcher is not None:
+            return
+        # 감시 모드는 모든 그룹을 전체 해시로 다시 계산하므로 추정 그룹 검증은 필요 없음
+        self.stop_probable_verification()
+        scan_filter = self.file_index.scan_filter if self.file_index is not None else self.build_scan_filter()
+        if scan_filter is None:
+            self.watch_checkbox.setChecked(False)
+            return
+        try:
+            # 감시를 먼저 시작하고 중복 상태는 백그라운드에서 계산 (그동안 생긴 변경은 계산이 끝난 뒤 반영)
+            self.watcher = app_logic.FolderWatcher(self.scanned_roots, scan_filter=scan_filter)
+        except Exception as e:
+            self.watcher = None
+            QMessageBox.warning(self, "감시 실패", f"실시간 감시를 시작할 수 없습니다:\n{e}")
+            self.watch_checkbox.setChecked(False)
+            return
+        # 방금 만든 인덱스와 해시 캐시를 재사용하므로 stat/해시를 다시 하지 않음
+        source = self.file_index.snapshot() if self.file_index is not None else self.scanned_roots
+        self.start_tracker_build(source, scan_filter)
+        self.watch_timer.start()
+        print(f"👀 실시간 감시 시작 ({self.watcher.mode}): {', '.join(self.scanned_roots)}")
+
+    def start_tracker_build(self, source, scan_filter=None):
+        """DuplicateTracker를 백그라운드에서 (다시) 만듦. 완성되면 on_tracker_built에서 교체"""
+        self.stop_tracker_build()
+        self.stop_watch_apply()
+        self.tracker = None
+        # 부모를 지정하므로 Python 참조가 사라져도 스레드가 끝날 때까지 객체가 유지됨
+        self.tracker_worker = TrackerBuildWorker(source, scan_filter, self)
+        self.tracker_worker.built.connect(self.on_tracker_built)
+        self.tracker_worker.failed.connect(self.on_tracker_failed)
+        self.tracker_worker.finished.connect(self.tracker_worker.deleteLater)
+        self.tracker_worker.start()
+        self.info_label.setText("👀 실시간 감시 준비 중... (중복 상태 계산)")
+
+    def stop_watch_apply(self):
+        if self.apply_worker is not None:
+            # 반영 중인 변경은 끝까지 처리하지만, 결과는 더 이상 표에 반영하지 않음
+            self.apply_worker.applied.disconnect(self.on_watch_changes_applied)
+            self.apply_worker.failed.disconnect(self.on_watch_apply_failed)
+            self.apply_worker = None
+
+    def stop_tracker_build(self):
+        if self.tracker_worker is not None:
+            self.tracker_worker.built.disconnect(self.on_tracker_built)
+            self.tracker_worker.failed.disconnect(self.on_tracker_failed)
+            self.tracker_worker.cancel()
+            self.tracker_worker = None
+
+    def on_tracker_built(self, tracker):
+        self.tracker_worker = None
+        if self.watcher is None:
+            return
+        self.tracker = tracker
+        self.show_watch_results(0, 0)
+
+    def on_tracker_failed(self, message):
+        self.tracker_worker = None
+        self.stop_watch_mode()
+        QMessageBox.warning(self, "감시 실패", f"실시간 감시를 시작할 수 없습니다:\n{message}")
+        self.watch_checkbox.setChecked(False)
+
+    def stop_watch_mode(self):
+        self.watch_timer.stop()
+        self.stop_tracker_build()
+        self.stop_watch_apply()
+        if self.watcher is not None:
+            self.watcher.close()
+        self.watcher = None
+        self.tracker = None
+
+    def poll_watch_changes(self):
+        """타이머마다 변경분만 백그라운드에서 반영 (결과는 on_watch_changes_applied에서 바뀐 그룹만 갱신)"""
+        if self.watcher is None or self.tracker is None or self.apply_worker is not None:
+            return  # 중복 상태를 계산/반영하는 동안에는 변경을 감시자에 쌓아 둠
+        changed, deleted, deleted_dirs, resync = self.watcher.poll()
+        if resync:
+            # 이벤트가 넘쳐 누락됐을 수 있으면 전체를 백그라운드에서 다시 계산 (해시는 캐시에서 대부분 재사용)
+            self.start_tracker_build(self.scanned_roots, self.tracker.scan_filter)
+            return
+        if not (changed or deleted or deleted_dirs):
+            return
+        self.apply_worker = TrackerApplyWorker(self.tracker, changed, deleted, deleted_dirs, self)
+        self.apply_worker.applied.connect(self.on_watch_changes_applied)
+        self.apply_worker.failed.connect(self.on_watch_apply_failed)
+        self.apply_worker.finished.connect(self.apply_worker.deleteLater)
+        self.apply_worker.start()
+
+    def on_watch_apply_failed(self, message):
+        # 반영 도중 실패하면 추적 상태가 어긋났을 수 있으므로 전체를 다시 계산
+        self.apply_worker = None
+        print(f"❌ 실시간 감시 반영 오류: {message}")
+        self.start_tracker_build(self.scanned_roots, self.tracker.scan_filter)
+
+    def on_watch_changes_applied(self, touched, stats, hardlinks, changed_count, deleted_count):
+        """바뀐 그룹의 행만 지우고 다시 추가 (빠른 검사의 검증 반영과 같은 방식)"""
+        self.apply_worker = None
+        for file_hash in touched:
+            header_row, row_count = self.find_group_rows(file_hash)
+            for row in reversed(range(header_row, header_row + row_count) if header_row is not None else []):
+                self.result_table.removeRow(row)
+            paths = self.tracker.groups.get(file_hash, ())
+            if len(paths) > 1:
+                self.current_duplicates[file_hash] = list(paths)
+                self.append_group_rows(file_hash, list(paths))
+            else:
+                self.current_duplicates.pop(file_hash, None)
+        if touched:
+            self.renumber_rows()
+        self.update_watch_stats(stats, hardlinks, changed_count, deleted_count)
+
+    def show_watch_results(self, changed_count, deleted_count):
+        """추적 중인 중복 상태로 표 전체와 통계를 다시 그림 (감시 시작/재계산 직후에만)"""
+        self.current_duplicates = self.tracker.duplicates
+        self.populate_table(self.current_duplicates)
+        self.update_watch_stats(self.tracker.stats(), self.tracker.hardlinks, changed_count, deleted_count)
+
+    def update_watch_stats(self, stats, hardlinks, changed_count, deleted_count):
+        self.current_hardlinks = hardlinks
+        self.current_stats = stats
+        self.stats_widget.update_stats(**self.current_stats)
+        self.info_label.setText(f"👀 실시간 감시 중: {len(self.current_duplicates)}개 그룹의 중복 "
+                                f"(변경 {changed_count}개, 삭제 {deleted_count}개 반영)")
+
+    def get_file_info(self, path):
+        """인덱스에 기록된 (크기, 카테고리)를 반환 (인덱스에 없으면 직접 조회)"""
+        if app_logic.is_archive_member_path(path):
+            return app_logic.get_archive_member_size(path), app_logic.get_file_category(path)
+        entry = self.file_index.get(path) if self.file_index is not None else None
+        if entry is not None:
+            return entry.size, entry.category
+        return os.path.getsize(path), app_logic.get_file_category(path)
+
     def process_statistics(self, duplicates, total_files, total_size):
-        # (변경 없음)
         total_duplicate_files = 0
         total_duplicate_space = 0
-        from collections import defaultdict
+        archive_duplicates = 0
         space_by_category = defaultdict(int)
         if duplicates:
             for paths in duplicates.values():
                 if not paths: continue
                 try:
-                    file_size = os.path.getsize(paths[0])
-                    category = app_logic.get_file_category(paths[0])
+                    num_duplicates_in_group, space_taken_by_duplicates, category, archive_count = \
+                        self.count_group_waste(paths)
                 except FileNotFoundError:
                     continue
-                num_duplicates_in_group = len(paths) - 1
-                space_taken_by_duplicates = file_size * num_duplicates_in_group
                 total_duplicate_files += num_duplicates_in_group
                 total_duplicate_space += space_taken_by_duplicates
+                archive_duplicates += archive_count
                 space_by_category[category] += space_taken_by_duplicates
+        # 하드링크로 이미 공유 중인 파일은 낭비 용량이 아니므로 따로 표시
+        linked_files = sum(len(paths) - 1 for paths in self.current_hardlinks.values())
+        linked_space = sum(app_logic.get_reclaimed_size(paths) for paths in self.current_hardlinks.values())
         self.current_stats = {
             'total_files': total_files,
             'total_size': total_size,
             'total_duplicates': total_duplicate_files,
             'total_dup_space': total_duplicate_space,
-            'space_by_category': dict(space_by_category)
+            'space_by_category': dict(space_by_category),
+            'linked_files': linked_files,
+            'linked_space': linked_space,
+            'archive_duplicates': archive_duplicates,
         }
         self.stats_widget.update_stats(**self.current_stats)
 
     def populate_table(self, duplicates):
-        # (변경 없음)
         self.result_table.setRowCount(0)
         for file_hash, paths in duplicates.items():
-            md5_part, sha_part = file_hash.split("_")
+            self.append_group_rows(file_hash, paths)
+
+    def set_group_header(self, header_item, file_hash):
+        """그룹 헤더에 해시와 신뢰도(확정 / 샘플 비교로 추정)를 표시"""
+        algorithm, digest = app_logic.split_hash_key(file_hash)
+        header_item.setData(Qt.UserRole, file_hash)
+        if app_logic.get_group_confidence(file_hash) == 'probable':
+            algorithm = algorithm[len(app_logic.QUICK_KEY_PREFIX):]
+            header_item.setText(f"❔ 추정 중복 그룹 ({algorithm.upper()}: {digest[:10]}...) · 신뢰도: 추정 (샘플 비교, 검증 중)")
+            header_item.setBackground(QColor("#6B5B2A"))
+        else:
+            header_item.setText(f"🔑 동일 파일 그룹 ({algorithm.upper()}: {digest[:10]}...) · 신뢰도: 확정")
+            header_item.setBackground(QColor("#4A4A4A"))
+
+    def append_group_rows(self, file_hash, paths):
+        """중복 그룹 하나(헤더 + 파일 행)를 표 끝에 추가"""
+        probable = app_logic.get_group_confidence(file_hash) == 'probable'
+        row_position = self.result_table.rowCount()
+        self.result_table.insertRow(row_position)
+        header_item = QTableWidgetItem()
+        header_item.setFont(QFont("Segoe UI", 9, QFont.Bold))
+        self.set_group_header(header_item, file_hash)
+        self.result_table.setSpan(row_position, 0, 1, 3) 
+        self.result_table.setItem(row_position, 0, header_item)
+        for path in paths:
+            try:
+                file_size, file_category = self.get_file_info(path)
+            except FileNotFoundError:
+                continue 
             row_position = self.result_table.rowCount()
             self.result_table.insertRow(row_position)
-            header_item = QTableWidgetItem(f"🔑 동일 파일 그룹 (MD5: {md5_part[:10]}...)")
-            header_item.setFont(QFont("Segoe UI", 9, QFont.Bold))
-            header_item.setBackground(QColor("#4A4A4A"))
-            self.result_table.setSpan(row_position, 0, 1, 3) 
-            self.result_table.setItem(row_position, 0, header_item)
-            for path in paths:
-                try:
-                    file_size = os.path.getsize(path)
-                    file_category = app_logic.get_file_category(path)
-                except FileNotFoundError:
-                    continue 
-                row_position = self.result_table.rowCount()
-                self.result_table.insertRow(row_position)
-                checkbox_widget = QWidget()
-                chk_layout = QHBoxLayout(checkbox_widget)
-                chk_box = QCheckBox()
-                chk_layout.addWidget(chk_box)
-                chk_layout.setAlignment(Qt.AlignCenter)
-                chk_layout.setContentsMargins(0,0,0,0)
-                checkbox_widget.setLayout(chk_layout)
-                chk_box.setProperty("file_path", path)
-                chk_box.setProperty("file_size", file_size)
-                chk_box.setProperty("file_category", file_category)
-                chk_box.setProperty("table_row", row_position)
-                self.result_table.setCellWidget(row_position, 0, checkbox_widget)
-                path_item = QTableWidgetItem(path)
-                self.result_table.setItem(row_position, 1, path_item)
-                size_item = QTableWidgetItem(app_logic.format_bytes(file_size))
-                self.result_table.setItem(row_position, 2, size_item)
+            checkbox_widget = QWidget()
+            chk_layout = QHBoxLayout(checkbox_widget)
+            chk_box = QCheckBox()
+            chk_layout.addWidget(chk_box)
+            chk_layout.setAlignment(Qt.AlignCenter)
+            chk_layout.setContentsMargins(0,0,0,0)
+            checkbox_widget.setLayout(chk_layout)
+            chk_box.setProperty("file_path", path)
+            chk_box.setProperty("file_size", file_size)
+            chk_box.setProperty("file_category", file_category)
+            chk_box.setProperty("table_row", row_position)
+            chk_box.setProperty("group_paths", paths)
+            if app_logic.is_archive_member_path(path):
+                # 압축 파일 안의 항목은 직접 지우거나 바꿀 수 없으므로 선택 불가
+                chk_box.setEnabled(False)
+                chk_box.setToolTip("압축 파일 안의 항목은 삭제하거나 링크로 대체할 수 없습니다.")
+            elif probable:
+                # 추정 중복은 전체 비교로 확정되기 전까지 삭제/링크 대상으로 고를 수 없음
+                chk_box.setEnabled(False)
+                chk_box.setToolTip("샘플만 비교한 추정 중복입니다. 검증이 끝나면 선택할 수 있습니다.")
+            self.result_table.setCellWidget(row_position, 0, checkbox_widget)
+            path_item = QTableWidgetItem(path)
+            self.result_table.setItem(row_position, 1, path_item)
+            size_item = QTableWidgetItem(app_logic.format_bytes(file_size))
+            self.result_table.setItem(row_position, 2, size_item)
 
     def handle_batch_delete(self):
         # (변경 없음)
@@ -1389,6 +1946,8 @@ class DuplicateCheckPage(QWidget):
         for row, path, size, category in sorted(files_to_delete, key=lambda x: x[0], reverse=True):
             try:
                 os.remove(path)
+                if self.file_index is not None:
+                    self.file_index.remove(path)
                 self.result_table.removeRow(row)
                 self.current_stats['total_duplicates'] -= 1
                 self.current_stats['total_dup_space'] -= size
@@ -1408,6 +1967,121 @@ class DuplicateCheckPage(QWidget):
             QMessageBox.warning(self, "삭제 실패", "파일을 삭제하는 중 오류가 발생했습니다.")
 
 
+    def handle_batch_link(self):
+        """선택한 중복 파일을 같은 그룹의 남겨둘 파일에 대한 링크로 대체 (경로 유지, 용량 확보)"""
+        files_to_link = []
+        for row in range(self.result_table.rowCount()):
+            cell_widget = self.result_table.cellWidget(row, 0)
+            if cell_widget:
+                chk_box = cell_widget.findChild(QCheckBox)
+                if chk_box and chk_box.isChecked() and chk_box.isEnabled():
+                    files_to_link.append((
+                        chk_box,
+                        chk_box.property("file_path"),
+                        chk_box.property("file_size"),
+                        chk_box.property("file_category"),
+                        chk_box.property("group_paths") or []
+                    ))
+        if not files_to_link:
+            QMessageBox.information(self, "선택 없음", "링크로 대체할 파일을 하나 이상 선택하세요.")
+            return
+        # 그룹마다 원본(링크 대상이 되지 않는 파일)을 먼저 정함 → 모두 선택해도 서로 엇갈려 링크되지 않음
+        selected_paths = {item[1] for item in files_to_link}
+        group_items = defaultdict(list)
+        for item in files_to_link:
+            group_items[tuple(item[4])].append(item)
+        plan = []  # (체크박스, 대상 경로, 크기, 카테고리, 원본 경로)
+        for group_paths, items in group_items.items():
+            source, targets = app_logic.plan_duplicate_links(group_paths, selected_paths)
+            for chk_box, path, size, category, _ in items:
+                if path in targets:
+                    plan.append((chk_box, path, size, category, source))
+                else:
+                    chk_box.setChecked(False)  # 원본으로 남기는 파일 / 이미 원본과 같은 inode인 파일
+        if not plan:
+            QMessageBox.information(self, "대체할 파일 없음",
+                                    "선택한 파일은 이미 원본과 링크되어 있거나, 그룹의 원본으로 남겨야 하는 파일입니다.")
+            return
+        total_size_to_link = sum(item[2] for item in plan)
+        reply = QMessageBox.question(self, '링크로 대체 확인',
+                                     f"<b>{len(plan)}개</b>의 파일을 같은 그룹의 원본 파일에 대한 링크로 대체하시겠습니까?<br><br>"
+                                     f"<b><font color='#FF6347'>총 확보 용량: {app_logic.format_bytes(total_size_to_link)}</font></b><br><br>"
+                                     f"파일 경로는 그대로 유지되며, 하드링크된 파일은 서로 내용을 공유합니다.",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.No:
+            return
+        linked_count = 0
+        space_saved = 0
+        errors = []
+        for chk_box, path, size, category, source in plan:
+            try:
+                used = app_logic.link_duplicate_file(source, path)
+                chk_box.setChecked(False)
+                chk_box.setEnabled(False)
+                size_item = self.result_table.item(chk_box.property("table_row"), 2)
+                if size_item:
+                    size_item.setText(f"{app_logic.format_bytes(size)} (🔗 {used})")
+                self.current_stats['total_duplicates'] -= 1
+                self.current_stats['total_dup_space'] -= size
+                if category in self.current_stats['space_by_category']:
+                    self.current_stats['space_by_category'][category] -= size
+                if used == 'hardlink':
+                    self.current_stats['linked_files'] += 1
+                    self.current_stats['linked_space'] += size
+                linked_count += 1
+                space_saved += size
+            except Exception as e:
+                errors.append(f"{os.path.basename(path)}: {e}")
+                print(f"링크 대체 오류 ({path}): {e}")
+        if linked_count > 0:
+            self.stats_widget.update_stats(**self.current_stats)
+        if errors:
+            QMessageBox.warning(self, "일부 대체 실패",
+                                f"대체: {linked_count}개, 실패: {len(errors)}개\n\n" + "\n".join(errors[:10]))
+        elif linked_count > 0:
+            QMessageBox.information(self, "링크 대체 완료",
+                                    f"총 {linked_count}개의 파일을 링크로 대체했습니다.\n"
+                                    f"확보된 용량: {app_logic.format_bytes(space_saved)}")
+        else:
+            QMessageBox.warning(self, "대체 실패", "링크로 대체할 원본 파일을 찾지 못했습니다.")
+
+# --- 유사 이미지 검사 (백그라운드) ---
+class SimilarImageScanWorker(QThread):
+    """유사 이미지 검사를 백그라운드에서 실행 (지문 계산, SSIM, CLIP 모델이 GUI 스레드를 막지 않도록)"""
+    progress_changed = pyqtSignal(str, int, int)  # 단계, 처리 수, 전체 수 (0.1초에 한 번으로 제한)
+    scanned = pyqtSignal(object, object)  # 유사 그룹 목록, CascadeStats
+    failed = pyqtSignal(str)
+
+    def __init__(self, source, options, from_list=False, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.options = options
+        self.from_list = from_list
+        self.cancel_token = app_logic.CancelToken()
+        self.last_progress_update = 0.0
+
+    def report_progress(self, stage, done, total):
+        now = time.monotonic()
+        if done < total and now - self.last_progress_update < 0.1:
+            return
+        self.last_progress_update = now
+        self.progress_changed.emit(stage, done, total)
+
+    def run(self):
+        stats = app_logic.CascadeStats()
+        find = app_logic.find_similar_images_from_list if self.from_list else app_logic.find_similar_images_from_folder
+        try:
+            groups = find(self.source, progress=self.report_progress, cancel=self.cancel_token, stats=stats,
+                          **self.options)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if not self.cancel_token.cancelled:
+            self.scanned.emit(groups, stats)
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
 # --- 유사 이미지 스캔 화면 (UI 클래스) (변경 없음) ---
 class SimilarImageScanPage(QWidget):
     def __init__(self, controller):
@@ -1415,6 +2089,7 @@ class SimilarImageScanPage(QWidget):
         self.controller = controller
         self.setAcceptDrops(True)
         self.first_file_path = None
+        self.scan_worker = None
         self.initial_text = ("\n\n유사 이미지를 스캔할 폴더를 드롭하거나,\n"
                              "비교할 파일 2개를 하나씩 드롭하세요.\n\n")
         main_layout = QHBoxLayout(self)
@@ -1438,6 +2113,31 @@ class SimilarImageScanPage(QWidget):
         self.threshold_slider.valueChanged.connect(self.update_slider_label)
         slider_layout.addWidget(self.threshold_label)
         slider_layout.addWidget(self.threshold_slider)
+        self.metadata_checkbox = QCheckBox("촬영 정보로 비교 범위 제한 (빠름)")
+        self.metadata_checkbox.setChecked(False)
+        self.metadata_checkbox.setToolTip(
+            "사진 헤더의 가로세로 비율"
+            f"({app_logic.METADATA_ASPECT_TOLERANCE:.0%} 오차 허용), 카메라 모델, 촬영 시각"
+            f"({int(app_logic.METADATA_TIME_WINDOW)}초 이내)이 맞는 사진끼리만 비교합니다.\n"
+            "정보가 없는 사진은 모든 사진과 비교합니다. 다른 카메라로 찍었거나 시각이 먼 사본은 찾지 못하므로 기본은 꺼 둡니다.")
+        slider_layout.addWidget(self.metadata_checkbox)
+        self.verify_checkbox = QCheckBox("정밀 검증 (dHash + SSIM, 느림)")
+        self.verify_checkbox.setToolTip(
+            "pHash로 찾은 후보 쌍을 dHash 지문과 흑백 축소본 SSIM"
+            f"({app_logic.DEFAULT_SSIM_THRESHOLD}% 이상)으로 한 번 더 확인하여 잘못 묶인 쌍을 걸러냅니다.\n"
+            "단계별 통과 수는 검사 후 안내 문구와 콘솔에 표시됩니다.")
+        slider_layout.addWidget(self.verify_checkbox)
+        self.semantic_checkbox = QCheckBox("잘라내기/보정한 사진도 찾기 (AI, 느림)")
+        self.semantic_checkbox.setToolTip(
+            "CLIP 임베딩의 코사인 유사도"
+            f"({app_logic.SEMANTIC_SIMILARITY_THRESHOLD:g}% 이상)로, pHash가 놓치는 잘라내기·회전·보정본도 같은 그룹으로 묶습니다.\n"
+            "처음 검사할 때 이미지마다 AI 모델을 실행하므로 오래 걸립니다. (계산한 임베딩은 캐시에 저장)")
+        if not app_logic.IQA_AVAILABLE:
+            self.semantic_checkbox.setEnabled(False)
+            self.semantic_checkbox.setToolTip("AI 모델을 불러올 수 없어 사용할 수 없습니다.")
+        slider_layout.addWidget(self.semantic_checkbox)
+        self.linkage_checkbox = make_linkage_checkbox()
+        slider_layout.addWidget(self.linkage_checkbox)
         self.result_table = QTableWidget()
         self.result_table.setObjectName("ResultTable")
         self.result_table.setColumnCount(2)
@@ -1518,13 +2218,15 @@ class SimilarImageScanPage(QWidget):
         self.single_preview_label.clear()
         self.preview_stack.setCurrentIndex(0)
     def dragEnterEvent(self, event):
-        if event.mimeData().hasUrls():
+        if self.scan_worker is not None:
+            event.ignore()  # 검사 중에는 새 드롭을 받지 않음
+        elif event.mimeData().hasUrls():
             event.accept()
             self.info_label.setText("\n\n좋습니다! 여기에 놓으세요.\n\n")
             self.info_label.setStyleSheet("border-color: #0078D7; color: #012433;")
         else: event.ignore()
     def dragLeaveEvent(self, event):
-        if self.first_file_path is None: self.reset_page()
+        if self.first_file_path is None and self.scan_worker is None: self.reset_page()
     def dropEvent(self, event):
         files = [u.toLocalFile() for u in event.mimeData().urls()]
         if not files: return
@@ -1591,29 +2293,59 @@ class SimilarImageScanPage(QWidget):
         except AttributeError:
             self.info_label.setText("❌ 오류: app_logic.py에 비디오 처리 함수가 없습니다.")
     def handle_folder_scan(self, folder_path):
-        self.info_label.setText(f"'{os.path.basename(folder_path)}' 스캔 중... (시간이 걸릴 수 있습니다)")
-        self.info_label.setAlignment(Qt.AlignCenter)
-        self.info_label.setStyleSheet("")
-        QApplication.processEvents()
-        threshold_percent = self.threshold_slider.value()
-        hamming_threshold = int(64 * (100 - threshold_percent) / 100)
-        similar_groups = app_logic.find_similar_images_from_folder(folder_path, hamming_threshold)
-        self.populate_table(similar_groups)
-        self.preview_stack.setCurrentIndex(1)
-        self.single_preview_label.setText("테이블에서 이미지를 클릭하세요.")
-        if not similar_groups: self.info_label.setText("✅ 검사 완료: 유사한 이미지가 없습니다.")
-        else: self.info_label.setText(f"검색 완료. 총 {len(similar_groups)}개의 유사 그룹을 찾았습니다.")
+        self.start_image_scan(folder_path, False, f"'{os.path.basename(folder_path)}' 스캔 중... (시간이 걸릴 수 있습니다)")
     def handle_multiple_file_scan(self, file_list):
-        self.info_label.setText(f"총 {len(file_list)}개 파일 스캔 중...")
+        self.start_image_scan(file_list, True, f"총 {len(file_list)}개 파일 스캔 중...")
+    def start_image_scan(self, source, from_list, message):
+        """유사 이미지 검사를 백그라운드 스레드에서 시작 (이미 검사 중이면 무시)"""
+        if self.scan_worker is not None:
+            return
+        self.info_label.setText(message)
         self.info_label.setAlignment(Qt.AlignCenter)
         self.info_label.setStyleSheet("")
-        QApplication.processEvents()
-        threshold_percent = self.threshold_slider.value()
-        hamming_threshold = int(64 * (100 - threshold_percent) / 100)
-        similar_groups = app_logic.find_similar_images_from_list(file_list, hamming_threshold)
+        self.scan_message = message
+        self.scan_worker = SimilarImageScanWorker(source, self.image_scan_options(), from_list, self)
+        self.scan_worker.progress_changed.connect(self.on_scan_progress)
+        self.scan_worker.scanned.connect(self.on_image_scan_finished)
+        self.scan_worker.failed.connect(self.on_image_scan_failed)
+        self.scan_worker.finished.connect(self.on_scan_worker_finished)
+        self.scan_worker.start()
+    def on_scan_progress(self, stage, done, total):
+        stage_names = {'hash': "지문 계산", 'metadata': "촬영 정보 읽기", 'embedding': "AI 임베딩 계산"}
+        percent = done * 100 // total if total else 100
+        self.info_label.setText(f"{self.scan_message}\n{stage_names.get(stage, stage)} {done}/{total} ({percent}%)")
+    def on_image_scan_finished(self, similar_groups, stats):
         self.populate_table(similar_groups)
-        if not similar_groups: self.info_label.setText("✅ 검사 완료: 유사한 이미지가 없습니다.")
-        else: self.info_label.setText(f"검색 완료. 총 {len(similar_groups)}개의 유사 그룹을 찾았습니다.")
+        if not self.scan_worker.from_list:
+            self.preview_stack.setCurrentIndex(1)
+            self.single_preview_label.setText("테이블에서 이미지를 클릭하세요.")
+        self.show_scan_result(similar_groups, stats)
+    def on_image_scan_failed(self, message):
+        self.info_label.setText(f"❌ 유사 이미지 검사 오류: {message}")
+    def on_scan_worker_finished(self):
+        self.scan_worker.deleteLater()
+        self.scan_worker = None
+    def image_scan_options(self):
+        """화면 설정(유사도 기준, 비교 범위 제한, 정밀 검증, AI 검색, 그룹화 방식)을 유사 이미지 검사 인자로 변환"""
+        threshold_percent = self.threshold_slider.value()
+        verify = self.verify_checkbox.isChecked()
+        semantic = self.semantic_checkbox.isEnabled() and self.semantic_checkbox.isChecked()
+        return {
+            'threshold': int(64 * (100 - threshold_percent) / 100),
+            'linkage': selected_linkage(self.linkage_checkbox),
+            'metadata_blocking': self.metadata_checkbox.isChecked(),
+            'dhash_threshold': 'auto' if verify else None,
+            'ssim_threshold': app_logic.DEFAULT_SSIM_THRESHOLD if verify else None,
+            'semantic_threshold': app_logic.SEMANTIC_SIMILARITY_THRESHOLD if semantic else None,
+        }
+    def show_scan_result(self, similar_groups, stats):
+        """검사 결과 안내 문구 + 단계별 통과 수 요약 (콘솔에는 단계별 통과율/시간)"""
+        print("🔎 유사 이미지 검사 단계별 결과:")
+        stats.print_report()
+        if not similar_groups: message = "✅ 검사 완료: 유사한 이미지가 없습니다."
+        else: message = f"검색 완료. 총 {len(similar_groups)}개의 유사 그룹을 찾았습니다."
+        summary = stats.summary()
+        self.info_label.setText(f"{message}\n({summary})" if summary else message)
     def show_image_preview_by_path(self, file_path, position="top"): 
         if position == "top":
             label = self.preview_label_top
@@ -1623,10 +2355,7 @@ class SimilarImageScanPage(QWidget):
             label = self.single_preview_label
         if os.path.exists(file_path):
             try:
-                pixmap = QPixmap()
-                with open(file_path, 'rb') as f:
-                    img_bytes = f.read()
-                pixmap.loadFromData(img_bytes)
+                pixmap = load_preview_pixmap(file_path, label.size())
                 label.setPixmap(pixmap.scaled(label.size(), 
                                               Qt.KeepAspectRatio, 
                                               Qt.SmoothTransformation))
@@ -1873,10 +2602,7 @@ class ImageQualityPage(QWidget):
         label = self.best_shot_image
         if os.path.exists(file_path):
             try:
-                pixmap = QPixmap()
-                with open(file_path, 'rb') as f:
-                    img_bytes = f.read()
-                pixmap.loadFromData(img_bytes)
+                pixmap = load_preview_pixmap(file_path, label.size())
                 
                 label.setPixmap(pixmap.scaled(label.size(), 
                                               Qt.KeepAspectRatio, 
@@ -2049,6 +2775,8 @@ class SimilarVideoScanPage(QWidget):
         
         slider_layout.addWidget(self.threshold_label)
         slider_layout.addWidget(self.threshold_slider)
+        self.linkage_checkbox = make_linkage_checkbox()
+        slider_layout.addWidget(self.linkage_checkbox)
 
         # 결과 테이블
         self.result_table = QTableWidget()
@@ -2222,7 +2950,8 @@ class SimilarVideoScanPage(QWidget):
         try:
             # app_logic.find_similar_videos_from_folder 구현 필요
             threshold = self.threshold_slider.value()
-            similar_groups = app_logic.find_similar_videos_from_folder(folder_path, threshold)
+            similar_groups = app_logic.find_similar_videos_from_folder(
+                folder_path, threshold, linkage=selected_linkage(self.linkage_checkbox))
             
             self.populate_table(similar_groups)
             
@@ -2240,7 +2969,8 @@ class SimilarVideoScanPage(QWidget):
         try:
             # app_logic.find_similar_videos_from_list 구현 필요
             threshold = self.threshold_slider.value()
-            similar_groups = app_logic.find_similar_videos_from_list(file_list, threshold)
+            similar_groups = app_logic.find_similar_videos_from_list(
+                file_list, threshold, linkage=selected_linkage(self.linkage_checkbox))
             
             self.populate_table(similar_groups)
             
@@ -2492,6 +3222,8 @@ class SimilarDocScanPage(QWidget):
         self.threshold_slider.valueChanged.connect(self.update_slider_label)
         slider_layout.addWidget(self.threshold_label)
         slider_layout.addWidget(self.threshold_slider)
+        self.linkage_checkbox = make_linkage_checkbox()
+        slider_layout.addWidget(self.linkage_checkbox)
 
         self.result_table = QTableWidget()
         self.result_table.setColumnCount(2)
@@ -2699,14 +3431,16 @@ class SimilarDocScanPage(QWidget):
     def handle_folder_scan(self, folder):
         self.info_label.setText("폴더 내 문서 스캔 및 텍스트 추출 중...")
         QApplication.processEvents()
-        groups = app_logic.find_similar_docs_from_folder(folder, self.threshold_slider.value())
+        groups = app_logic.find_similar_docs_from_folder(
+            folder, self.threshold_slider.value(), linkage=selected_linkage(self.linkage_checkbox))
         self.populate_table(groups)
         self.info_label.setText(f"스캔 완료. {len(groups)}개 그룹 발견.")
 
     def handle_multiple_scan(self, files):
         self.info_label.setText("파일 목록 분석 중...")
         QApplication.processEvents()
-        groups = app_logic.find_similar_docs_from_list(files, self.threshold_slider.value())
+        groups = app_logic.find_similar_docs_from_list(
+            files, self.threshold_slider.value(), linkage=selected_linkage(self.linkage_checkbox))
         self.populate_table(groups)
         self.info_label.setText(f"분석 완료. {len(groups)}개 그룹 발견.")
 
@@ -2938,9 +3672,11 @@ class UnifiedScanPage(QWidget):
         main_layout.addLayout(right_layout, 2)
         
         self.unified_results = {}
+        self.file_index = None
 
     def reset_page(self):
         self.folder_path = None
+        self.file_index = None
         self.info_label.setText("\n\n분석할 폴더를\n이곳으로 드래그 앤 드롭하세요.\n(아래에서 검사할 항목을 선택하세요)\n\n")
         self.info_label.setStyleSheet("")
         self.result_table.setRowCount(0)
@@ -2970,6 +3706,7 @@ class UnifiedScanPage(QWidget):
             return
         
         self.folder_path = folder_path
+        self.file_index = app_logic.FileIndex(folder_path)
         self.info_label.setText(f"✅ 폴더 로드 완료: {os.path.basename(folder_path)}\n체크박스를 선택하고 '검사 시작' 버튼을 누르세요.")
 
     def start_scan(self):
@@ -2999,7 +3736,7 @@ class UnifiedScanPage(QWidget):
         try:
             # 2. 로직 함수 호출 시 체크박스 상태(scan_xxx) 전달
             self.unified_results = app_logic.unified_scan_folder(
-                self.folder_path,
+                self.file_index,
                 image_threshold=image_threshold,
                 video_threshold=video_threshold,
                 doc_threshold=doc_threshold,
@@ -3096,6 +3833,8 @@ class MainWindow(QMainWindow):
         self.stacked_widget.addWidget(self.unified_scan_page)   # index 6
 
 if __name__ == '__main__':
+    # exe(PyInstaller)에서 이미지 지문용 작업 프로세스를 띄울 때 필요
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     if getattr(sys, 'frozen', False):
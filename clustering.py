@@ -0,0 +1,148 @@
+# 파일 이름: clustering.py
+"""
+유사도 그룹화 엔진 (이미지/비디오/문서 유사 검사 공용).
+
+후보 검색이 만든 (i, j, 유사도) 간선 목록으로 그룹을 만듭니다.
+- 'single'  : 연결 요소 (union-find). A~B, B~C이면 A, B, C가 한 그룹. 입력 순서와 무관하며 거의 선형 시간
+- 'complete': 완전 연결. 그룹 안의 모든 쌍이 임계값을 넘어야 함 (사슬처럼 이어지는 그룹 방지)
+"""
+
+LINKAGE_METHODS = ('single', 'complete')
+DEFAULT_LINKAGE = 'single'
+
+
+class UnionFind:
+    """경로 압축(halving) + 크기 기준 합치기를 쓰는 서로소 집합"""
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        """두 원소의 집합을 합치고, 새로 합쳐졌으면 True"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def components(self, min_size=2):
+        """min_size 이상인 집합을 [원소 번호...] 목록으로 반환 (그룹 안/그룹끼리 모두 가장 작은 번호 순)"""
+        members = {}
+        for x in range(len(self.parent)):
+            members.setdefault(self.find(x), []).append(x)
+        return [group for group in members.values() if len(group) >= min_size]
+
+
+def connected_components(n, edges, min_size=2):
+    """간선 목록 [(i, j, 유사도)...]의 연결 요소"""
+    union_find = UnionFind(n)
+    for i, j, _ in edges:
+        union_find.union(i, j)
+    return union_find.components(min_size)
+
+
+def complete_linkage_clusters(n, edges, min_size=2):
+    """
+    완전 연결 그룹화: 유사도가 높은 간선부터 보면서, 두 그룹의 모든 쌍이 간선으로 이어져 있을 때만 합침.
+    (간선이 없는 쌍은 임계값 미만으로 간주)
+    """
+    adjacency = [set() for _ in range(n)]
+    for i, j, _ in edges:
+        adjacency[i].add(j)
+        adjacency[j].add(i)
+    cluster_of = list(range(n))
+    members = {x: [x] for x in range(n)}
+    for i, j, _ in sorted(edges, key=lambda edge: (-edge[2], edge[0], edge[1])):
+        ci, cj = cluster_of[i], cluster_of[j]
+        if ci == cj:
+            continue
+        group_i, group_j = members[ci], members[cj]
+        if len(group_i) < len(group_j):
+            ci, cj, group_i, group_j = cj, ci, group_j, group_i
+        if all(adjacency[b].issuperset(group_i) for b in group_j):
+            for b in group_j:
+                cluster_of[b] = ci
+            group_i.extend(group_j)
+            del members[cj]
+    return sorted((sorted(group) for group in members.values() if len(group) >= min_size), key=lambda group: group[0])
+
+
+def cluster_edges(n, edges, linkage=DEFAULT_LINKAGE, min_size=2):
+    """linkage 방식('single' / 'complete')으로 간선 목록을 그룹화하여 [[원소 번호...]...]를 반환"""
+    if linkage == 'single':
+        return connected_components(n, edges, min_size)
+    if linkage == 'complete':
+        return complete_linkage_clusters(n, edges, min_size)
+    raise ValueError(f"지원하지 않는 그룹화 방식입니다: {linkage} (가능: {', '.join(LINKAGE_METHODS)})")
+
+
+def iter_all_pairs_edges(values, similarity_func, threshold, union_find=None, cancel=None):
+    """
+    값 목록의 모든 쌍(i < j)을 similarity_func로 비교하여 threshold 이상인 간선 (i, j, 유사도)를 yield.
+    union_find를 넘기면 이미 같은 그룹으로 이어진 쌍은 비교를 건너뛰고, 찾은 간선은 바로 합칩니다.
+    (연결 요소 결과는 같으면서 비싼 비교 횟수를 줄임. 완전 연결에는 모든 간선이 필요하므로 넘기지 않음)
+    """
+    n = len(values)
+    for i in range(n):
+        if cancel is not None and cancel.cancelled:
+            return
+        for j in range(i + 1, n):
+            if union_find is not None and union_find.connected(i, j):
+                continue
+            similarity = similarity_func(values[i], values[j])
+            if similarity >= threshold:
+                if union_find is not None:
+                    union_find.union(i, j)
+                yield i, j, similarity
+
+
+def build_similarity_groups(keys, clusters, edges, score_func=None, complete_scores=False):
+    """
+    그룹(원소 번호 목록)을 화면에 표시하는 형식 [[(키, 유사도)...]...]으로 변환.
+    그룹마다 유사도 합이 가장 큰 원소를 기준(100.0)으로 두고, 나머지는 기준과의 유사도 높은 순으로 정렬합니다.
+    (합이 같으면 키가 작은 쪽을 기준으로 하여 입력 순서와 무관하게 정함)
+    기준과 직접 이어진 간선이 없는 원소는 score_func(기준 번호, 원소 번호)로 계산합니다. (없으면 가장 가까운 간선 값)
+    - complete_scores: True면 그룹 안의 빠진 쌍을 모두 score_func로 채운 뒤 기준을 고름.
+      union-find로 비교를 건너뛴 간선 목록은 입력 순서에 따라 달라지므로, 이때 켜야 기준/유사도가 순서와 무관해짐
+      (그룹 크기 k에 대해 k(k-1)/2번 비교)
+    """
+    edge_scores = {}
+    for i, j, similarity in edges:
+        edge_scores[(i, j)] = edge_scores[(j, i)] = similarity
+    groups = []
+    for cluster in clusters:
+        if complete_scores and score_func is not None:
+            for position, a in enumerate(cluster):
+                for b in cluster[position + 1:]:
+                    if (a, b) not in edge_scores:
+                        edge_scores[(a, b)] = edge_scores[(b, a)] = score_func(a, b)
+        strength = {x: sum(edge_scores.get((x, other), 0.0) for other in cluster if other != x) for x in cluster}
+        reference = min(cluster, key=lambda x: (-strength[x], keys[x]))
+        group = [(keys[reference], 100.0)]
+        for member in cluster:
+            if member == reference:
+                continue
+            score = edge_scores.get((reference, member))
+            if score is None:
+                if score_func is not None:
+                    score = score_func(reference, member)
+                else:
+                    score = max((edge_scores[(member, other)] for other in cluster
+                                 if (member, other) in edge_scores), default=0.0)
+            group.append((keys[member], score))
+        group[1:] = sorted(group[1:], key=lambda item: (-item[1], item[0]))
+        groups.append(group)
+    return groups
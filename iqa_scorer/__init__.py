@@ -1,14 +1,18 @@
 # 파일 이름: iqa_scorer/__init__.py
 
+import multiprocessing
+
 # 필요한 라이브러리 설치 확인 및 임포트
 IQA_AVAILABLE = False
-try:
-    import torch
-    from .scorer_engine import HybridScorer 
-    IQA_AVAILABLE = True
-except ImportError as e:
+# 이미지 지문 계산용 작업 프로세스(app_logic.iter_fingerprints)는 모델을 쓰지 않으므로 torch/모델 로드를 건너뜀
+if multiprocessing.parent_process() is None:
+    try:
+        import torch
+        from .scorer_engine import HybridScorer 
+        IQA_AVAILABLE = True
+    except ImportError as e:
 
-    print(f"⚠️ IQA 기능 라이브러리 로드 실패. AI 품질 검사 비활성화: {e}")
+        print(f"⚠️ IQA 기능 라이브러리 로드 실패. AI 품질 검사 비활성화: {e}")
 
 hybrid_scorer = None
 if IQA_AVAILABLE:
@@ -14,6 +14,8 @@ class HybridScorer:
     """
     CLIP 미적 점수와 Laplacian/BRISQUE 기술 점수를 합산하여 최종 이미지 점수를 계산하는 클래스.
     """
+    CLIP_MODEL_NAME = "openai/clip-vit-base-patch32"
+
     def __init__(self, device='cpu'):
         # 1. 최종 점수 가중치 (총합 1.0)
         self.W_AESTHETIC = 0.65      # 미적 점수 가중치 (CLIP)
@@ -26,8 +28,10 @@ class HybridScorer:
         
         # 4. CLIP 모델 로드
         self.device = device
-        self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(self.device)
-        self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+        self.model = CLIPModel.from_pretrained(self.CLIP_MODEL_NAME).to(self.device)
+        self.processor = CLIPProcessor.from_pretrained(self.CLIP_MODEL_NAME)
+        # 이미지 임베딩 차원 (ViT-B/32: 512)
+        self.embedding_dim = self.model.config.projection_dim
         print(f"HybridScorer 초기화 완료. Device: {self.device}")
 
     # --- A. 기술적 지표 추출 ---
@@ -81,6 +85,37 @@ class HybridScorer:
         # 첫 번째 프롬프트("high quality...")의 확률을 100점 만점으로 변환
         return probs[0][0].item() * 100
 
+    # --- B-2. 이미지 임베딩 (유사 사진 검색용) ---
+    def get_image_embeddings(self, image_paths, batch_size=32):
+        """
+        CLIP 이미지 임베딩을 batch_size장씩 묶어 계산하여 {경로: 길이 1로 정규화된 float32 벡터}를 반환합니다.
+        (두 벡터의 내적 = 코사인 유사도. 열 수 없는 이미지는 제외)
+        """
+        embeddings = {}
+        for start in range(0, len(image_paths), batch_size):
+            paths, images = [], []
+            for image_path in image_paths[start:start + batch_size]:
+                try:
+                    # 한글 경로 대응: 바이트로 읽어서 열기
+                    with open(image_path, 'rb') as f:
+                        img_bytes = f.read()
+                    images.append(Image.open(io.BytesIO(img_bytes)).convert('RGB'))
+                    paths.append(image_path)
+                except Exception as e:
+                    print(f"❌ 임베딩용 이미지 로드 오류: {image_path} → {e}")
+            if not images:
+                continue
+            inputs = self.processor(images=images, return_tensors="pt").to(self.device)
+            with torch.no_grad():
+                features = self.model.get_image_features(**inputs)
+                if not torch.is_tensor(features):
+                    # transformers 버전에 따라 출력 객체로 반환됨
+                    features = features.pooler_output
+                features = features / features.norm(dim=-1, keepdim=True)
+            for image_path, vector in zip(paths, features.cpu().numpy().astype(np.float32)):
+                embeddings[image_path] = vector
+        return embeddings
+
     # --- C. 최종 점수 계산 로직 ---
     def calculate_final_score(self, blur, brightness, brisque_val, aesthetic_score):
         """기술 지표를 합산하고 미적 점수와 가중치를 적용하여 최종 점수를 계산합니다."""
@@ -0,0 +1,21 @@
+# 파일 이름: tests/conftest.py
+# 저장소 루트의 모듈(app_logic, clustering)을 테스트에서 바로 임포트할 수 있도록 경로 추가
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 해시 캐시/축소본 저장소가 사용자 캐시 폴더(~/.cache/iqa)에 쓰지 않도록 임시 폴더로 돌림 (app_logic 임포트 전)
+os.environ['XDG_CACHE_HOME'] = tempfile.mkdtemp(prefix='iqa-test-cache-')
+
+
+@pytest.fixture
+def fresh_hash_cache(tmp_path, monkeypatch):
+    """테스트마다 빈 전역 해시 캐시 (앞선 테스트의 캐시 값이 결과에 섞이지 않도록)"""
+    import app_logic
+    cache = app_logic.HashCache(str(tmp_path / 'hash_cache.sqlite3'))
+    monkeypatch.setattr(app_logic, '_hash_cache', cache)
+    yield cache
+    cache.conn.close()
@@ -0,0 +1,83 @@
+# 파일 이름: tests/test_clustering.py
+"""유사도 그룹화(single / complete linkage)가 정의대로, 입력 순서와 무관하게 그룹을 만드는지 확인"""
+import itertools
+import random
+
+import pytest
+
+import app_logic
+from clustering import UnionFind, cluster_edges
+
+
+def line_similarity(a, b):
+    """수직선 위 두 점의 거리로 정한 유사도 (가까울수록 100에 가까움)"""
+    return 100.0 - abs(a - b)
+
+
+def random_points(n, seed):
+    """사슬처럼 이어지는 점들과 떨어진 점들이 섞인 좌표"""
+    rng = random.Random(seed)
+    points = {}
+    x = 0.0
+    for i in range(n):
+        x += rng.choice([1.0, 2.0, 3.0, 4.0, 15.0])
+        points[f"file_{i:03d}"] = x
+    return points
+
+
+def brute_force_edges(values, threshold):
+    return [(i, j, line_similarity(values[i], values[j]))
+            for i, j in itertools.combinations(range(len(values)), 2)
+            if line_similarity(values[i], values[j]) >= threshold]
+
+
+def as_sets(groups):
+    return sorted(sorted(path for path, _ in group) for group in groups)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_single_linkage_matches_connected_components(seed):
+    points = random_points(40, seed)
+    paths, values = list(points), list(points.values())
+    union_find = UnionFind(len(values))
+    for i, j, _ in brute_force_edges(values, 95.0):
+        union_find.union(i, j)
+    expected = sorted(sorted(paths[x] for x in group) for group in union_find.components())
+    groups = list(app_logic.iter_similarity_groups(points, line_similarity, 95.0, linkage='single'))
+    assert as_sets(groups) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_complete_linkage_groups_are_cliques_inside_single_groups(seed):
+    points = random_points(40, seed)
+    complete = list(app_logic.iter_similarity_groups(points, line_similarity, 95.0, linkage='complete'))
+    single = as_sets(app_logic.iter_similarity_groups(points, line_similarity, 95.0, linkage='single'))
+    assert complete
+    for group in as_sets(complete):
+        for a, b in itertools.combinations(group, 2):
+            assert line_similarity(points[a], points[b]) >= 95.0
+        assert any(set(group) <= set(other) for other in single)
+
+
+@pytest.mark.parametrize("linkage", ['single', 'complete'])
+def test_groups_and_references_do_not_depend_on_input_order(linkage):
+    points = random_points(40, seed=7)
+    expected = sorted(app_logic.iter_similarity_groups(points, line_similarity, 95.0, linkage=linkage))
+    rng = random.Random(1)
+    for _ in range(10):
+        items = list(points.items())
+        rng.shuffle(items)
+        groups = sorted(app_logic.iter_similarity_groups(dict(items), line_similarity, 95.0, linkage=linkage))
+        assert groups == expected
+
+
+def test_chain_is_split_by_complete_linkage():
+    # 0~1, 1~2만 기준 이상 (0~2는 미만) → single은 한 그룹, complete는 먼저 본 간선 쪽만 묶음
+    edges = [(0, 1, 96.0), (1, 2, 96.0)]
+    assert cluster_edges(3, edges, 'single') == [[0, 1, 2]]
+    assert cluster_edges(3, edges, 'complete') == [[0, 1]]
+
+
+def test_unknown_linkage_is_rejected():
+    with pytest.raises(ValueError):
+        cluster_edges(2, [], 'average')
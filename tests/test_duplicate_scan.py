@@ -0,0 +1,128 @@
+# 파일 이름: tests/test_duplicate_scan.py
+"""중복 검사 파이프라인의 여러 경로(스레드 수, 정확 모드, 디스크 인덱스, 빠른 모드, 압축 파일)가 같은 결과를 내는지 확인"""
+import os
+import zipfile
+
+import pytest
+
+import app_logic
+
+BIG_SIZE = 4 * 1024 * 1024  # 빠른 모드 샘플(앞/가운데/뒤 1MB) 사이에 읽지 않는 구간이 남는 크기
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def body(seed, size=20000):
+    return bytes([seed]) * size
+
+
+def with_middle(seed, size, offset, marker):
+    """앞/뒤(부분 해시 구간)는 같고 offset 위치만 다른 내용"""
+    content = bytearray(body(seed, size))
+    content[offset:offset + len(marker)] = marker
+    return bytes(content)
+
+
+def group_sets(duplicates):
+    return sorted(sorted(paths) for paths in duplicates.values())
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    크기만 같은 파일, 앞/뒤가 같고 가운데만 다른 파일, 하드링크, 하위 폴더의 복사본이 섞인 폴더와
+    기대하는 중복 그룹 목록
+    """
+    root = tmp_path / 'root'
+    a1 = write(root / 'a1.bin', body(1))
+    a2 = write(root / 'sub' / 'a2.bin', body(1))
+    a3 = write(root / 'sub' / 'deep' / 'a3.bin', body(1))
+    write(root / 'same_size.bin', body(2))  # 크기만 같음 (부분 해시에서 갈림)
+    m1 = write(root / 'm1.bin', with_middle(3, 30000, 15000, b'xx'))
+    m2 = write(root / 'sub' / 'm2.bin', with_middle(3, 30000, 15000, b'xx'))
+    write(root / 'm3.bin', with_middle(3, 30000, 15000, b'yy'))  # 부분 해시까지 같고 전체 해시에서 갈림
+    tiny1 = write(root / 'tiny1.txt', b'hello')
+    tiny2 = write(root / 'sub' / 'tiny2.txt', b'hello')
+    write(root / 'unique.bin', body(4, 12345))
+    linked = str(root / 'sub' / 'a1_link.bin')
+    os.link(a1, linked)  # 이미 하드링크인 경로는 같은 inode로 한 번만 검사
+    expected = sorted(sorted(group) for group in ([a1, a2, a3], [m1, m2], [tiny1, tiny2]))
+    return str(root), expected
+
+
+@pytest.mark.parametrize("options", [
+    {'workers': 1},
+    {'workers': 4},
+    {'workers': 1, 'verify': True},
+    {'workers': 4, 'verify': True},
+    {'out_of_core': True, 'workers': 1},
+    {'out_of_core': True, 'workers': 4, 'verify': True},
+    {'quick': True},
+    {'archives': True},
+])
+def test_scan_modes_find_the_same_groups_and_totals(tree, fresh_hash_cache, options):
+    root, expected = tree
+    baseline = app_logic.find_duplicate_files(root, workers=1)
+    duplicates, total_files, total_size = app_logic.find_duplicate_files(root, **options)
+    assert group_sets(duplicates) == expected
+    assert (total_files, total_size) == baseline[1:]
+    # 하드링크 경로는 파일 수에는 들어가지만 용량은 한 번만 셈
+    assert total_files == 11
+    assert total_size == 3 * 20000 + 20000 + 3 * 30000 + 2 * 5 + 12345
+
+
+def test_cached_rescan_matches_first_scan(tree, fresh_hash_cache):
+    root, expected = tree
+    first = app_logic.find_duplicate_files(root, workers=4)
+    second = app_logic.find_duplicate_files(root, workers=4, verify=True)
+    assert group_sets(first[0]) == group_sets(second[0]) == expected
+    assert first[1:] == second[1:]
+
+
+def test_quick_mode_groups_are_probable_until_verified(tmp_path, fresh_hash_cache, monkeypatch):
+    monkeypatch.setattr(app_logic, 'QUICK_HASH_MIN_SIZE', 2 * 1024 * 1024)
+    root = tmp_path / 'root'
+    same1 = write(root / 'same1.bin', body(5, BIG_SIZE))
+    same2 = write(root / 'same2.bin', body(5, BIG_SIZE))
+    # 샘플 구간(0~1MB, 1.5~2.5MB, 3~4MB) 밖인 1.2MB 위치만 다름 → 샘플 지문은 같음
+    differ = write(root / 'differ.bin', with_middle(5, BIG_SIZE, 1200 * 1024, b'zz'))
+    small1 = write(root / 'small1.bin', body(6))
+    small2 = write(root / 'small2.bin', body(6))
+
+    exact, total_files, total_size = app_logic.find_duplicate_files(str(root), workers=2)
+    quick = app_logic.find_duplicate_files(str(root), workers=2, quick=True)
+    assert quick[1:] == (total_files, total_size)
+    confidence = {app_logic.get_group_confidence(key): sorted(paths) for key, paths in quick[0].items()}
+    assert confidence == {'probable': sorted([same1, same2, differ]), 'confirmed': sorted([small1, small2])}
+
+    (probable_key,) = [key for key in quick[0] if app_logic.get_group_confidence(key) == 'probable']
+    verified = dict(app_logic.verify_probable_group(probable_key, quick[0][probable_key]))
+    assert all(app_logic.get_group_confidence(key) == 'confirmed' for key in verified)
+    assert group_sets(verified) == [sorted([same1, same2])]
+    # 검증한 그룹의 키는 전체 해시로 찾은 그룹의 키와 같음
+    assert set(verified) <= set(exact)
+    confirmed = {key: paths for key, paths in quick[0].items() if key != probable_key}
+    confirmed.update(verified)
+    assert group_sets(confirmed) == group_sets(exact)
+
+
+def test_archive_members_join_matching_groups(tree, fresh_hash_cache):
+    root, expected = tree
+    archive = os.path.join(root, 'backup.zip')
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('photos/a.bin', body(1))
+        zf.writestr('photos/unique.bin', body(7))
+    member = app_logic.make_archive_member_path(archive, 'photos/a.bin')
+    # 압축 안의 a.bin만 body(1) 그룹(a1/a2/a3)에 합류
+    with_member = sorted(sorted(group + [member]) if len(group) == 3 else group for group in expected)
+    plain = app_logic.find_duplicate_files(root, workers=1)
+    for options in ({'workers': 1}, {'workers': 4}, {'workers': 4, 'verify': True}):
+        duplicates, total_files, total_size = app_logic.find_duplicate_files(root, archives=True, **options)
+        assert group_sets(duplicates) == with_member
+        # 압축 파일 자체는 파일 하나로만 셈
+        assert (total_files, total_size) == plain[1:]
+    assert group_sets(plain[0]) == expected
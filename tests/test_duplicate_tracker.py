@@ -0,0 +1,139 @@
+# 파일 이름: tests/test_duplicate_tracker.py
+"""실시간 감시용 DuplicateTracker를 변경마다 갱신한 결과가 같은 폴더를 처음부터 검사한 결과와 같은지 확인"""
+import os
+
+import pytest
+
+import app_logic
+
+FILE_SIZE = 50000
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def body(seed):
+    return bytes([seed]) * FILE_SIZE
+
+
+def inode_groups(duplicates):
+    """그룹을 (dev, ino) 집합으로 비교 (하드링크 중 어느 경로가 대표인지는 검사 순서에 따라 다름)"""
+    def inode(path):
+        st = os.stat(path)
+        return st.st_dev, st.st_ino
+    return sorted(sorted({inode(path) for path in paths}) for paths in duplicates.values())
+
+
+def assert_matches_fresh_scan(tracker, root):
+    duplicates, total_files, total_size = app_logic.find_duplicate_files(root)
+    assert inode_groups(tracker.duplicates) == inode_groups(duplicates)
+    stats = tracker.stats()
+    assert (stats['total_files'], stats['total_size']) == (total_files, total_size)
+    fresh = app_logic.DuplicateTracker(root).stats()
+    assert stats == fresh
+
+
+@pytest.mark.parametrize("delete_order", [
+    ['a', 'b', 'b2'],
+    ['b', 'a', 'b2'],
+    ['b2', 'b', 'a'],
+    ['c', 'a', 'b'],
+])
+def test_deleting_hardlinks_one_by_one_keeps_the_inode(tmp_path, fresh_hash_cache, delete_order):
+    root = tmp_path / 'root'
+    paths = {'a': write(root / 'a.bin', body(1)), 'c': write(root / 'c.bin', body(1))}
+    for name in ('b', 'b2'):
+        paths[name] = str(root / 'sub' / f'{name}.bin')
+        os.makedirs(os.path.dirname(paths[name]), exist_ok=True)
+        os.link(paths['a'], paths[name])
+    tracker = app_logic.DuplicateTracker(str(root))
+    assert_matches_fresh_scan(tracker, str(root))
+    assert tracker.stats()['linked_files'] == 2
+    for name in delete_order:
+        os.remove(paths[name])
+        tracker.apply(set(), {paths[name]})
+        assert_matches_fresh_scan(tracker, str(root))
+
+
+def test_new_hardlink_and_copy_are_tracked(tmp_path, fresh_hash_cache):
+    root = tmp_path / 'root'
+    original = write(root / 'a.bin', body(2))
+    write(root / 'other.bin', body(3))
+    tracker = app_logic.DuplicateTracker(str(root))
+    link = str(root / 'link.bin')
+    os.link(original, link)
+    tracker.apply({link}, set())
+    assert_matches_fresh_scan(tracker, str(root))
+    copy = write(root / 'copy.bin', body(2))
+    tracker.apply({copy}, set())
+    assert_matches_fresh_scan(tracker, str(root))
+    os.remove(original)
+    tracker.apply(set(), {original})
+    assert_matches_fresh_scan(tracker, str(root))
+
+
+def test_rewriting_a_hardlink_alias_rechecks_the_shared_inode(tmp_path, fresh_hash_cache):
+    root = tmp_path / 'root'
+    original = write(root / 'a.bin', body(4))
+    os.link(original, str(root / 'b.bin'))
+    write(root / 'c.bin', body(4))
+    tracker = app_logic.DuplicateTracker(str(root))
+    assert len(tracker.duplicates) == 1
+    # 별칭 경로로 내용을 바꾸면 (같은 크기) 대표 경로의 이벤트는 오지 않음
+    alias = next(iter(tracker.alias_of))
+    with open(alias, 'r+b') as f:
+        f.write(b'\xff' * 10)
+    tracker.apply({alias}, set())
+    assert_matches_fresh_scan(tracker, str(root))
+    assert tracker.duplicates == {}
+
+
+def test_moving_a_folder_out_removes_its_files(tmp_path, fresh_hash_cache):
+    root = tmp_path / 'root'
+    write(root / 'a.bin', body(5))
+    write(root / 'sub' / 'b.bin', body(5))
+    write(root / 'sub' / 'deep' / 'c.bin', body(6))
+    tracker = app_logic.DuplicateTracker(str(root))
+    os.rename(root / 'sub', tmp_path / 'moved')
+    tracker.apply(set(), set(), {str(root / 'sub')})
+    assert_matches_fresh_scan(tracker, str(root))
+
+
+def test_file_changes_only_touch_the_changed_size(tmp_path, fresh_hash_cache, monkeypatch):
+    root = tmp_path / 'root'
+    for i in range(200):
+        write(root / f'f{i}.bin', bytes([i % 251]) * (100 + i))
+    tracker = app_logic.DuplicateTracker(str(root))
+    reads = []
+    monkeypatch.setattr(app_logic, 'get_partial_hash', lambda path, *a, **k: reads.append(path) or path)
+    monkeypatch.setattr(app_logic, 'get_file_hash', lambda path, *a, **k: reads.append(path) or path)
+    # 폴더 전체를 훑는 경로(remove_tree)는 폴더 이벤트가 아니면 쓰이지 않아야 함
+    monkeypatch.setattr(tracker, 'remove_tree', lambda path: pytest.fail("remove_tree called for a file event"))
+    new_file = write(root / 'new.bin', b'x' * 99999)
+    tracker.apply({new_file}, {str(root / 'never_tracked.bin')})
+    assert reads == []
+    assert tracker.stats()['total_files'] == 201
+
+
+def test_apply_returns_only_the_groups_whose_rows_changed(tmp_path, fresh_hash_cache):
+    root = tmp_path / 'root'
+    write(root / 'a.bin', body(1))
+    write(root / 'b.bin', body(1))
+    write(root / 'c.bin', body(2))
+    tracker = app_logic.DuplicateTracker(str(root))
+    (group_key,) = tracker.duplicates
+
+    unique = write(root / 'd.bin', body(3))
+    assert tracker.apply({unique}, set()) == set()
+    copy = write(root / 'e.bin', body(2))
+    new_key = tracker.apply({copy}, set())
+    assert new_key == {key for key, paths in tracker.duplicates.items() if copy in paths}
+    assert group_key not in new_key
+
+    os.remove(str(root / 'b.bin'))
+    assert tracker.apply(set(), {str(root / 'b.bin')}) == {group_key}
+    assert group_key not in tracker.duplicates
+    assert_matches_fresh_scan(tracker, str(root))
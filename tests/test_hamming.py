@@ -0,0 +1,77 @@
+# 파일 이름: tests/test_hamming.py
+"""pHash 벡터 비교(pack_phashes / iter_hamming_neighbors)가 쌍별 비교와 같은 결과를 내는지 확인"""
+import numpy as np
+import imagehash
+import pytest
+
+import app_logic
+
+
+def random_codes(n, seed=0, near_fraction=0.3, max_flips=12):
+    """무작위 64비트 해시 + 일부는 앞의 해시에서 몇 비트만 뒤집은 가까운 해시"""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, 2 ** 63, n, dtype=np.uint64) * np.uint64(2) + rng.integers(0, 2, n, dtype=np.uint64)
+    for i in range(1, n):
+        if rng.random() < near_fraction:
+            flips = rng.choice(64, rng.integers(0, max_flips + 1), replace=False)
+            mask = np.uint64(sum(1 << int(bit) for bit in flips))
+            codes[i] = codes[rng.integers(0, i)] ^ mask
+    return codes
+
+
+def brute_force_pairs(codes, threshold):
+    return {(i, j, bin(int(codes[i]) ^ int(codes[j])).count("1"))
+            for i in range(len(codes)) for j in range(i + 1, len(codes))
+            if bin(int(codes[i]) ^ int(codes[j])).count("1") <= threshold}
+
+
+def neighbor_triples(neighbor_pairs):
+    return {(i, j, d) for i, neighbors, distances in neighbor_pairs for j, d in zip(neighbors, distances)}
+
+
+def test_pack_phashes_matches_imagehash_distance():
+    rng = np.random.default_rng(1)
+    hashes = [imagehash.ImageHash(rng.random((8, 8)) > 0.5) for _ in range(50)]
+    codes = app_logic.pack_phashes(hashes)
+    assert codes.dtype == np.uint64 and codes.shape == (50,)
+    distances = app_logic.popcount64(codes[:, None] ^ codes[None, :])
+    for i in range(50):
+        for j in range(50):
+            assert distances[i, j] == hashes[i] - hashes[j]
+
+
+def test_pack_phashes_rejects_non_64_bit_hashes():
+    hashes = [imagehash.ImageHash(np.zeros((8, 8), dtype=bool)), imagehash.ImageHash(np.zeros((16, 16), dtype=bool))]
+    assert app_logic.pack_phashes(hashes) is None
+    assert app_logic.pack_phashes([]) is None
+
+
+@pytest.mark.parametrize("threshold", [0, 5, 10, 20])
+def test_iter_hamming_neighbors_matches_brute_force(threshold, monkeypatch):
+    codes = random_codes(400, seed=threshold)
+    # 블록 경계가 여러 번 생기도록 행 블록을 작게
+    monkeypatch.setattr(app_logic, "HAMMING_BLOCK_ELEMENTS", 400 * 7)
+    assert neighbor_triples(app_logic.iter_hamming_neighbors(codes, threshold)) == brute_force_pairs(codes, threshold)
+
+
+@pytest.mark.parametrize("threshold,num_chunks", [(0, None), (3, None), (6, None), (10, None), (10, 4), (6, 7)])
+def test_hamming_index_pairs_match_brute_force(threshold, num_chunks):
+    codes = random_codes(600, seed=100 + threshold)
+    index = app_logic.HammingIndex(codes, threshold, num_chunks)
+    assert neighbor_triples(index.iter_pairs()) == brute_force_pairs(codes, threshold)
+
+
+def test_hamming_index_smaller_query_distance_matches_brute_force():
+    codes = random_codes(300, seed=7)
+    index = app_logic.HammingIndex(codes, 12)
+    assert neighbor_triples(index.iter_pairs(max_distance=5)) == brute_force_pairs(codes, 5)
+
+
+def test_hamming_index_query_matches_brute_force():
+    codes = random_codes(300, seed=9)
+    index = app_logic.HammingIndex(codes, 8)
+    for i in range(0, 300, 17):
+        ids, distances = index.query(codes[i])
+        expected = {j: bin(int(codes[i]) ^ int(codes[j])).count("1") for j in range(300)
+                    if bin(int(codes[i]) ^ int(codes[j])).count("1") <= 8}
+        assert dict(zip(ids.tolist(), distances.tolist())) == expected
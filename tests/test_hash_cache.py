@@ -0,0 +1,46 @@
+# 파일 이름: tests/test_hash_cache.py
+"""해시 캐시가 크기나 수정 시각이 바뀐 파일의 이전 해시를 돌려주지 않는지 확인"""
+import os
+
+import app_logic
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def body(seed, size=20000):
+    return bytes([seed]) * size
+
+
+def test_hash_cache_misses_after_size_or_mtime_change(tmp_path):
+    cache = app_logic.HashCache(str(tmp_path / 'cache.sqlite3'))
+    try:
+        path = write(tmp_path / 'file.bin', body(1))
+        st = os.stat(path)
+        cache.put(st, 'full:blake2b', 'digest')
+        assert cache.get(os.stat(path), 'full:blake2b') == 'digest'
+        assert cache.get(os.stat(path), 'partial:4096:blake2b') is None
+
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert cache.get(os.stat(path), 'full:blake2b') is None
+
+        cache.put(os.stat(path), 'full:blake2b', 'digest')
+        with open(path, 'ab') as f:
+            f.write(b'more')
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # 수정 시각은 그대로, 크기만 다름
+        assert cache.get(os.stat(path), 'full:blake2b') is None
+    finally:
+        cache.conn.close()
+
+
+def test_rewritten_file_is_rehashed_instead_of_read_from_cache(tmp_path, fresh_hash_cache):
+    path = write(tmp_path / 'file.bin', body(1))
+    st = os.stat(path)
+    before = app_logic.get_file_hash(path)
+    before_partial = app_logic.get_partial_hash(path, st.st_size)
+    write(tmp_path / 'file.bin', body(2))  # 같은 크기, 다른 내용
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert app_logic.get_file_hash(path) == app_logic.get_file_hash(path, use_cache=False) != before
+    assert app_logic.get_partial_hash(path, st.st_size) != before_partial
@@ -0,0 +1,74 @@
+# 파일 이름: tests/test_image_decode.py
+"""JPEG 축소 디코딩(open_reduced_image)으로 구한 지문이 원본 디코딩 지문과 허용 비트 이내인지 확인"""
+import io
+
+import imagehash
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+import app_logic
+
+# 축소 디코딩 지문과 원본 디코딩 지문의 최대 해밍 거리 (64비트 중, PHASH_DECODE_MIN_SIZE 주석과 같은 값)
+REDUCED_DECODE_MAX_BITS = 4
+
+
+def make_jpeg(seed, width, height, blur):
+    """도형과 잡음이 섞인 시험용 JPEG 바이트 (seed마다 같은 이미지)"""
+    rng = np.random.default_rng(seed)
+    img = Image.new('RGB', (width, height), tuple(int(v) for v in rng.integers(0, 256, 3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(120):
+        x0, y0 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        box = [x0, y0, x0 + int(rng.integers(10, width // 3)), y0 + int(rng.integers(10, height // 3))]
+        color = tuple(int(v) for v in rng.integers(0, 256, 3))
+        (draw.ellipse if rng.random() < 0.5 else draw.rectangle)(box, fill=color)
+    if blur:
+        img = img.filter(ImageFilter.GaussianBlur(blur))
+    noisy = np.asarray(img).astype(np.int16) + rng.integers(-15, 16, (height, width, 3))
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)).save(buffer, 'JPEG', quality=int(rng.choice([70, 90])))
+    return buffer.getvalue()
+
+
+FIXTURES = [(seed, size, blur) for seed in range(4)
+            for size in [(2400, 1600), (1600, 2400), (1024, 768)] for blur in (0, 3)]
+
+
+@pytest.mark.parametrize("seed,size,blur", FIXTURES)
+def test_reduced_decode_hashes_stay_within_tolerance(seed, size, blur):
+    data = make_jpeg(seed, *size, blur)
+    with app_logic.open_reduced_image(data) as reduced, Image.open(io.BytesIO(data)) as full:
+        assert min(reduced.size) >= app_logic.PHASH_DECODE_MIN_SIZE
+        for kind, func_name in app_logic.IMAGE_HASH_FUNCS.items():
+            func = getattr(imagehash, func_name)
+            assert func(reduced) - func(full) <= REDUCED_DECODE_MAX_BITS, kind
+
+
+def test_reduced_decode_actually_shrinks_large_jpeg():
+    data = make_jpeg(0, 2400, 1600, 0)
+    with app_logic.open_reduced_image(data) as reduced:
+        reduced.load()
+        assert reduced.size == (600, 400)
+        assert reduced.mode == 'L'
+
+
+def test_reduced_decode_can_be_disabled():
+    data = make_jpeg(0, 1024, 768, 0)
+    with app_logic.open_reduced_image(data, min_size=0) as img:
+        assert img.size == (1024, 768)
+
+
+def test_embedded_preview_is_only_used_for_raw_files(tmp_path, monkeypatch):
+    main, preview = make_jpeg(1, 1024, 768, 3), make_jpeg(2, 320, 240, 3)
+    monkeypatch.setattr(app_logic, 'read_embedded_preview', lambda full_path, min_size: preview)
+    jpeg_path, raw_path = tmp_path / 'photo.jpg', tmp_path / 'photo.dng'
+    jpeg_path.write_bytes(main)
+    raw_path.write_bytes(main)
+    with app_logic.open_reduced_image(main) as img:
+        main_hash = imagehash.phash(img)
+    with app_logic.open_reduced_image(preview) as img:
+        preview_hash = imagehash.phash(img)
+    assert main_hash != preview_hash
+    assert app_logic.get_image_hash(str(jpeg_path)) == main_hash
+    assert app_logic.get_image_hash(str(raw_path)) == preview_hash
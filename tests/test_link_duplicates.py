@@ -0,0 +1,115 @@
+# 파일 이름: tests/test_link_duplicates.py
+"""중복 파일을 링크로 대체할 때 원본 선택, 내용 재확인, 원자적 교체(실패해도 대상이 그대로인지)를 확인"""
+import os
+
+import pytest
+
+import app_logic
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def same_inode(a, b):
+    return os.path.samefile(a, b)
+
+
+def leftover_temp_files(folder):
+    return [name for name in os.listdir(folder) if '.iqa-link-' in name]
+
+
+def test_plan_uses_first_unselected_file_as_source(tmp_path):
+    a, b, c = (write(tmp_path / name, b'same') for name in ('a.bin', 'b.bin', 'c.bin'))
+    assert app_logic.plan_duplicate_links([a, b, c], {a, c}) == (b, [a, c])
+
+
+def test_plan_keeps_first_file_when_whole_group_is_selected(tmp_path):
+    a, b, c = (write(tmp_path / name, b'same') for name in ('a.bin', 'b.bin', 'c.bin'))
+    assert app_logic.plan_duplicate_links([a, b, c], {a, b, c}) == (a, [b, c])
+
+
+def test_plan_skips_archive_members_and_targets_already_linked(tmp_path):
+    a = write(tmp_path / 'a.bin', b'same')
+    linked = str(tmp_path / 'linked.bin')
+    os.link(a, linked)
+    b = write(tmp_path / 'b.bin', b'same')
+    member = app_logic.make_archive_member_path(str(tmp_path / 'backup.zip'), 'a.bin')
+    assert app_logic.plan_duplicate_links([member, a, linked, b], {member, linked, b}) == (a, [b])
+    assert app_logic.plan_duplicate_links([member], {member}) == (None, [])
+
+
+def test_hardlink_replaces_target_with_source_inode(tmp_path):
+    source = write(tmp_path / 'source.bin', b'x' * 5000)
+    target = write(tmp_path / 'target.bin', b'x' * 5000)
+    assert app_logic.link_duplicate_file(source, target, mode='hardlink') == 'hardlink'
+    assert same_inode(source, target)
+    assert leftover_temp_files(tmp_path) == []
+
+
+def test_auto_mode_links_the_target(tmp_path):
+    source = write(tmp_path / 'source.bin', b'x' * 5000)
+    target = write(tmp_path / 'target.bin', b'x' * 5000)
+    used = app_logic.link_duplicate_file(source, target)
+    # reflink를 지원하지 않는 파일 시스템이면 하드링크로 대체
+    assert used in ('reflink', 'hardlink')
+    if used == 'hardlink':
+        assert same_inode(source, target)
+    assert open(target, 'rb').read() == b'x' * 5000
+    assert leftover_temp_files(tmp_path) == []
+
+
+@pytest.mark.parametrize("target_content", [b'x' * 4999 + b'y', b'x' * 4000])
+def test_refuses_when_contents_differ(tmp_path, target_content):
+    source = write(tmp_path / 'source.bin', b'x' * 5000)
+    target = write(tmp_path / 'target.bin', target_content)
+    with pytest.raises(ValueError):
+        app_logic.link_duplicate_file(source, target, mode='hardlink')
+    assert not same_inode(source, target)
+    assert open(target, 'rb').read() == target_content
+
+
+def test_target_already_linked_to_source_is_left_alone(tmp_path, monkeypatch):
+    source = write(tmp_path / 'source.bin', b'x' * 5000)
+    target = str(tmp_path / 'target.bin')
+    os.link(source, target)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("이미 같은 inode인데 다시 링크함")
+    monkeypatch.setattr(app_logic.os, 'replace', fail)
+    assert app_logic.link_duplicate_file(source, target, mode='hardlink') == 'hardlink'
+    assert same_inode(source, target)
+
+
+def test_failed_rename_keeps_target_and_removes_temp_link(tmp_path, monkeypatch):
+    source = write(tmp_path / 'source.bin', b'x' * 5000)
+    target = write(tmp_path / 'target.bin', b'x' * 5000)
+    target_inode = os.stat(target).st_ino
+
+    def fail(src, dst):
+        raise OSError("rename failed")
+    monkeypatch.setattr(app_logic.os, 'replace', fail)
+    with pytest.raises(OSError):
+        app_logic.link_duplicate_file(source, target, mode='hardlink')
+    assert os.stat(target).st_ino == target_inode
+    assert open(target, 'rb').read() == b'x' * 5000
+    assert leftover_temp_files(tmp_path) == []
+    assert os.stat(source).st_nlink == 1
+
+
+def test_unsupported_reflink_keeps_target(tmp_path, monkeypatch):
+    source = write(tmp_path / 'source.bin', b'x' * 5000)
+    target = write(tmp_path / 'target.bin', b'x' * 5000)
+
+    def fail(src, dst):
+        open(dst, 'wb').close()  # 복제 도중 실패해 빈 임시 파일만 남은 경우
+        raise OSError("reflink not supported")
+    monkeypatch.setattr(app_logic, '_reflink', fail)
+    with pytest.raises(OSError):
+        app_logic.link_duplicate_file(source, target, mode='reflink')
+    assert not same_inode(source, target)
+    assert leftover_temp_files(tmp_path) == []
+    # auto는 같은 실패에서 하드링크로 대체
+    assert app_logic.link_duplicate_file(source, target) == 'hardlink'
+    assert same_inode(source, target)
@@ -0,0 +1,65 @@
+# 파일 이름: tests/test_metadata_blocking.py
+"""촬영 정보 블록 비교(build_metadata_blocks + 필터)가 모든 쌍에 is_metadata_compatible을 적용한 결과와 같은지 확인"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import app_logic
+from test_hamming import random_codes
+
+
+def random_metadata(n, seed):
+    """비율(흔한 비율 + 잘라낸 사본의 약간 다른 비율), 카메라, 촬영 시각이 섞이고 일부는 모르는 메타데이터"""
+    rng = random.Random(seed)
+    metadata = []
+    for _ in range(n):
+        captured = rng.choice([None, rng.uniform(0, 3600), rng.uniform(0, 600)])
+        camera = rng.choice([None, 'A', 'B', 'C'])
+        aspect = rng.choice([None, 1.0, 1.33, 1.34, 1.37, 1.5, 1.51, 1.52, 1.54, 1.55, 1.78, 1.8])
+        metadata.append((captured, camera, aspect))
+    return metadata
+
+
+def brute_force_edges(codes, metadata, threshold):
+    edges = set()
+    for i, j in itertools.combinations(range(len(codes)), 2):
+        diff = bin(int(codes[i]) ^ int(codes[j])).count("1")
+        if diff <= threshold and app_logic.is_metadata_compatible(metadata[i], metadata[j]):
+            edges.add((i, j, (64 - diff) / 64 * 100))
+    return edges
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_blocked_edges_match_pairwise_rule(seed):
+    n, threshold = 300, 12
+    codes = random_codes(n, seed=seed, near_fraction=0.6, max_flips=10)
+    metadata = random_metadata(n, seed)
+    paths = [f"img_{i}.jpg" for i in range(n)]
+    blocks = app_logic.build_metadata_blocks(metadata)
+    edges = list(app_logic.iter_block_hamming_edges(codes, threshold, blocks))
+    pair_filter = app_logic.make_metadata_pair_filter(dict(zip(paths, metadata)))
+    assert set(pair_filter(edges, paths)) == brute_force_edges(codes, metadata, threshold)
+    assert app_logic.count_block_pairs(blocks) < n * (n - 1) // 2
+
+
+@pytest.mark.parametrize("aspect1,aspect2,compatible", [
+    (1.5, 1.5, True),
+    (1.5, 1.52, True),     # 몇 픽셀 잘라낸 사본
+    (1.5, 1.54, True),
+    (1.33, 1.37, True),
+    (1.5, 1.55, False),
+    (1.33, 1.5, False),    # 4:3과 3:2
+    (1.5, 1.78, False),    # 3:2와 16:9
+])
+def test_aspect_ratio_tolerance(aspect1, aspect2, compatible):
+    assert app_logic.is_metadata_compatible((None, None, aspect1), (None, None, aspect2)) is compatible
+    assert app_logic.is_metadata_compatible((None, None, aspect2), (None, None, aspect1)) is compatible
+
+
+def test_compatible_aspects_fall_in_same_or_adjacent_bucket():
+    aspects = np.round(np.linspace(1.0, 3.0, 2001), 3)
+    for a, b in itertools.combinations(aspects[::7], 2):
+        if app_logic.is_metadata_compatible((None, None, a), (None, None, b)):
+            assert abs(app_logic.aspect_bucket(a) - app_logic.aspect_bucket(b)) <= 1
@@ -0,0 +1,80 @@
+# 파일 이름: tests/test_record_store.py
+"""RecordStore: 저장소 id로 예전 칸 번호를 무시하는지, 압축 후에도 남긴 칸을 그대로 읽는지 확인"""
+import os
+
+import numpy as np
+import pytest
+
+import app_logic
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = app_logic.HashCache(str(tmp_path / 'cache.sqlite3'))
+    yield cache
+    cache.conn.close()
+
+
+def make_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f'file_{i}.bin'
+        path.write_bytes(bytes([i]) * (i + 1))
+        paths.append(str(path))
+    return paths
+
+
+def store_all(store, paths, cache):
+    slots, misses = store.lookup(paths, cache)
+    for full_path, st in misses:
+        slots[full_path] = store.add_computed(full_path, st, np.full((4, 4), paths.index(full_path), np.uint8), cache)
+    return slots
+
+
+def test_slots_are_reused_until_the_store_is_reset(tmp_path, cache):
+    paths = make_files(tmp_path, 3)
+    store = app_logic.RecordStore(str(tmp_path / 'records.u8'), (4, 4), np.uint8, 'test')
+    store_all(store, paths, cache)
+    reopened = app_logic.RecordStore(store.path, (4, 4), np.uint8, 'test')
+    assert reopened.cache_kind == store.cache_kind
+    slots, misses = reopened.lookup(paths, cache)
+    assert not misses and len(slots) == 3
+    reopened.reset()
+    assert reopened.cache_kind != store.cache_kind
+    slots, misses = reopened.lookup(paths, cache)
+    assert not slots and len(misses) == 3
+
+
+def test_recreated_store_file_gets_a_new_id(tmp_path, cache):
+    paths = make_files(tmp_path, 2)
+    store = app_logic.RecordStore(str(tmp_path / 'records.u8'), (4, 4), np.uint8, 'test')
+    store_all(store, paths, cache)
+    os.remove(store.path)
+    recreated = app_logic.RecordStore(store.path, (4, 4), np.uint8, 'test')
+    assert recreated.cache_kind != store.cache_kind
+    assert recreated.lookup(paths, cache)[0] == {}
+
+
+def test_file_without_header_is_discarded(tmp_path, cache):
+    path = tmp_path / 'records.u8'
+    path.write_bytes(b'\x01' * 64)
+    store = app_logic.RecordStore(str(path), (4, 4), np.uint8, 'test')
+    assert len(store) == 0
+
+
+def test_oversized_store_is_compacted_to_the_looked_up_slots(tmp_path, cache):
+    paths = make_files(tmp_path, 6)
+    store = app_logic.RecordStore(str(tmp_path / 'records.u8'), (4, 4), np.uint8, 'test', max_bytes=4 * 16)
+    store_all(store, paths, cache)
+    assert len(store) == 6
+    old_kind = store.cache_kind
+    kept = paths[1::2]
+    slots, misses = store.lookup(kept, cache)
+    assert not misses
+    assert len(store) == len(kept) and store.cache_kind != old_kind
+    records = store.view()
+    for full_path, slot in slots.items():
+        assert (records[slot] == paths.index(full_path)).all()
+    # 압축 후 칸 번호가 캐시에 기록되어 다시 조회해도 그대로 찾음
+    assert store.lookup(kept, cache)[0] == slots
+    assert len(store.lookup(paths, cache)[1]) == len(paths) - len(kept)
@@ -0,0 +1,78 @@
+# 파일 이름: tests/test_scan_filter.py
+"""여러 검사 루트에서 제외 규칙이 폴더를 가지치기하고, 크기 범위와 겹치는 루트가 결과에 한 번만 반영되는지 확인"""
+import os
+
+import pytest
+
+import app_logic
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def body(seed, size=20000):
+    return bytes([seed]) * size
+
+
+def group_sets(duplicates):
+    return sorted(sorted(paths) for paths in duplicates.values())
+
+
+@pytest.fixture
+def two_roots(tmp_path):
+    """두 검사 루트에 걸친 중복과, 제외 폴더/크기 범위 밖 파일 안에만 있는 중복"""
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    kept = [write(first / 'a.bin', body(1)), write(second / 'nested' / 'a.bin', body(1))]
+    write(first / 'node_modules' / 'pkg' / 'a.bin', body(1))
+    write(second / 'node_modules' / 'b.bin', body(2))
+    write(second / 'b.bin', body(2))
+    write(first / 'out' / 'build' / 'a.bin', body(1))
+    write(second / 'log.tmp', body(1))
+    write(first / 'small.txt', b'tiny')
+    write(second / 'small.txt', b'tiny')
+    write(first / 'large.bin', body(3, 50000))
+    write(second / 'large.bin', body(3, 50000))
+    return [str(first), str(second)], kept
+
+
+def test_scan_filter_prunes_excluded_folders_in_every_root(two_roots, fresh_hash_cache, monkeypatch):
+    roots, kept = two_roots
+    scan_filter = app_logic.ScanFilter(exclude=['node_modules', '*/build/*'], exclude_regex=r'\.tmp$',
+                                       min_size=100, max_size=40000)
+    visited = []
+    real_scandir = os.scandir
+    def recording_scandir(path):
+        visited.append(os.fspath(path))
+        return real_scandir(path)
+    monkeypatch.setattr(app_logic.os, 'scandir', recording_scandir)
+
+    for options in ({}, {'out_of_core': True}):
+        visited.clear()
+        duplicates, total_files, total_size = app_logic.find_duplicate_files(
+            roots, workers=2, scan_filter=scan_filter, **options)
+        assert group_sets(duplicates) == [sorted(kept)]
+        assert (total_files, total_size) == (3, 3 * 20000)
+        # 제외된 폴더는 내려가지 않음 (걸러내는 것이 아니라 가지치기)
+        assert not any('node_modules' in path or os.sep + 'build' in path for path in visited)
+
+
+def test_scan_filter_accepts_checks_each_folder_under_its_root(two_roots):
+    roots, _ = two_roots
+    scan_filter = app_logic.ScanFilter(exclude=['node_modules'], min_size=100)
+    st = os.stat(os.path.join(roots[1], 'b.bin'))
+    assert scan_filter.accepts(os.path.join(roots[1], 'b.bin'), st, roots)
+    assert not scan_filter.accepts(os.path.join(roots[1], 'node_modules', 'b.bin'), st, roots)
+    assert not scan_filter.accepts(os.path.join(roots[0], 'small.txt'), os.stat(os.path.join(roots[0], 'small.txt')), roots)
+
+
+def test_overlapping_roots_are_scanned_once(two_roots, fresh_hash_cache):
+    roots, _ = two_roots
+    nested = os.path.join(roots[1], 'nested')
+    assert app_logic.normalize_roots([roots[0], nested, roots[1], roots[0] + os.sep]) == roots
+    once = app_logic.find_duplicate_files(roots, workers=1)
+    twice = app_logic.find_duplicate_files(roots + [nested, roots[0]], workers=1)
+    assert group_sets(once[0]) == group_sets(twice[0])
+    assert once[1:] == twice[1:]
@@ -0,0 +1,41 @@
+# 파일 이름: tests/test_ssim.py
+"""묶음 SSIM(batch_ssim)이 skimage structural_similarity 기본 설정과 같은 값을 내는지 확인"""
+import numpy as np
+import pytest
+from skimage.metrics import structural_similarity
+
+import app_logic
+
+
+def image_pairs(seed, count, size):
+    """무작위 이미지 + 그 이미지에 잡음/밝기 변화를 준 이미지 쌍 (서로 무관한 쌍도 섞음)"""
+    rng = np.random.default_rng(seed)
+    images1 = rng.integers(0, 256, (count, size, size)).astype(np.uint8)
+    noise = rng.integers(-40, 41, (count, size, size))
+    images2 = np.clip(images1.astype(np.int32) + noise + rng.integers(-30, 31, (count, 1, 1)), 0, 255).astype(np.uint8)
+    images2[::3] = rng.integers(0, 256, images2[::3].shape)
+    return images1, images2
+
+
+@pytest.mark.parametrize("size", [7, 16, app_logic.SSIM_THUMBNAIL_SIZE])
+def test_batch_ssim_matches_skimage(size):
+    images1, images2 = image_pairs(size, 12, size)
+    scores = app_logic.batch_ssim(images1, images2)
+    expected = [structural_similarity(a, b, data_range=255) for a, b in zip(images1, images2)]
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-9)
+
+
+def test_batch_ssim_of_identical_and_extreme_images():
+    flat = np.zeros((2, 16, 16), dtype=np.uint8)
+    flat[1] = 255
+    assert np.allclose(app_logic.batch_ssim(flat, flat), 1.0)
+    expected = structural_similarity(flat[0], flat[1], data_range=255)
+    assert app_logic.batch_ssim(flat[:1], flat[1:])[0] == pytest.approx(expected, abs=1e-12)
+
+
+def test_compute_pair_ssim_skips_missing_thumbnails():
+    images1, images2 = image_pairs(0, 2, 16)
+    thumbnails = {'a': images1[0], 'b': images2[0]}
+    scores = app_logic.compute_pair_ssim(thumbnails, [('a', 'b'), ('a', 'missing')])
+    assert scores[0] == pytest.approx(structural_similarity(images1[0], images2[0], data_range=255) * 100)
+    assert scores[1] is None